@@ -0,0 +1,158 @@
+"""
+Admission Control Module
+Global concurrency budgets for static fetches, headless renders and LLM calls, with fast rejection under overload
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the service is too busy to accept more audits; carries a Retry-After hint"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class Budget:
+    """
+    A semaphore with queue accounting: at most `limit` holders at once, while callers
+    waiting for a slot are counted and their wait time recorded. `max_queue` is the
+    demand (callers waiting plus those expected from queued audits) above which new
+    audits are turned away at the edge.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(limit)
+
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def overloaded(self, queued: float = 0.0) -> bool:
+        """Whether the callers waiting now plus `queued` expected ones reach max_queue"""
+        return self.waiting + queued >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of this budget, waiting for it if necessary"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        if waited > 1:
+            logger.info(f"Waited {waited:.1f}s for a {self.name} slot")
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.admitted, 3) if self.admitted else 0.0
+        }
+
+
+class AdmissionController:
+    """
+    One budget per expensive resource. Work inside an admitted audit waits for its
+    budget; new audits are rejected up front (HTTP 429) while any budget's demand or
+    the audit job queue is past its threshold, so a spike sheds load quickly instead
+    of slowing every request down.
+
+    Only a few audit workers run at once, so a budget rarely has many callers actually
+    waiting; the backlog sits in the job queue. Each queued audit therefore counts
+    against the budgets it will need: one static fetch and one LLM call each, and a
+    render at the rate renders have been needed so far.
+    """
+
+    def __init__(
+        self,
+        static_limit: Optional[int] = None,
+        render_limit: Optional[int] = None,
+        llm_limit: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        retry_after: Optional[int] = None
+    ):
+        self.static = Budget(
+            'static',
+            static_limit or int(os.environ.get('ADMISSION_STATIC_LIMIT', 32)),
+            int(os.environ.get('ADMISSION_STATIC_QUEUE', 200))
+        )
+        self.render = Budget(
+            'render',
+            render_limit or int(os.environ.get('ADMISSION_RENDER_LIMIT', os.environ.get('BROWSER_POOL_MAX_CONCURRENCY', 4))),
+            int(os.environ.get('ADMISSION_RENDER_QUEUE', 8))
+        )
+        self.llm = Budget(
+            'llm',
+            llm_limit or int(os.environ.get('ADMISSION_LLM_LIMIT', 8)),
+            int(os.environ.get('ADMISSION_LLM_QUEUE', 32))
+        )
+        self.max_queue_depth = max_queue_depth or int(os.environ.get('ADMISSION_MAX_QUEUE_DEPTH', 50))
+        self.retry_after = retry_after or int(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', 10))
+        self.rejected = 0
+
+    @property
+    def budgets(self):
+        return (self.static, self.render, self.llm)
+
+    def expected_use(self, budget: Budget) -> float:
+        """Share of queued audits expected to need `budget`"""
+        if budget is self.render:
+            # Renders are the fallback for thin static pages
+            return min(1.0, self.render.admitted / self.static.admitted) if self.static.admitted else 0.0
+        return 1.0
+
+    def admit(self, queue_depth: int = 0):
+        """Accept a new audit or raise AdmissionRejected; never waits"""
+        for budget in self.budgets:
+            queued = queue_depth * self.expected_use(budget)
+            if budget.overloaded(queued):
+                budget.rejected += 1
+                self._reject(f"{budget.name} queue is full ({budget.waiting} waiting, {queued:.0f} more from queued audits)")
+        if queue_depth >= self.max_queue_depth:
+            self._reject(f"audit queue is full ({queue_depth} pending)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_queue_depth": self.max_queue_depth,
+            "rejected": self.rejected,
+            **{budget.name: budget.stats() for budget in self.budgets}
+        }
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        logger.warning(f"Rejecting audit: {reason}")
+        raise AdmissionRejected(reason, self.retry_after)
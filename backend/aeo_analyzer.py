@@ -4,37 +4,44 @@ Analyzes structured data, schema.org markup, and featured snippet potential
 """
 
 import logging
-import json
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Union
 import re
 
+from dom_visitor import Selector, register_selectors
+from findings import Findings
+from parsed_document import ParsedDocument
+
 logger = logging.getLogger(__name__)
 
+# Nodes collected for this analyzer during the shared DOM walk
+register_selectors(
+    Selector('aeo.itemtype', attrs={'itemtype': True}),
+    Selector('aeo.faq_sections', ['div', 'section'], {'class': re.compile(r'faq', re.I)}),
+)
+
 
 class AEOAnalyzer:
-    def __init__(self):
-        self.issues = []
-        self.strengths = []
+    async def analyze(self, url: str, document: Union[str, ParsedDocument]) -> Dict[str, Any]:
+        """Analyze AEO aspects of the website (accepts raw HTML or a shared ParsedDocument)"""
+        return self.analyze_document(url, document)
     
-    async def analyze(self, url: str, html_content: str) -> Dict[str, Any]:
-        """Analyze AEO aspects of the website"""
+    def analyze_document(self, url: str, document: Union[str, ParsedDocument]) -> Dict[str, Any]:
+        """Synchronous analysis entry point, used directly by executor workers"""
         try:
-            # Reset issues and strengths for each analysis
-            self.issues = []
-            self.strengths = []
+            # Fresh accumulator per call; analyzers hold no per-audit state
+            findings = Findings()
             
-            soup = BeautifulSoup(html_content, 'lxml')
+            doc = document if isinstance(document, ParsedDocument) else ParsedDocument(document)
             
             # Analyze various AEO factors
-            structured_data = self._analyze_structured_data(soup)
-            schema_types = self._analyze_schema_types(soup)
-            qa_format = self._analyze_qa_format(soup)
-            list_format = self._analyze_list_format(soup)
-            table_data = self._analyze_tables(soup)
+            structured_data = self._analyze_structured_data(doc, findings)
+            schema_types = self._analyze_schema_types(doc, findings)
+            qa_format = self._analyze_qa_format(doc, findings)
+            list_format = self._analyze_list_format(doc, findings)
+            table_data = self._analyze_tables(doc, findings)
             
             # Calculate AEO score (0-100)
-            score = self._calculate_score()
+            score = self._calculate_score(findings)
             
             return {
                 "score": score,
@@ -43,8 +50,8 @@ class AEOAnalyzer:
                 "qa_format": qa_format,
                 "lists": list_format,
                 "tables": table_data,
-                "issues": self.issues,
-                "strengths": self.strengths
+                "issues": findings.issues,
+                "strengths": findings.strengths
             }
         except Exception as e:
             logger.error(f"AEO analysis error: {e}")
@@ -55,30 +62,25 @@ class AEOAnalyzer:
                 "strengths": []
             }
     
-    def _analyze_structured_data(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_structured_data(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze JSON-LD structured data"""
-        json_ld_scripts = soup.find_all('script', type='application/ld+json')
-        structured_data_count = len(json_ld_scripts)
+        structured_data_count = len(doc.json_ld_scripts)
         
         schemas_found = []
         
         if structured_data_count == 0:
-            self.issues.append("No structured data (JSON-LD) found")
+            findings.issues.append("No structured data (JSON-LD) found")
         else:
-            self.strengths.append(f"Found {structured_data_count} structured data blocks")
+            findings.strengths.append(f"Found {structured_data_count} structured data blocks")
             
-            # Parse and identify schema types
-            for script in json_ld_scripts:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict) and '@type' in data:
-                        schemas_found.append(data['@type'])
-                    elif isinstance(data, list):
-                        for item in data:
-                            if isinstance(item, dict) and '@type' in item:
-                                schemas_found.append(item['@type'])
-                except (json.JSONDecodeError, AttributeError):
-                    continue
+            # Identify schema types in the decoded blocks
+            for data in doc.json_ld:
+                if isinstance(data, dict) and '@type' in data:
+                    schemas_found.append(data['@type'])
+                elif isinstance(data, list):
+                    for item in data:
+                        if isinstance(item, dict) and '@type' in item:
+                            schemas_found.append(item['@type'])
         
         return {
             "count": structured_data_count,
@@ -86,7 +88,7 @@ class AEOAnalyzer:
             "has_structured_data": structured_data_count > 0
         }
     
-    def _analyze_schema_types(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_schema_types(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Check for common schema.org types"""
         recommended_schemas = [
             'Organization',
@@ -100,7 +102,7 @@ class AEOAnalyzer:
         ]
         
         # Check for microdata schemas
-        items_with_itemtype = soup.find_all(attrs={'itemtype': True})
+        items_with_itemtype = doc.select('aeo.itemtype')
         microdata_schemas = []
         
         for item in items_with_itemtype:
@@ -110,14 +112,14 @@ class AEOAnalyzer:
             microdata_schemas.append(schema_type)
         
         if not microdata_schemas:
-            self.issues.append("No schema.org markup found (microdata)")
+            findings.issues.append("No schema.org markup found (microdata)")
         else:
-            self.strengths.append(f"Found {len(set(microdata_schemas))} schema.org types")
+            findings.strengths.append(f"Found {len(set(microdata_schemas))} schema.org types")
         
         # Check for FAQPage specifically
-        faq_elements = soup.find_all(['div', 'section'], class_=re.compile(r'faq', re.I))
+        faq_elements = doc.select('aeo.faq_sections')
         if len(faq_elements) > 0:
-            self.strengths.append("FAQ section detected (good for featured snippets)")
+            findings.strengths.append("FAQ section detected (good for featured snippets)")
         
         return {
             "microdata_schemas": list(set(microdata_schemas)),
@@ -125,10 +127,10 @@ class AEOAnalyzer:
             "has_schema": len(microdata_schemas) > 0 or len(faq_elements) > 0
         }
     
-    def _analyze_qa_format(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_qa_format(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze question-answer format for featured snippets"""
         # Look for question patterns
-        headings = soup.find_all(['h2', 'h3', 'h4'])
+        headings = doc.find_all('h2', 'h3', 'h4')
         question_patterns = [
             r'\bwhat\b', r'\bwhy\b', r'\bhow\b', r'\bwhen\b',
             r'\bwhere\b', r'\bwhich\b', r'\bcan\b', r'\bshould\b',
@@ -144,28 +146,28 @@ class AEOAnalyzer:
                     break
         
         if questions_found > 0:
-            self.strengths.append(f"Found {questions_found} question-format headings (good for featured snippets)")
+            findings.strengths.append(f"Found {questions_found} question-format headings (good for featured snippets)")
         else:
-            self.issues.append("No question-format content detected (limits featured snippet potential)")
+            findings.issues.append("No question-format content detected (limits featured snippet potential)")
         
         return {
             "question_headings": questions_found,
             "has_qa_format": questions_found > 0
         }
     
-    def _analyze_list_format(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_list_format(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze list formats (good for featured snippets)"""
-        ordered_lists = soup.find_all('ol')
-        unordered_lists = soup.find_all('ul')
+        ordered_lists = doc.find_all('ol')
+        unordered_lists = doc.find_all('ul')
         
         ol_count = len(ordered_lists)
         ul_count = len(unordered_lists)
         total_lists = ol_count + ul_count
         
         if total_lists > 0:
-            self.strengths.append(f"Found {total_lists} lists (good for featured snippets)")
+            findings.strengths.append(f"Found {total_lists} lists (good for featured snippets)")
         else:
-            self.issues.append("No list formats found (limits featured snippet potential)")
+            findings.issues.append("No list formats found (limits featured snippet potential)")
         
         return {
             "ordered_lists": ol_count,
@@ -174,26 +176,26 @@ class AEOAnalyzer:
             "has_lists": total_lists > 0
         }
     
-    def _analyze_tables(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_tables(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze table data (good for featured snippets)"""
-        tables = soup.find_all('table')
+        tables = doc.find_all('table')
         table_count = len(tables)
         
         if table_count > 0:
-            self.strengths.append(f"Found {table_count} tables (good for featured snippets)")
+            findings.strengths.append(f"Found {table_count} tables (good for featured snippets)")
         
         return {
             "table_count": table_count,
             "has_tables": table_count > 0
         }
     
-    def _calculate_score(self) -> int:
+    def _calculate_score(self, findings: Findings) -> int:
         """Calculate overall AEO score based on issues and strengths"""
         base_score = 100
         
         # Deduct points for issues
         penalty_per_issue = 8
-        score = base_score - (len(self.issues) * penalty_per_issue)
+        score = base_score - (len(findings.issues) * penalty_per_issue)
         
         # Ensure score is between 0 and 100
         score = max(0, min(100, score))
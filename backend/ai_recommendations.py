@@ -5,9 +5,12 @@ Uses LLM to generate intelligent recommendations based on audit data
 
 import logging
 import os
+import time
 from typing import Dict, Any, List
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
+from metrics import LLM_FAILURES, LLM_REQUEST_DURATION
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,12 +27,19 @@ class AIRecommendationEngine:
         aeo_data: Dict[str, Any],
         geo_data: Dict[str, Any]
     ) -> List[Dict[str, str]]:
-        """Generate AI-powered recommendations based on audit data"""
+        """
+        Generate AI-powered recommendations based on audit data, falling back to rule-based
+        ones without an API key, on a failed request or on an unparseable response. Each
+        fallback is counted in LLM_FAILURES by reason (a missing key too: every audit then
+        loses its AI recommendations); LLM_REQUEST_DURATION times only the request.
+        """
+        if not self.api_key:
+            logger.warning("Cannot generate AI recommendations without API key")
+            LLM_FAILURES.inc(reason="no_api_key")
+            return self._generate_fallback_recommendations(seo_data, aeo_data, geo_data)
+        
+        started = time.perf_counter()
         try:
-            if not self.api_key:
-                logger.warning("Cannot generate AI recommendations without API key")
-                return self._generate_fallback_recommendations(seo_data, aeo_data, geo_data)
-            
             # Prepare context for LLM
             prompt = self._build_recommendation_prompt(url, seo_data, aeo_data, geo_data)
             
@@ -43,15 +53,24 @@ class AIRecommendationEngine:
             # Send message
             user_message = UserMessage(text=prompt)
             response = await chat.send_message(user_message)
-            
-            # Parse recommendations from response
-            recommendations = self._parse_recommendations(response)
-            
-            return recommendations
-            
         except Exception as e:
             logger.error(f"Error generating AI recommendations: {e}")
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="failure")
+            LLM_FAILURES.inc(reason="request")
             return self._generate_fallback_recommendations(seo_data, aeo_data, geo_data)
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="success")
+        
+        # Parse recommendations from response
+        try:
+            recommendations = self._parse_recommendations(response)
+        except Exception as e:
+            logger.error(f"Error parsing AI recommendations: {e}")
+            recommendations = []
+        if not recommendations:
+            LLM_FAILURES.inc(reason="parse")
+            return self._generate_fallback_recommendations(seo_data, aeo_data, geo_data)
+        
+        return recommendations
     
     def _build_recommendation_prompt(
         self,
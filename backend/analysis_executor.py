@@ -0,0 +1,131 @@
+"""
+Analysis Executor Module
+Runs the CPU-bound SEO/AEO/GEO analysis off the event loop, in a process or thread pool
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional
+
+from parsed_document import ParsedDocument
+from seo_analyzer import SEOAnalyzer
+from aeo_analyzer import AEOAnalyzer
+from geo_analyzer import GEOAnalyzer
+from timings import StageTimer
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ('process', 'thread', 'inline')
+
+# Bump whenever analyzer scoring changes; rescore.py re-scores stored audits stamped with an older version
+SCORING_RULES_VERSION = 1
+
+# Analyzers keep no per-run state, so one set per worker serves every job (and every thread)
+seo_analyzer = SEOAnalyzer()
+aeo_analyzer = AEOAnalyzer()
+geo_analyzer = GEOAnalyzer()
+
+
+def analyze_html(url: str, html: bytes) -> Dict[str, Any]:
+    """
+    Worker entry point: parse the page once and run every analyzer on it.
+    Takes UTF-8 bytes and returns plain dicts so both directions pickle cheaply.
+    The timings block covers parsing, the DOM walk and each analyzer, measured in the worker.
+    """
+    timer = StageTimer()
+    timer.count_bytes('html', len(html))
+
+    with timer.stage('parse'):
+        document = ParsedDocument(html.decode('utf-8', errors='replace'))
+    with timer.stage('dom_walk'):
+        text_length = document.compact_text_length
+
+    results = {}
+    for name, analyzer in (('seo', seo_analyzer), ('aeo', aeo_analyzer), ('geo', geo_analyzer)):
+        with timer.stage(f'{name}_analysis'):
+            results[name] = analyzer.analyze_document(url, document)
+
+    return {
+        **results,
+        "text_length": text_length,
+        "timings": timer.as_dict()
+    }
+
+
+def _gil_disabled() -> bool:
+    """True on a free-threaded interpreter running without the GIL"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_mode() -> str:
+    # Threads give real parallelism only on free-threaded builds; otherwise use processes
+    return 'thread' if _gil_disabled() else 'process'
+
+
+class AnalysisExecutor:
+    """
+    Dispatches analysis jobs to a worker pool.
+    'process' uses a spawn-based ProcessPoolExecutor, 'thread' a ThreadPoolExecutor (the
+    right choice on free-threaded Python) and 'inline' runs on the event loop thread.
+    """
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = mode or os.environ.get('ANALYSIS_EXECUTOR') or default_mode()
+        if self.mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown analysis executor mode: {self.mode}")
+        self.max_workers = max_workers or int(os.environ.get('ANALYSIS_WORKERS', 0)) or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+        # Serializes replacing a broken pool, so concurrent failures restart it only once
+        self._restart_lock = asyncio.Lock()
+
+    async def start(self):
+        """Create the worker pool"""
+        self._get_pool()
+
+    async def stop(self):
+        """Shut the worker pool down"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def analyze(self, url: str, html: str) -> Dict[str, Any]:
+        """Analyze a page in the pool and return the seo/aeo/geo result dicts"""
+        payload = html.encode('utf-8')
+
+        if self.mode == 'inline':
+            return analyze_html(url, payload)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            return await loop.run_in_executor(pool, analyze_html, url, payload)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); replace the pool and retry once.
+            # Every job on the broken pool lands here: only the first replaces it, the
+            # others retry on the replacement instead of shutting it down again.
+            async with self._restart_lock:
+                if self._pool is pool:
+                    logger.warning("Analysis worker pool broke, restarting it")
+                    await self.stop()
+                pool = self._get_pool()
+            return await loop.run_in_executor(pool, analyze_html, url, payload)
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self.mode == 'inline':
+            return None
+        if self._pool is None:
+            if self.mode == 'process':
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+            logger.info(f"Analysis executor started ({self.mode}, {self.max_workers} workers)")
+        return self._pool
@@ -0,0 +1,138 @@
+"""
+Audit Cache Module
+Size-bounded LRU cache of audit reports with per-entry TTL and HTTP revalidation data
+"""
+
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from cachetools import LRUCache
+
+from http_fetcher import FetchResult
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """A cached report plus what is needed to revalidate it against the origin"""
+
+    def __init__(self, report: Dict[str, Any], etag: Optional[str], last_modified: Optional[str], content_hash: Optional[str], ttl: float):
+        self.report = report
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators for a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class _EvictionCountingLRU(LRUCache):
+    def __init__(self, maxsize: int, owner: 'AuditCache'):
+        super().__init__(maxsize)
+        self._owner = owner
+
+    def popitem(self):
+        item = super().popitem()
+        self._owner.evictions += 1
+        return item
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class AuditCache:
+    """
+    Expired entries are kept (until LRU eviction) so they can be revalidated: a 304
+    or an unchanged body hash refreshes the TTL and the cached analysis is reused.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or int(os.environ.get('AUDIT_CACHE_MAX_ENTRIES', 1000))
+        self.ttl = ttl if ttl is not None else float(os.environ.get('AUDIT_CACHE_TTL_SECONDS', 3600))
+        self._entries = _EvictionCountingLRU(self.max_entries, self)
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry for a key whether fresh or stale, marking it recently used"""
+        return self._entries.get(key)
+
+    def get_fresh(self, key: str) -> Optional[CacheEntry]:
+        """Entry for a key if it is still within its TTL; counts a hit"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.fresh:
+            self.hits += 1
+            return entry
+        return None
+
+    def put(self, key: str, report: Dict[str, Any], response: Optional[FetchResult]):
+        """Cache a completed report with the validators of the response it was built from"""
+        headers = response.headers if response else {}
+        self._entries[key] = CacheEntry(
+            report=report,
+            etag=headers.get('etag'),
+            last_modified=headers.get('last-modified'),
+            content_hash=content_hash(response.content) if response else None,
+            ttl=self.ttl
+        )
+
+    def revalidate(self, entry: CacheEntry, response: FetchResult) -> bool:
+        """
+        Check a conditional GET against a stale entry. Returns True (and refreshes the
+        TTL) when the origin answered 304 or served a byte-identical page.
+        """
+        self.revalidations += 1
+        if response.status_code == 304:
+            self.not_modified += 1
+        elif response.status_code == 200 and entry.content_hash and content_hash(response.content) == entry.content_hash:
+            self.unchanged += 1
+        else:
+            return False
+
+        entry.expires_at = time.monotonic() + self.ttl
+        if response.status_code == 200:
+            entry.etag = response.headers.get('etag', entry.etag)
+            entry.last_modified = response.headers.get('last-modified', entry.last_modified)
+        self.hits += 1
+        return True
+
+    def record_miss(self):
+        self.misses += 1
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "evictions": self.evictions
+        }
@@ -3,60 +3,297 @@ Main Audit Engine
 Orchestrates website analysis using Playwright for rendering and all analyzers
 """
 
+import copy
 import logging
-from typing import Dict, Any
-from playwright.async_api import async_playwright
-import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
-import requests
-from bs4 import BeautifulSoup
 
-from seo_analyzer import SEOAnalyzer
-from aeo_analyzer import AEOAnalyzer
-from geo_analyzer import GEOAnalyzer
+from admission import AdmissionController
 from ai_recommendations import AIRecommendationEngine
+from analysis_executor import AnalysisExecutor, SCORING_RULES_VERSION
+from audit_events import ProgressCallback
+from audit_cache import AuditCache
+from browser_pool import BrowserPool
+from fetch_archive import fetch_backends
+from http_fetcher import HTTPFetcher, FetchResult
+from link_checker import LinkChecker
+from metrics import AUDIT_DURATION, AUDIT_FETCHES, AUDIT_STAGE_DURATION
+from robots import RobotsCache
+from seo_analyzer import SEOAnalyzer
+from single_flight import SingleFlight
+from site_crawler import SiteCrawler, rollup
+from snapshot_store import create_snapshot_store
+from timings import StageTimer
+from url_utils import ensure_scheme, normalize_url
 
 logger = logging.getLogger(__name__)
 
 
+def _emit(progress: Optional[ProgressCallback], stage: str, **data):
+    """Report a stage to an optional progress callback; listener errors never fail the audit"""
+    if progress is None:
+        return
+    try:
+        progress(stage, data)
+    except Exception as e:
+        logger.warning(f"Progress callback failed for stage {stage}: {e}")
+
+
+def _record_analysis(timer: StageTimer, analysis: Dict[str, Any]):
+    """Fold the parse/analyzer timings measured inside the analysis worker into the audit's timer"""
+    worker = analysis.get('timings', {})
+    timer.add_ms(worker.get('stages_ms', {}))
+    timer.set('html_bytes', worker.get('bytes', {}).get('html'))
+    timer.set('analysis_peak_rss_delta_kb', max(
+        timer.values.get('analysis_peak_rss_delta_kb', 0),
+        worker.get('peak_rss_delta_kb', 0)
+    ))
+
+
 class AuditEngine:
     def __init__(self):
-        self.seo_analyzer = SEOAnalyzer()
-        self.aeo_analyzer = AEOAnalyzer()
-        self.geo_analyzer = GEOAnalyzer()
+        self.analysis_executor = AnalysisExecutor()
         self.ai_engine = AIRecommendationEngine()
+        # Live network by default; AUDIT_FETCH_MODE=record|replay swaps in the HAR archive backends
+        self.http_fetcher, self.browser_pool = fetch_backends(HTTPFetcher(), BrowserPool())
+        # robots.txt rules per host, consulted by site crawls
+        self.robots = RobotsCache(self.http_fetcher)
+        # Broken-link verification (its status cache is shared by all audits); replayed audits stay offline
+        self.link_checker = None
+        if os.environ.get('LINK_CHECK_ENABLED', '1') == '1' and os.environ.get('AUDIT_FETCH_MODE', 'live') != 'replay':
+            self.link_checker = LinkChecker()
+        self.seo_analyzer = SEOAnalyzer()
+        # Concurrent audits of the same page share one run; completed results are reused briefly
+        self.single_flight = SingleFlight(
+            reuse_window=float(os.environ.get('AUDIT_COALESCE_WINDOW_SECONDS', 10)),
+            should_reuse=lambda report: report.get('status') == 'completed'
+        )
+        self.audit_cache = AuditCache()
+        # Caps concurrent fetches, Chromium renders and LLM calls across all audits
+        self.admission = AdmissionController()
+        # Analyzed HTML is kept (deduplicated by content hash) so audits can be re-scored offline
+        self.snapshot_store = create_snapshot_store()
     
-    async def run_audit(self, url: str) -> Dict[str, Any]:
-        """Run complete audit on a URL"""
+    async def start(self):
+        """Start long-lived resources (called from the app startup hook)"""
+        await self.http_fetcher.start()
+        await self.analysis_executor.start()
         try:
-            # Validate URL
-            parsed_url = urlparse(url)
-            if not parsed_url.scheme:
-                url = f"https://{url}"
+            await self.browser_pool.start()
+        except Exception as e:
+            # Rendering retries the launch lazily, so a missing browser must not block startup
+            logger.error(f"Browser pool failed to start: {e}")
+    
+    async def stop(self):
+        """Release long-lived resources (called from the app shutdown hook)"""
+        await self.http_fetcher.stop()
+        await self.analysis_executor.stop()
+        await self.browser_pool.stop()
+        if self.link_checker is not None:
+            await self.link_checker.stop()
+    
+    async def run_audit(self, url: str, progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Run complete audit on a URL.
+        Fresh cached reports are returned directly; otherwise concurrent requests for the
+        same page are coalesced into one revalidation or audit run. `progress(stage, data)`
+        is called as the run moves through its stages; callers that join another caller's
+        run only get the "joined" stage.
+        The returned report carries a `timings` block describing this call: per-stage
+        milliseconds, byte counts and where the result came from (audit, revalidated,
+        cache or shared with a concurrent caller).
+        """
+        url = ensure_scheme(url)
+        timer = StageTimer()
+        try:
+            key = normalize_url(url)
+        except ValueError as e:
+            # Unparseable URL, e.g. a port out of range: fail like any other audit
+            logger.error(f"Audit failed: {e}")
+            return {
+                "url": url,
+                "seo_score": 0,
+                "aeo_score": 0,
+                "geo_score": 0,
+                "status": "failed",
+                "error": str(e),
+                "recommendations": [],
+                "timings": timer.as_dict()
+            }
+        timer.set('source', 'shared')
+        
+        entry = self.audit_cache.get_fresh(key)
+        if entry is not None:
+            logger.info(f"Serving cached audit for: {url}")
+            _emit(progress, "cached", url=url)
+            timer.set('source', 'cache')
+            report = entry.report
+        else:
+            if self.single_flight.in_flight(key):
+                _emit(progress, "joined", url=url)
+            report = await self.single_flight.do(key, lambda: self._revalidate_or_audit(key, url, progress, timer))
+        
+        # Every caller gets its own copy of the shared report
+        report = copy.deepcopy(report)
+        report['timings'] = timer.as_dict()
+        
+        AUDIT_DURATION.observe(time.monotonic() - timer.started, source=timer.values['source'])
+        for stage, seconds in timer.stages.items():
+            AUDIT_STAGE_DURATION.observe(seconds, stage=stage)
+        return report
+    
+    async def run_site_audit(
+        self,
+        url: str,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        changed_since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Crawl the site from `url` and audit every internal page found (see SiteCrawler);
+        `changed_since` leaves out sitemap URLs not modified since then.
+        Scores are the site means; the details, snapshot and AI recommendations are those of
+        the start page, and the full per-page rollup is under `site`. Crawls are never
+        cached or coalesced.
+        """
+        url = ensure_scheme(url)
+        timer = StageTimer()
+        timer.set('source', 'crawl')
+        try:
+            logger.info(f"Starting site crawl for: {url}")
+            with timer.stage('crawl'):
+                pages, frontier = await SiteCrawler(self, max_pages, max_depth, changed_since=changed_since).crawl(
+                    url, lambda stage, data: _emit(progress, stage, **data), timer
+                )
+            start = next((page for page in pages if page['depth'] == 0 and page['status'] == 'completed'), None)
+            if start is None:
+                raise Exception("Failed to fetch website content")
             
+            # Crawled pages skip the link check; only the start page's details are reported
+            await self._check_links(start['analysis'], progress, timer)
+            start['seo_score'] = start['analysis']['seo']['score']
+            
+            site = rollup(url, pages, frontier)
+            timer.set('pages_crawled', site['pages_crawled'])
+            logger.info(f"Site crawl complete - {site['pages_crawled']} pages, SEO: {site['seo_score']}, AEO: {site['aeo_score']}, GEO: {site['geo_score']}")
+            for analyzer in ('seo', 'aeo', 'geo'):
+                _emit(progress, "score", analyzer=analyzer, score=site[f'{analyzer}_score'])
+            
+            analysis = start['analysis']
+            _emit(progress, "recommendations_started")
+            with timer.stage('llm'):
+                async with self.admission.llm.slot():
+                    recommendations = await self.ai_engine.generate_recommendations(
+                        url, analysis['seo'], analysis['aeo'], analysis['geo']
+                    )
+            _emit(progress, "recommendations", count=len(recommendations), recommendations=recommendations)
+            
+            report = {
+                "url": url,
+                "seo_score": site['seo_score'],
+                "aeo_score": site['aeo_score'],
+                "geo_score": site['geo_score'],
+                "seo_details": analysis['seo'],
+                "aeo_details": analysis['aeo'],
+                "geo_details": analysis['geo'],
+                "recommendations": recommendations,
+                "snapshot": start['snapshot'],
+                "scoring_version": SCORING_RULES_VERSION,
+                "site": site,
+                "status": "completed"
+            }
+        except Exception as e:
+            logger.error(f"Site audit failed: {e}")
+            report = {
+                "url": url,
+                "seo_score": 0,
+                "aeo_score": 0,
+                "geo_score": 0,
+                "status": "failed",
+                "error": str(e),
+                "recommendations": []
+            }
+        
+        report['timings'] = timer.as_dict()
+        AUDIT_DURATION.observe(time.monotonic() - timer.started, source='crawl')
+        return report
+    
+    async def _revalidate_or_audit(
+        self,
+        key: str,
+        url: str,
+        progress: Optional[ProgressCallback] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Dict[str, Any]:
+        """Reuse a stale cached report if the origin says the page is unchanged, else audit it"""
+        timer = timer or StageTimer()
+        entry = self.audit_cache.get(key)
+        response = None
+        
+        if entry is not None:
+            try:
+                _emit(progress, "revalidating", url=url)
+                with timer.stage('revalidate'):
+                    async with self.admission.static.slot():
+                        response = await self.http_fetcher.get(url, headers=entry.conditional_headers())
+                timer.count_bytes('static', len(response.content))
+                if self.audit_cache.revalidate(entry, response):
+                    logger.info(f"Cached audit still valid for: {url}")
+                    _emit(progress, "cached", url=url)
+                    timer.set('source', 'revalidated')
+                    return entry.report
+            except Exception as e:
+                logger.warning(f"Revalidation failed for {url}: {e}")
+                response = None
+            if response is not None and response.status_code != 200:
+                response = None
+        
+        self.audit_cache.record_miss()
+        timer.set('source', 'audit')
+        report, static_response = await self._run_audit(url, response, progress, timer)
+        if report.get('status') == 'completed':
+            self.audit_cache.put(key, report, static_response)
+        return report
+    
+    async def _run_audit(
+        self,
+        url: str,
+        response: Optional[FetchResult] = None,
+        progress: Optional[ProgressCallback] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[Dict[str, Any], Optional[FetchResult]]:
+        """Fetch (unless a static response is supplied), analyze and generate recommendations"""
+        timer = timer or StageTimer()
+        static_response = response
+        try:
             logger.info(f"Starting audit for: {url}")
             
-            # Fetch website content
-            html_content = await self._fetch_website_content(url)
+            # Fetch website content and analyze it in the worker pool
+            html_content, analysis, static_response = await self._fetch_and_analyze(url, response, progress, timer)
             
-            if not html_content:
+            if not analysis:
                 raise Exception("Failed to fetch website content")
             
-            # Run all analyzers in parallel
-            seo_task = self.seo_analyzer.analyze(url, html_content)
-            aeo_task = self.aeo_analyzer.analyze(url, html_content)
-            geo_task = self.geo_analyzer.analyze(url, html_content)
+            snapshot = await self._save_snapshot(html_content, timer)
             
-            seo_results, aeo_results, geo_results = await asyncio.gather(
-                seo_task, aeo_task, geo_task
-            )
+            seo_results, aeo_results, geo_results = analysis['seo'], analysis['aeo'], analysis['geo']
             
             logger.info(f"Analysis complete - SEO: {seo_results['score']}, AEO: {aeo_results['score']}, GEO: {geo_results['score']}")
+            for analyzer, results in (('seo', seo_results), ('aeo', aeo_results), ('geo', geo_results)):
+                _emit(progress, "score", analyzer=analyzer, score=results['score'])
             
             # Generate AI recommendations
-            recommendations = await self.ai_engine.generate_recommendations(
-                url, seo_results, aeo_results, geo_results
-            )
+            _emit(progress, "recommendations_started")
+            with timer.stage('llm'):
+                async with self.admission.llm.slot():
+                    recommendations = await self.ai_engine.generate_recommendations(
+                        url, seo_results, aeo_results, geo_results
+                    )
+            _emit(progress, "recommendations", count=len(recommendations), recommendations=recommendations)
             
             # Compile audit report
             audit_report = {
@@ -68,10 +305,12 @@ class AuditEngine:
                 "aeo_details": aeo_results,
                 "geo_details": geo_results,
                 "recommendations": recommendations,
+                "snapshot": snapshot,
+                "scoring_version": SCORING_RULES_VERSION,
                 "status": "completed"
             }
             
-            return audit_report
+            return audit_report, static_response
             
         except Exception as e:
             logger.error(f"Audit failed: {e}")
@@ -83,60 +322,109 @@ class AuditEngine:
                 "status": "failed",
                 "error": str(e),
                 "recommendations": []
-            }
+            }, static_response
     
-    async def _fetch_website_content(self, url: str) -> str:
-        """Fetch website content using Playwright for JavaScript-rendered sites"""
+    async def _save_snapshot(self, html_content: str, timer: StageTimer) -> Optional[Dict[str, Any]]:
+        """Store the analyzed HTML; a storage failure only loses the snapshot, never the audit"""
+        if self.snapshot_store is None:
+            return None
         try:
-            # First try with requests (faster for static sites)
+            with timer.stage('snapshot'):
+                snapshot = await self.snapshot_store.save(html_content)
+            snapshot['fetch_mode'] = timer.values.get('fetch_mode')
+            return snapshot
+        except Exception as e:
+            logger.warning(f"Snapshot store failed: {e}")
+            return None
+    
+    async def _check_links(self, analysis: Dict[str, Any], progress: Optional[ProgressCallback], timer: StageTimer):
+        """Verify the page's links within the time budget and fold broken ones into the SEO score"""
+        if self.link_checker is None:
+            return
+        links = analysis['seo'].get('links', {})
+        urls = links.get('internal_urls', []) + links.get('external_urls', [])
+        try:
+            _emit(progress, "link_check_started", links=len(urls))
+            with timer.stage('link_check'):
+                result = await self.link_checker.check(urls)
+            self.seo_analyzer.apply_link_check(analysis['seo'], result)
+            timer.set('links_unchecked', result['unchecked'])
+        except Exception as e:
+            logger.warning(f"Link check failed: {e}")
+    
+    async def _fetch_website_content(self, url: str) -> Optional[str]:
+        """Fetch website HTML, rendering with Playwright when the static page is too thin"""
+        html_content, _, _ = await self._fetch_and_analyze(url)
+        return html_content
+    
+    async def _fetch_and_analyze(
+        self,
+        url: str,
+        response: Optional[FetchResult] = None,
+        progress: Optional[ProgressCallback] = None,
+        timer: Optional[StageTimer] = None,
+        check_links: bool = True
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[FetchResult]]:
+        """
+        Fetch website content, using Playwright for JavaScript-rendered sites, and analyze it.
+        The analysis of the static response doubles as the "has real content" check, so a
+        page is parsed exactly once unless it has to be rendered. The links of the analyzed
+        page are then verified (unless `check_links` is off). Returns the HTML, the
+        analysis and the static response (kept for cache validators), and skips the static
+        GET when a response is passed in.
+        """
+        timer = timer or StageTimer()
+        try:
+            # First try a plain HTTP fetch (faster for static sites)
             try:
-                logger.info(f"Attempting static fetch for: {url}")
-                response = requests.get(url, timeout=10, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+                if response is None:
+                    logger.info(f"Attempting static fetch for: {url}")
+                    _emit(progress, "fetch_started", url=url, mode="static")
+                    with timer.stage('static_fetch'):
+                        async with self.admission.static.slot():
+                            response = await self.http_fetcher.get(url)
+                    timer.count_bytes('static', len(response.content))
                 
                 if response.status_code == 200:
-                    # Check if content looks substantial
-                    soup = BeautifulSoup(response.text, 'lxml')
-                    text_content = soup.get_text(strip=True)
+                    # Links are resolved and classified against the URL the fetch ended up at
+                    with timer.stage('analysis'):
+                        analysis = await self.analysis_executor.analyze(response.url or url, response.text)
+                    _record_analysis(timer, analysis)
                     
-                    if len(text_content) > 50:  # Has reasonable content (lowered threshold)
+                    # Check if content looks substantial
+                    if analysis['text_length'] > 50:  # Has reasonable content (lowered threshold)
                         logger.info("Static fetch successful")
-                        return response.text
+                        timer.set('fetch_mode', 'static')
+                        AUDIT_FETCHES.inc(mode='static')
+                        _emit(progress, "fetched", mode="static", bytes=len(response.content))
+                        if check_links:
+                            await self._check_links(analysis, progress, timer)
+                        return response.text, analysis, response
             except Exception as e:
                 logger.warning(f"Static fetch failed: {e}, trying Playwright")
             
             # Fall back to Playwright for dynamic content
             logger.info(f"Using Playwright for: {url}")
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox']
-                )
-                
-                context = await browser.new_context(
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                
-                page = await context.new_page()
-                
-                # Navigate to URL with timeout
-                await page.goto(url, wait_until='networkidle', timeout=30000)
-                
-                # Wait for main content to load
-                await page.wait_for_timeout(2000)
-                
-                # Get rendered HTML
-                html_content = await page.content()
-                
-                await browser.close()
-                
-                logger.info("Playwright fetch successful")
-                return html_content
-                
+            _emit(progress, "fetch_started", url=url, mode="rendered")
+            with timer.stage('render'):
+                async with self.admission.render.slot():
+                    html_content = await self.browser_pool.render(url)
+            timer.count_bytes('rendered', len(html_content.encode('utf-8')))
+            timer.set('fetch_mode', 'rendered')
+            AUDIT_FETCHES.inc(mode='rendered')
+
+            logger.info("Playwright fetch successful")
+            _emit(progress, "fetched", mode="rendered", bytes=len(html_content))
+            with timer.stage('analysis'):
+                analysis = await self.analysis_executor.analyze(url, html_content)
+            _record_analysis(timer, analysis)
+            if check_links:
+                await self._check_links(analysis, progress, timer)
+            return html_content, analysis, response
+
         except Exception as e:
             logger.error(f"Error fetching website: {e}")
-            return None
+            return None, None, response
     
     async def quick_audit(self, url: str) -> Dict[str, Any]:
         """Run a quick audit without AI recommendations (faster)"""
@@ -145,15 +433,12 @@ class AuditEngine:
             if not parsed_url.scheme:
                 url = f"https://{url}"
             
-            html_content = await self._fetch_website_content(url)
+            _, analysis, _ = await self._fetch_and_analyze(url, check_links=False)
             
-            if not html_content:
+            if not analysis:
                 raise Exception("Failed to fetch website content")
             
-            # Run analyzers
-            seo_results = await self.seo_analyzer.analyze(url, html_content)
-            aeo_results = await self.aeo_analyzer.analyze(url, html_content)
-            geo_results = await self.geo_analyzer.analyze(url, html_content)
+            seo_results, aeo_results, geo_results = analysis['seo'], analysis['aeo'], analysis['geo']
             
             return {
                 "url": url,
@@ -0,0 +1,155 @@
+"""
+Audit Events Module
+In-process broker that streams audit stage events to Server-Sent Events subscribers
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = ('completed', 'failed')
+
+# (event id, event name, payload)
+Event = Tuple[int, str, Dict[str, Any]]
+
+# Stage callback handed to AuditEngine.run_audit: progress(stage, data)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+# Stored state of an audit for watch(): (status, terminal event payload), None once it is gone
+StateLoader = Callable[[], Awaitable[Optional[Tuple[str, Dict[str, Any]]]]]
+
+
+def format_sse(event: Event) -> str:
+    """Encode an event as a text/event-stream message"""
+    event_id, name, data = event
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class AuditEventBroker:
+    """
+    Keeps the event history of every running audit and fans new events out to the
+    subscribers of that audit. History is replayed to late subscribers (and to
+    reconnects via Last-Event-ID) and dropped `retention` seconds after the audit
+    reaches a terminal event. Subscribers going away never affects the audit itself.
+    Audits that are not live here are followed through their stored state (see watch).
+    """
+
+    def __init__(
+        self,
+        retention: Optional[float] = None,
+        keepalive: float = 15.0,
+        poll_interval: Optional[float] = None,
+        watch_timeout: Optional[float] = None
+    ):
+        self.retention = retention if retention is not None else float(os.environ.get('AUDIT_EVENTS_RETENTION_SECONDS', 300))
+        self.keepalive = keepalive
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.environ.get('AUDIT_EVENTS_POLL_SECONDS', 2))
+        self.watch_timeout = watch_timeout if watch_timeout is not None else float(os.environ.get('AUDIT_EVENTS_WATCH_TIMEOUT_SECONDS', 600))
+        self._history: Dict[str, List[Event]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._expires: Dict[str, float] = {}
+
+    def publish(self, audit_id: str, event: str, data: Optional[Dict[str, Any]] = None):
+        """Record an event and push it to everyone streaming this audit"""
+        self._prune()
+        history = self._history.setdefault(audit_id, [])
+        message = (len(history) + 1, event, data or {})
+        history.append(message)
+
+        for queue in self._subscribers.get(audit_id, ()):
+            queue.put_nowait(message)
+
+        if event in TERMINAL_EVENTS:
+            self._expires[audit_id] = time.monotonic() + self.retention
+
+    def progress(self, audit_id: str) -> ProgressCallback:
+        """Stage callback that publishes to one audit's stream"""
+        return lambda stage, data: self.publish(audit_id, stage, data)
+
+    def has_events(self, audit_id: str) -> bool:
+        return audit_id in self._history
+
+    async def stream(self, audit_id: str, last_event_id: int = 0) -> AsyncIterator[str]:
+        """
+        Yield SSE messages for an audit: the recorded history after last_event_id, then
+        live events until a terminal one, with keep-alive comments while idle
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(audit_id, set()).add(queue)
+        sent = last_event_id
+        try:
+            for message in list(self._history.get(audit_id, [])):
+                if message[0] > sent:
+                    sent = message[0]
+                    yield format_sse(message)
+                    if message[1] in TERMINAL_EVENTS:
+                        return
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message[0] <= sent:
+                    continue
+                sent = message[0]
+                yield format_sse(message)
+                if message[1] in TERMINAL_EVENTS:
+                    return
+        finally:
+            subscribers = self._subscribers.get(audit_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[audit_id]
+
+    async def watch(
+        self,
+        audit_id: str,
+        load: StateLoader,
+        state: Optional[Tuple[str, Dict[str, Any]]],
+        last_event_id: int = 0
+    ) -> AsyncIterator[str]:
+        """
+        Yield SSE messages for an audit with no events on this instance, starting from its
+        stored `state`: a terminal state is sent as the only event. Otherwise the record is
+        re-read every `poll_interval` seconds (it may be running on another instance) until
+        it is terminal, its events show up here, or `watch_timeout` passes; a job lost in a
+        crash never gets a terminal state, so the stream then ends with a "timeout" event.
+        """
+        deadline = time.monotonic() + self.watch_timeout
+        while True:
+            if state is None:
+                return
+            status, data = state
+            if status in TERMINAL_EVENTS:
+                yield format_sse((last_event_id + 1, status, data))
+                return
+            if time.monotonic() >= deadline:
+                yield format_sse((last_event_id + 1, 'timeout', {"status": status}))
+                return
+            yield ": keep-alive\n\n"
+            await asyncio.sleep(self.poll_interval)
+            if self.has_events(audit_id):
+                async for message in self.stream(audit_id, last_event_id):
+                    yield message
+                return
+            state = await load()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "audits": len(self._history),
+            "subscribers": sum(len(s) for s in self._subscribers.values())
+        }
+
+    def _prune(self):
+        now = time.monotonic()
+        for audit_id in [a for a, expires in self._expires.items() if expires <= now]:
+            del self._expires[audit_id]
+            self._history.pop(audit_id, None)
@@ -0,0 +1,109 @@
+"""
+Audit Jobs Module
+Bounded background queue so audit requests return immediately instead of holding the connection
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when no more audits can be accepted right now"""
+
+
+class AuditJobQueue:
+    """
+    Fixed pool of worker tasks draining a bounded asyncio queue.
+    The handler receives the job id plus the keyword arguments given to submit and is
+    responsible for persisting status transitions (pending -> running -> completed/failed).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.handler = handler
+        self.workers = workers or int(os.environ.get('AUDIT_WORKERS', 4))
+        self.max_pending = max_pending or int(os.environ.get('AUDIT_QUEUE_MAX', 100))
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Ids of the jobs the workers are running right now
+        self._running_ids: Set[str] = set()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def has_capacity(self) -> bool:
+        return self.pending < self.max_pending
+
+    async def start(self):
+        """Spawn the worker tasks"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Audit job queue started ({self.workers} workers, {self.max_pending} max pending)")
+
+    async def stop(self) -> List[str]:
+        """
+        Cancel the workers and drop the jobs still queued. Returns the ids of every job
+        that will not finish (interrupted or never started) so the caller can mark them failed.
+        """
+        # Collected before cancelling: the workers' finally blocks clear it
+        interrupted = list(self._running_ids)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            job_id, _ = self._queue.get_nowait()
+            interrupted.append(job_id)
+        if interrupted:
+            logger.warning(f"Audit job queue stopped with {len(interrupted)} jobs unfinished")
+        return interrupted
+
+    def submit(self, job_id: str, **kwargs):
+        """Enqueue a job without waiting; raises QueueFullError when the queue is at capacity"""
+        if self._queue is None:
+            raise RuntimeError("Audit job queue is not started")
+        try:
+            self._queue.put_nowait((job_id, kwargs))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Audit queue is full ({self.max_pending} pending)")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job_id, kwargs = await self._queue.get()
+            self.running += 1
+            self._running_ids.add(job_id)
+            try:
+                await self.handler(job_id, **kwargs)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Audit job {job_id} failed in worker {index}: {e}")
+            finally:
+                self.running -= 1
+                self._running_ids.discard(job_id)
+                self._queue.task_done()
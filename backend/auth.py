@@ -10,6 +10,8 @@ import httpx
 from fastapi import HTTPException, Request, Response, Cookie
 import logging
 
+from session_cache import MISS, get_session_cache, join_lookup_enabled
+
 logger = logging.getLogger(__name__)
 
 # Emergent Auth Configuration
@@ -113,35 +115,53 @@ async def create_session(db, user_id: str, session_token: str) -> UserSession:
     }
     
     await db.user_sessions.insert_one(session_doc)
+    # The token may have been probed (and cached as unknown) before the session existed
+    get_session_cache().invalidate(session_token)
     return UserSession(**session_doc)
 
 
 async def get_user_from_session(db, session_token: str) -> Optional[User]:
     """
     Get user from session_token
-    Checks cookie first, then Authorization header
+    Served from the session cache when possible; a miss costs one join query (or two
+    lookups with SESSION_LOOKUP_JOIN=0)
     """
     if not session_token:
         return None
     
+    cache = get_session_cache()
+    cached = cache.get(session_token)
+    if cached is not MISS:
+        return cached
+    generation = cache.generation
+    
     # Find valid session
-    session = await db.user_sessions.find_one({
+    query = {
         "session_token": session_token,
         "expires_at": {"$gt": datetime.now(timezone.utc)}
-    })
-    
-    if not session:
-        return None
-    
-    # Get user
-    user_doc = await db.users.find_one({"_id": session["user_id"]})
+    }
+    if join_lookup_enabled():
+        sessions = await db.user_sessions.aggregate([
+            {"$match": query},
+            {"$limit": 1},
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "users"}}
+        ]).to_list(1)
+        session = sessions[0] if sessions else None
+        user_doc = session["users"][0] if session and session["users"] else None
+    else:
+        session = await db.user_sessions.find_one(query)
+        # Get user
+        user_doc = await db.users.find_one({"_id": session["user_id"]}) if session else None
     
-    if not user_doc:
+    if not session or not user_doc:
+        cache.set_missing(session_token, generation)
         return None
     
     # Map _id to id for Pydantic
     user_doc["id"] = str(user_doc.pop("_id"))
-    return User(**user_doc)
+    user = User(**user_doc)
+    cache.set(session_token, user, session["expires_at"], generation)
+    return user
 
 
 async def delete_session(db, session_token: str) -> bool:
@@ -149,6 +169,7 @@ async def delete_session(db, session_token: str) -> bool:
     Delete session from database (logout)
     """
     result = await db.user_sessions.delete_one({"session_token": session_token})
+    get_session_cache().invalidate(session_token)
     return result.deleted_count > 0
 
 
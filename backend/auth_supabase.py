@@ -10,7 +10,8 @@ from datetime import datetime, timezone, timedelta
 import httpx
 from fastapi import HTTPException, Request, Response
 import logging
-from supabase_client import get_supabase_client
+from session_cache import MISS, get_session_cache, join_lookup_enabled
+from supabase_repository import get_repository
 
 logger = logging.getLogger(__name__)
 
@@ -75,15 +76,14 @@ async def create_or_update_user(user_data: SessionResponse) -> User:
     """
     Create new user or return existing user in Supabase
     """
-    supabase = get_supabase_client()
+    repository = get_repository()
     
     try:
         # Check if user exists
-        result = supabase.table('users').select('*').eq('email', user_data.email).execute()
+        user_doc = await repository.get_user_by_email(user_data.email)
         
-        if result.data and len(result.data) > 0:
+        if user_doc:
             # User exists, return it
-            user_doc = result.data[0]
             return User(
                 id=user_doc['id'],
                 email=user_doc['email'],
@@ -101,12 +101,11 @@ async def create_or_update_user(user_data: SessionResponse) -> User:
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         
-        result = supabase.table('users').insert(user_doc).execute()
+        created_user = await repository.insert_user(user_doc)
         
-        if not result.data:
+        if not created_user:
             raise HTTPException(status_code=500, detail="Failed to create user")
         
-        created_user = result.data[0]
         return User(
             id=created_user['id'],
             email=created_user['email'],
@@ -124,8 +123,6 @@ async def create_session(user_id: str, session_token: str) -> UserSession:
     """
     Create a new session in Supabase with 7-day expiry
     """
-    supabase = get_supabase_client()
-    
     try:
         session_doc = {
             "user_id": user_id,
@@ -134,12 +131,14 @@ async def create_session(user_id: str, session_token: str) -> UserSession:
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         
-        result = supabase.table('user_sessions').insert(session_doc).execute()
+        session = await get_repository().insert_session(session_doc)
         
-        if not result.data:
+        if not session:
             raise HTTPException(status_code=500, detail="Failed to create session")
         
-        session = result.data[0]
+        # The token may have been probed (and cached as unknown) before the session existed
+        get_session_cache().invalidate(session_token)
+        
         return UserSession(
             user_id=session['user_id'],
             session_token=session['session_token'],
@@ -155,37 +154,44 @@ async def create_session(user_id: str, session_token: str) -> UserSession:
 async def get_user_from_session(session_token: str) -> Optional[User]:
     """
     Get user from session_token in Supabase
+    Served from the session cache when possible; a miss costs one embedded select (or two
+    lookups with SESSION_LOOKUP_JOIN=0)
     """
     if not session_token:
         return None
     
-    supabase = get_supabase_client()
+    repository = get_repository()
+    cache = get_session_cache()
+    cached = cache.get(session_token)
+    if cached is not MISS:
+        return cached
+    generation = cache.generation
     
     try:
         # Find valid session
         now = datetime.now(timezone.utc).isoformat()
-        result = supabase.table('user_sessions').select('*').eq('session_token', session_token).gt('expires_at', now).execute()
-        
-        if not result.data or len(result.data) == 0:
-            return None
+        if join_lookup_enabled():
+            session = await repository.get_valid_session_with_user(session_token, now)
+            user_doc = session.get('users') if session else None
+        else:
+            session = await repository.get_valid_session(session_token, now)
+            # Get user
+            user_doc = await repository.get_user(session['user_id']) if session else None
         
-        session = result.data[0]
-        user_id = session['user_id']
-        
-        # Get user
-        user_result = supabase.table('users').select('*').eq('id', user_id).execute()
-        
-        if not user_result.data or len(user_result.data) == 0:
+        if not session or not user_doc:
+            cache.set_missing(session_token, generation)
             return None
         
-        user_doc = user_result.data[0]
-        return User(
+        user = User(
             id=user_doc['id'],
             email=user_doc['email'],
             full_name=user_doc.get('full_name'),
             avatar_url=user_doc.get('avatar_url'),
             created_at=datetime.fromisoformat(user_doc['created_at'].replace('Z', '+00:00'))
         )
+        expires_at = datetime.fromisoformat(session['expires_at'].replace('Z', '+00:00'))
+        cache.set(session_token, user, expires_at, generation)
+        return user
         
     except Exception as e:
         logger.error(f"Error getting user from session: {e}")
@@ -196,10 +202,9 @@ async def delete_session(session_token: str) -> bool:
     """
     Delete session from Supabase (logout)
     """
-    supabase = get_supabase_client()
-    
     try:
-        result = supabase.table('user_sessions').delete().eq('session_token', session_token).execute()
+        await get_repository().delete_session(session_token)
+        get_session_cache().invalidate(session_token)
         return True
     except Exception as e:
         logger.error(f"Error deleting session: {e}")
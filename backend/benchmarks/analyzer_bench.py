@@ -0,0 +1,187 @@
+"""
+Analyzer Benchmark
+Measures how parsing and the SEO/AEO/GEO analyzers scale with page size over the synthetic corpus
+
+For every corpus page it times:
+    static_check - the static-fetch content check (parse + DOM walk + text length)
+    seo / aeo / geo - each analyzer on an already-parsed document
+Wall time is the median of --repeats runs (perf_counter). A separate tracemalloc pass
+records peak allocated bytes, bytes still held afterwards and the allocated block delta.
+
+Usage:
+    python benchmarks/analyzer_bench.py --max-size 500kb --output results.json
+    python benchmarks/analyzer_bench.py --max-size 500kb --baseline results.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import bs4
+import lxml.etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import KINDS, SIZES, build_corpus, parse_size  # noqa: E402
+from parsed_document import ParsedDocument  # noqa: E402
+from seo_analyzer import SEOAnalyzer  # noqa: E402
+from aeo_analyzer import AEOAnalyzer  # noqa: E402
+from geo_analyzer import GEOAnalyzer  # noqa: E402
+
+URL = "https://bench.example.com/"
+
+ANALYZERS = {
+    'seo': SEOAnalyzer(),
+    'aeo': AEOAnalyzer(),
+    'geo': GEOAnalyzer()
+}
+
+TARGETS = ('static_check',) + tuple(ANALYZERS)
+
+
+def _parsed(html: str) -> ParsedDocument:
+    document = ParsedDocument(html)
+    document.compact_text_length
+    return document
+
+
+def make_job(target: str, html: str) -> Callable[[], Any]:
+    """The unit of work measured for a target; analyzers get a pre-walked document"""
+    if target == 'static_check':
+        return lambda: ParsedDocument(html).compact_text_length
+    analyzer = ANALYZERS[target]
+    document = _parsed(html)
+    return lambda: analyzer.analyze_document(URL, document)
+
+
+def time_job(job: Callable[[], Any], repeats: int) -> List[float]:
+    samples = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        job()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def trace_job(job: Callable[[], Any]) -> Dict[str, int]:
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = job()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    del result
+    return {
+        "peak_alloc_bytes": peak - baseline,
+        "retained_bytes": current - baseline,
+        "allocated_blocks": blocks_after - blocks_before
+    }
+
+
+def run(sizes, kinds, repeats: int, seed: int) -> Dict[str, Any]:
+    results = []
+    for name, kind, size, html in build_corpus(sizes, kinds, seed):
+        html_bytes = len(html.encode('utf-8'))
+        for target in TARGETS:
+            job = make_job(target, html)
+            samples = time_job(job, repeats)
+            results.append({
+                "page": name,
+                "kind": kind,
+                "html_bytes": html_bytes,
+                "target": target,
+                "wall_ms_median": round(statistics.median(samples) * 1000, 3),
+                "wall_ms_min": round(min(samples) * 1000, 3),
+                "mb_per_second": round(html_bytes / (1024 * 1024) / statistics.median(samples), 2),
+                **trace_job(job)
+            })
+            print(f"{name:<16} {target:<13} {results[-1]['wall_ms_median']:>10.1f} ms", file=sys.stderr)
+        del html
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "bs4": bs4.__version__,
+            "lxml": '.'.join(map(str, lxml.etree.LXML_VERSION)),
+            "repeats": repeats,
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    Rows whose median wall time grew by more than `threshold` (fraction) and more than
+    `min_delta_ms` versus the baseline run; pages missing from either side are skipped
+    """
+    previous = {(row['page'], row['target']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        before = previous.get((row['page'], row['target']))
+        if before is None or before['wall_ms_median'] <= 0:
+            continue
+        ratio = row['wall_ms_median'] / before['wall_ms_median']
+        if ratio > 1 + threshold and row['wall_ms_median'] - before['wall_ms_median'] > min_delta_ms:
+            regressions.append({
+                "page": row['page'],
+                "target": row['target'],
+                "baseline_ms": before['wall_ms_median'],
+                "current_ms": row['wall_ms_median'],
+                "ratio": round(ratio, 2)
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-size', default='20mb', help='skip corpus sizes above this (e.g. 500kb)')
+    parser.add_argument('--kinds', default=','.join(KINDS), help='comma-separated page kinds')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per page and target')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed')
+    parser.add_argument('--output', help='write the JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='compare against a previous JSON results file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore slowdowns smaller than this')
+    args = parser.parse_args(argv)
+
+    max_size = parse_size(args.max_size)
+    sizes = [size for size in SIZES if size <= max_size]
+    kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+
+    current = run(sizes, kinds, args.repeats, args.seed)
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(current, baseline, args.threshold, args.min_delta_ms)
+        current['comparison'] = {"baseline": args.baseline, "threshold": args.threshold, "regressions": regressions}
+        for regression in regressions:
+            print(f"REGRESSION {regression['page']} {regression['target']}: "
+                  f"{regression['baseline_ms']} -> {regression['current_ms']} ms (x{regression['ratio']})", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(current, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Synthetic HTML Corpus
+Deterministic generated pages (5 KB to 20 MB) that stress different parts of the analyzers
+
+Every page is a full document with head metadata, so all analyzer code paths run, and is
+padded with one kind of content until it reaches the requested size:
+
+    nested   - deeply nested <div> chains with a little text at each level
+    links    - thousands of internal and external links
+    images   - thousands of <img> tags, some without alt text
+    json_ld  - one huge JSON-LD blob plus a few normal ones
+    text     - long paragraphs and headings (FAQ-like questions included)
+    mixed    - all of the above interleaved
+"""
+
+import json
+import random
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+KB = 1024
+MB = 1024 * KB
+
+SIZES = (5 * KB, 50 * KB, 500 * KB, 5 * MB, 20 * MB)
+KINDS = ('nested', 'links', 'images', 'json_ld', 'text', 'mixed')
+
+WORDS = (
+    "plumbing service local emergency repair water heater installation quality licensed "
+    "insured family owned since downtown city county free estimate call today reviews "
+    "customers trusted experience professional team drain cleaning leak detection"
+).split()
+
+HEAD = """<!DOCTYPE html>
+<html lang="en"><head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Acme Plumbing - Emergency Plumbers in Springfield</title>
+<meta name="description" content="Licensed emergency plumbers serving Springfield and the surrounding county with 24/7 repairs and free estimates.">
+<meta property="og:title" content="Acme Plumbing">
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "LocalBusiness", "name": "Acme Plumbing", "address": {"@type": "PostalAddress", "streetAddress": "1 Main St", "addressLocality": "Springfield"}, "telephone": "+1-555-0100"}</script>
+</head><body>
+<header><nav><a href="/about">About us</a> <a href="/contact">Contact</a></nav></header>
+<h1>Acme Plumbing</h1>
+"""
+
+FOOT = """<footer><p>Acme Plumbing, 1 Main St, Springfield. Call (555) 010-0100.</p>
+<iframe src="https://www.google.com/maps/embed?pb=acme"></iframe></footer>
+</body></html>
+"""
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _nested(rng: random.Random, i: int) -> str:
+    depth = 200
+    return ('<div class="level">' * depth) + f"<p>{_sentence(rng)}</p>" + ('</div>' * depth)
+
+
+def _links(rng: random.Random, i: int) -> str:
+    links = []
+    for j in range(20):
+        if rng.random() < 0.3:
+            links.append(f'<a href="https://partner{j}.example.org/page/{i}">Partner {j}</a>')
+        else:
+            links.append(f'<a href="/services/{i}/{j}">{rng.choice(WORDS)} {j}</a>')
+    return '<ul>' + ''.join(f'<li>{link}</li>' for link in links) + '</ul>'
+
+
+def _images(rng: random.Random, i: int) -> str:
+    images = []
+    for j in range(20):
+        alt = f' alt="{rng.choice(WORDS)} photo {j}"' if rng.random() < 0.7 else ''
+        images.append(f'<img src="/img/{i}/{j}.jpg"{alt} width="300" height="200">')
+    return '<div class="gallery">' + ''.join(images) + '</div>'
+
+
+def _json_ld_item(rng: random.Random, i: int) -> Dict:
+    return {
+        "@type": "Question",
+        "name": f"{_sentence(rng, 8)[:-1]}?",
+        "acceptedAnswer": {"@type": "Answer", "text": _sentence(rng, 30)}
+    }
+
+
+def _text(rng: random.Random, i: int) -> str:
+    heading = f"<h2>How much does {rng.choice(WORDS)} {rng.choice(WORDS)} cost?</h2>" if i % 5 == 0 else ''
+    return heading + '<p>' + ' '.join(_sentence(rng) for _ in range(8)) + '</p>'
+
+
+def _mixed(rng: random.Random, i: int) -> str:
+    return (_nested, _links, _images, _text)[i % 4](rng, i)
+
+
+BLOCKS: Dict[str, Callable[[random.Random, int], str]] = {
+    'nested': _nested,
+    'links': _links,
+    'images': _images,
+    'text': _text,
+    'mixed': _mixed
+}
+
+
+def generate_page(kind: str, size: int, seed: int = 0) -> str:
+    """Build one page of the given kind, padded to roughly `size` bytes of UTF-8"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown corpus page kind: {kind}")
+    rng = random.Random(f"{kind}:{size}:{seed}")
+    budget = size - len(HEAD) - len(FOOT)
+
+    if kind == 'json_ld':
+        # One FAQPage blob filling the page; JSON-LD parsing and traversal dominate
+        items: List[Dict] = []
+        used = 0
+        while used < budget:
+            item = _json_ld_item(rng, len(items))
+            used += len(json.dumps(item)) + 2
+            items.append(item)
+        blob = json.dumps({"@context": "https://schema.org", "@type": "FAQPage", "mainEntity": items})
+        body = f'<script type="application/ld+json">{blob}</script><p>{_sentence(rng)}</p>'
+        return HEAD + body + FOOT
+
+    block = BLOCKS[kind]
+    parts: List[str] = []
+    used = 0
+    i = 0
+    while used < budget:
+        part = block(rng, i)
+        parts.append(part)
+        used += len(part)
+        i += 1
+    return HEAD + ''.join(parts) + FOOT
+
+
+def build_corpus(sizes: Sequence[int] = SIZES, kinds: Sequence[str] = KINDS, seed: int = 0) -> Iterator[Tuple[str, str, int, str]]:
+    """Yield (name, kind, target size, html) for every kind/size combination, lazily"""
+    for size in sizes:
+        for kind in kinds:
+            yield f"{kind}-{format_size(size)}", kind, size, generate_page(kind, size, seed)
+
+
+def format_size(size: int) -> str:
+    if size >= MB:
+        return f"{size // MB}mb"
+    return f"{size // KB}kb"
+
+
+def parse_size(text: str) -> int:
+    """'5kb' / '20mb' / '1024' -> bytes"""
+    text = text.strip().lower()
+    for suffix, unit in (('mb', MB), ('kb', KB)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * unit)
+    return int(text)
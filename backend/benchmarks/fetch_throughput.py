@@ -0,0 +1,122 @@
+"""
+Static Fetch Throughput Benchmark
+Compares concurrent-audit throughput of the old blocking requests.get fetch with HTTPFetcher
+
+Usage:
+    python benchmarks/fetch_throughput.py --audits 50 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from http_fetcher import HTTPFetcher, USER_AGENT  # noqa: E402
+
+PAGE = ("<html><head><title>Benchmark page</title></head><body>"
+        + "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>" * 200
+        + "</body></html>").encode()
+
+
+def start_origin(delay: float) -> ThreadingHTTPServer:
+    """Serve the same page on a random local port with an artificial response delay"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Record how late a 10ms timer fires, a proxy for how blocked the event loop is"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - started - 0.01)
+
+
+async def run_blocking(url: str, audits: int) -> None:
+    """The pre-HTTPFetcher code path: a synchronous request inside a coroutine"""
+
+    async def fetch():
+        response = requests.get(url, timeout=10, headers={'User-Agent': USER_AGENT})
+        return response.text
+
+    await asyncio.gather(*(fetch() for _ in range(audits)))
+
+
+async def run_pooled(url: str, audits: int) -> None:
+    fetcher = HTTPFetcher(per_host_limit=audits)
+    try:
+        await asyncio.gather(*(fetcher.get(url) for _ in range(audits)))
+    finally:
+        await fetcher.stop()
+
+
+async def bench(name: str, runner, url: str, audits: int) -> dict:
+    stop = asyncio.Event()
+    lag_samples = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+    started = time.perf_counter()
+    await runner(url, audits)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    return {
+        "mode": name,
+        "audits": audits,
+        "seconds": round(elapsed, 3),
+        "audits_per_second": round(audits / elapsed, 2),
+        "max_loop_lag_ms": round(max(lag_samples, default=0) * 1000, 1)
+    }
+
+
+async def main(audits: int, delay: float):
+    server = start_origin(delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        results = [
+            await bench("blocking_requests", run_blocking, url, audits),
+            await bench("pooled_httpx", run_pooled, url, audits)
+        ]
+    finally:
+        server.shutdown()
+
+    before, after = results
+    print(json.dumps({
+        "results": results,
+        "speedup": round(after["audits_per_second"] / before["audits_per_second"], 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audits', type=int, default=50, help='number of concurrent audits to simulate')
+    parser.add_argument('--delay', type=float, default=0.2, help='origin response delay in seconds')
+    args = parser.parse_args()
+    asyncio.run(main(args.audits, args.delay))
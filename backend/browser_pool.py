@@ -0,0 +1,283 @@
+"""
+Browser Pool Module
+Keeps long-lived Playwright Chromium instances and hands out isolated contexts per audit
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Set
+
+import psutil
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+LAUNCH_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
+
+
+def _is_chromium(process: psutil.Process) -> bool:
+    name = process.name()
+    return 'chrom' in name.lower() or 'headless_shell' in name
+
+
+def _browser_root_pids() -> Set[int]:
+    """PIDs of the Chromium main processes spawned by this server (not their renderers)"""
+    roots = set()
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if _is_chromium(child):
+                    parent = child.parent()
+                    if parent is None or not _is_chromium(parent):
+                        roots.add(child.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error as e:
+        logger.debug(f"Unable to list browser processes: {e}")
+    return roots
+
+
+def _process_tree_memory_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants, None if it is gone"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+class _BrowserSlot:
+    """A launched browser plus the bookkeeping needed to recycle it"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retired = False
+        self.crashed = False
+        # Chromium main process, when it could be identified at launch
+        self.pid: Optional[int] = None
+        # Last sample of the browser's process tree, updated by the pool's memory sampler
+        self.memory_mb = 0.0
+
+
+class BrowserPool:
+    """
+    Shared Chromium pool for rendering JavaScript-heavy sites.
+    One browser serves many isolated contexts; it is replaced after a number of pages,
+    when Chromium memory grows past a threshold, or when the browser process dies.
+
+    Memory is sampled every `memory_check_interval` seconds in a worker thread, for the
+    current browser's process tree only (retiring browsers do not count against it), so
+    checking out a context never waits on a process walk.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_pages_per_browser: Optional[int] = None,
+        max_memory_mb: Optional[int] = None,
+        memory_check_interval: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency or int(os.environ.get('BROWSER_POOL_MAX_CONCURRENCY', 4))
+        self.max_pages_per_browser = max_pages_per_browser or int(os.environ.get('BROWSER_POOL_MAX_PAGES', 100))
+        # 0 disables the memory-based recycling
+        self.max_memory_mb = max_memory_mb if max_memory_mb is not None else int(os.environ.get('BROWSER_POOL_MAX_MEMORY_MB', 1024))
+        self.memory_check_interval = memory_check_interval or float(os.environ.get('BROWSER_POOL_MEMORY_CHECK_SECONDS', 5))
+
+        self._playwright = None
+        self._slot: Optional[_BrowserSlot] = None
+        # Retired or crashed browsers that still have contexts checked out
+        self._retiring: List[_BrowserSlot] = []
+        # Closes of idle retired browsers, referenced until they finish
+        self._closing: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._started = False
+        self._memory_sampler: Optional[asyncio.Task] = None
+
+        self.restarts = 0
+        self.recycles = 0
+        self.pages_served = 0
+
+    @property
+    def active(self) -> int:
+        """Number of contexts currently checked out"""
+        current = self._slot.active if self._slot else 0
+        return current + sum(slot.active for slot in self._retiring)
+
+    async def start(self):
+        """Start Playwright and launch the first browser"""
+        async with self._lock:
+            if self._started:
+                return
+            self._playwright = await async_playwright().start()
+            self._started = True
+            self._slot = await self._launch()
+            if self.max_memory_mb:
+                self._memory_sampler = asyncio.create_task(self._sample_memory())
+            logger.info(f"Browser pool started (concurrency={self.max_concurrency})")
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        async with self._lock:
+            if not self._started:
+                return
+            if self._memory_sampler is not None:
+                self._memory_sampler.cancel()
+                self._memory_sampler = None
+            slots = self._retiring + ([self._slot] if self._slot else [])
+            self._slot = None
+            self._retiring = []
+            for slot in slots:
+                await self._close_slot(slot)
+            if self._closing:
+                await asyncio.gather(*self._closing, return_exceptions=True)
+            await self._playwright.stop()
+            self._playwright = None
+            self._started = False
+            logger.info("Browser pool stopped")
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Check out an isolated browser context, waiting if the pool is at capacity"""
+        context_options.setdefault('user_agent', USER_AGENT)
+
+        async with self._semaphore:
+            slot = await self._acquire_slot()
+            context: Optional[BrowserContext] = None
+            try:
+                context = await slot.browser.new_context(**context_options)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.debug(f"Ignoring error while closing context: {e}")
+                await self._release_slot(slot)
+
+    async def render(self, url: str, timeout: int = 30000, settle_ms: int = 2000) -> str:
+        """Render a URL in a fresh context and return the resulting HTML"""
+        async with self.context() as context:
+            page = await context.new_page()
+
+            # Navigate to URL with timeout
+            await page.goto(url, wait_until='networkidle', timeout=timeout)
+
+            # Wait for main content to load
+            await page.wait_for_timeout(settle_ms)
+
+            return await page.content()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and lifecycle counters"""
+        return {
+            "started": self._started,
+            "capacity": self.max_concurrency,
+            "active": self.active,
+            "retiring": len(self._retiring),
+            "pages_served": self.pages_served,
+            "recycles": self.recycles,
+            "restarts": self.restarts
+        }
+
+    async def _launch(self) -> _BrowserSlot:
+        known = await asyncio.to_thread(_browser_root_pids) if self.max_memory_mb else set()
+        browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        slot = _BrowserSlot(browser)
+        if self.max_memory_mb:
+            launched = await asyncio.to_thread(_browser_root_pids) - known
+            if len(launched) == 1:
+                slot.pid = launched.pop()
+            else:
+                logger.debug("Could not identify the launched browser process, its memory is not tracked")
+        browser.on("disconnected", lambda _: self._on_disconnected(slot))
+        return slot
+
+    def _on_disconnected(self, slot: _BrowserSlot):
+        if slot.retired or slot.crashed:
+            return
+        logger.warning("Pooled browser disconnected unexpectedly, it will be relaunched")
+        slot.crashed = True
+        self.restarts += 1
+        if self._slot is slot:
+            self._slot = None
+        # Its checked-out contexts stay counted until they are released
+        if slot.active > 0 and slot not in self._retiring:
+            self._retiring.append(slot)
+
+    async def _acquire_slot(self) -> _BrowserSlot:
+        if not self._started:
+            await self.start()
+
+        async with self._lock:
+            slot = self._slot
+            if slot is not None and (slot.crashed or not slot.browser.is_connected()):
+                self._on_disconnected(slot)
+                self._slot = slot = None
+
+            if slot is not None and self._needs_recycle(slot):
+                self._retire(slot)
+                self.recycles += 1
+                self._slot = slot = None
+
+            if slot is None:
+                slot = self._slot = await self._launch()
+
+            slot.active += 1
+            slot.pages_served += 1
+            self.pages_served += 1
+            return slot
+
+    async def _release_slot(self, slot: _BrowserSlot):
+        slot.active -= 1
+        if (slot.retired or slot.crashed) and slot.active == 0 and slot in self._retiring:
+            self._retiring.remove(slot)
+            await self._close_slot(slot)
+
+    def _retire(self, slot: _BrowserSlot):
+        slot.retired = True
+        if slot.active == 0:
+            task = asyncio.ensure_future(self._close_slot(slot))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            self._retiring.append(slot)
+
+    def _needs_recycle(self, slot: _BrowserSlot) -> bool:
+        if slot.pages_served >= self.max_pages_per_browser:
+            logger.info(f"Recycling browser after {slot.pages_served} pages")
+            return True
+        if self.max_memory_mb and slot.memory_mb > self.max_memory_mb:
+            logger.info(f"Recycling browser at {slot.memory_mb:.0f} MB, above the {self.max_memory_mb} MB threshold")
+            return True
+        return False
+
+    async def _sample_memory(self):
+        """Refresh the current browser's memory reading off the lock and the event loop"""
+        while True:
+            await asyncio.sleep(self.memory_check_interval)
+            slot = self._slot
+            if slot is None or slot.pid is None or slot.retired:
+                continue
+            memory_mb = await asyncio.to_thread(_process_tree_memory_mb, slot.pid)
+            if memory_mb is not None:
+                slot.memory_mb = memory_mb
+
+    async def _close_slot(self, slot: _BrowserSlot):
+        slot.retired = True
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing browser: {e}")
@@ -0,0 +1,118 @@
+"""
+DOM Visitor Module
+Walks a parsed page once and dispatches matching nodes to every registered selector
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+
+logger = logging.getLogger(__name__)
+
+
+class Selector:
+    """
+    A named query an analyzer wants answered during the shared DOM walk.
+    names restricts the tag names (None matches every tag). attrs maps an attribute to
+    True (attribute present), a string (exact value) or a compiled regex (searched),
+    mirroring the BeautifulSoup find_all semantics the analyzers were written against.
+    """
+
+    def __init__(self, key: str, names: Optional[Union[str, Iterable[str]]] = None, attrs: Optional[Dict[str, Any]] = None):
+        self.key = key
+        self.names = (names,) if isinstance(names, str) else (tuple(names) if names else None)
+        self.attrs = attrs or {}
+
+    def matches(self, tag: Tag) -> bool:
+        for attr, expected in self.attrs.items():
+            if not _attr_matches(tag.get(attr), expected):
+                return False
+        return True
+
+
+class VisitResult:
+    """Everything collected by one walk"""
+
+    def __init__(self):
+        self.by_name: Dict[str, List[Tag]] = defaultdict(list)
+        self.tags: List[Tag] = []
+        self.matches: Dict[str, List[Tag]] = {}
+        self.strings: List[str] = []
+
+
+class DOMVisitor:
+    """Single-pass walker; cost is proportional to document size, not to the number of selectors"""
+
+    def __init__(self, selectors: Iterable[Selector] = ()):
+        self._by_name: Dict[str, List[Selector]] = defaultdict(list)
+        self._any_name: List[Selector] = []
+        self._keys: List[str] = []
+        for selector in selectors:
+            self.register(selector)
+
+    def register(self, selector: Selector):
+        """Add a selector; its matches are reported under selector.key"""
+        self._keys.append(selector.key)
+        if selector.names is None:
+            self._any_name.append(selector)
+        else:
+            for name in selector.names:
+                self._by_name[name].append(selector)
+
+    def visit(self, soup: BeautifulSoup) -> VisitResult:
+        """Walk the tree once, indexing tags by name, collecting text and dispatching selector matches"""
+        result = VisitResult()
+        result.matches = {key: [] for key in self._keys}
+        string_types = soup.interesting_string_types
+        by_name = self._by_name
+        any_name = self._any_name
+
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                result.tags.append(node)
+                result.by_name[node.name].append(node)
+                for selector in by_name.get(node.name, ()):
+                    if selector.matches(node):
+                        result.matches[selector.key].append(node)
+                for selector in any_name:
+                    if selector.matches(node):
+                        result.matches[selector.key].append(node)
+            elif type(node) in string_types:
+                result.strings.append(node)
+
+        result.by_name = dict(result.by_name)
+        return result
+
+
+def _attr_matches(value: Any, expected: Any) -> bool:
+    if expected is True:
+        return value is not None
+    if value is None:
+        return False
+
+    # Multi-valued attributes (class, rel) match on any single value or the joined string
+    candidates = value + [' '.join(value)] if isinstance(value, list) else [value]
+    if hasattr(expected, 'search'):
+        return any(expected.search(candidate) for candidate in candidates)
+    return any(candidate == expected for candidate in candidates)
+
+
+# Selectors declared by analyzer modules at import time; every ParsedDocument answers
+# all of them in its single walk
+_registered_selectors: Dict[str, Selector] = {}
+
+
+def register_selectors(*selectors: Selector):
+    """Register analyzer selectors so they are collected during the shared walk"""
+    for selector in selectors:
+        _registered_selectors[selector.key] = selector
+
+
+def registered_selectors() -> List[Selector]:
+    return list(_registered_selectors.values())
+
+
+def get_selector(key: str) -> Optional[Selector]:
+    return _registered_selectors.get(key)
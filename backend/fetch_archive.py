@@ -0,0 +1,289 @@
+"""
+Fetch Archive Module
+Records static and rendered fetches into a HAR file and replays them with no network I/O
+
+AUDIT_FETCH_MODE selects the backend used by AuditEngine:
+    live    - fetch from the network (default)
+    record  - fetch from the network and write every page to AUDIT_ARCHIVE_PATH
+    replay  - serve pages only from AUDIT_ARCHIVE_PATH; unrecorded URLs fail the fetch
+
+Re-analyze every page of an archive offline (e.g. to compare analyzer changes):
+    python fetch_archive.py archive.har > scores.jsonl
+"""
+
+import base64
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from http_fetcher import FetchResult
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODES = ('live', 'record', 'replay')
+
+STATIC = 'static'
+RENDERED = 'rendered'
+
+
+class ArchiveMiss(Exception):
+    """Raised in replay mode for a URL the archive has no recording of"""
+
+
+def _har_headers(headers: Dict[str, str]):
+    return [{"name": name, "value": value} for name, value in headers.items()]
+
+
+class FetchArchive:
+    """
+    HAR 1.2 log of fetched pages keyed by (fetch mode, normalized URL).
+    Rendered pages are stored as regular entries marked with the custom `_fetchMode`
+    field. The file is written atomically on save(); the last recording of a URL wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> 'FetchArchive':
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                log = json.load(f)['log']
+            for entry in log.get('entries', []):
+                mode = entry.get('_fetchMode', STATIC)
+                self._entries[(mode, normalize_url(entry['request']['url']))] = entry
+            logger.info(f"Loaded {len(self._entries)} recorded fetches from {self.path}")
+        return self
+
+    def save(self):
+        """Write the archive (atomically) if anything was recorded since the last save"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        log = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "sage-audit-engine", "version": "1.0"},
+                "entries": list(self._entries.values())
+            }
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.har.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(log, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        logger.info(f"Saved {len(self._entries)} recorded fetches to {self.path}")
+
+    def record(
+        self,
+        mode: str,
+        url: str,
+        status_code: int,
+        content: bytes,
+        headers: Dict[str, str],
+        final_url: Optional[str] = None,
+        http_version: str = 'HTTP/1.1',
+        text: Optional[str] = None
+    ):
+        """Store a page; `text` is the decoded body the analyzers saw, kept so replay is identical"""
+        if text is not None:
+            content_field = {"text": text}
+        else:
+            try:
+                content_field = {"text": content.decode('utf-8')}
+            except UnicodeDecodeError:
+                content_field = {"text": base64.b64encode(content).decode('ascii'), "encoding": "base64"}
+
+        self._entries[(mode, normalize_url(url))] = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": 0,
+            "request": {"method": "GET", "url": url, "httpVersion": http_version, "headers": [], "cookies": [],
+                        "queryString": [], "headersSize": -1, "bodySize": 0},
+            "response": {
+                "status": status_code,
+                "statusText": "",
+                "httpVersion": http_version,
+                "headers": _har_headers(headers),
+                "cookies": [],
+                "content": {"size": len(content), "mimeType": headers.get('content-type', 'text/html'), **content_field},
+                "redirectURL": final_url if final_url and final_url != url else "",
+                "headersSize": -1,
+                "bodySize": len(content)
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": 0, "receive": 0},
+            "_fetchMode": mode
+        }
+        self.dirty = True
+
+    def lookup(self, mode: str, url: str) -> Optional[FetchResult]:
+        entry = self._entries.get((mode, normalize_url(url)))
+        if entry is None:
+            return None
+        response = entry['response']
+        content = response['content']
+        body = content.get('text', '')
+        if content.get('encoding') == 'base64':
+            raw = base64.b64decode(body)
+            body = raw.decode('utf-8', errors='replace')
+        else:
+            raw = body.encode('utf-8')
+        return FetchResult(
+            url=response.get('redirectURL') or entry['request']['url'],
+            status_code=response['status'],
+            content=raw,
+            text=body,
+            headers={h['name'].lower(): h['value'] for h in response.get('headers', [])},
+            http_version=response.get('httpVersion', 'HTTP/1.1')
+        )
+
+    def entries(self):
+        """(mode, url, FetchResult) for every recording"""
+        for mode, key in list(self._entries):
+            yield mode, self._entries[(mode, key)]['request']['url'], self.lookup(mode, key)
+
+
+class RecordingFetcher:
+    """HTTPFetcher wrapper that stores every full response in the archive"""
+
+    def __init__(self, fetcher, archive: FetchArchive):
+        self.fetcher = fetcher
+        self.archive = archive
+
+    async def start(self):
+        await self.fetcher.start()
+
+    async def stop(self):
+        await self.fetcher.stop()
+        self.archive.save()
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        result = await self.fetcher.get(url, headers=headers)
+        # A 304 to a conditional request has no body to replay; everything else is kept as-is
+        if result.status_code != 304:
+            self.archive.record(STATIC, url, result.status_code, result.content, result.headers, result.url, result.http_version, result.text)
+        return result
+
+
+class ReplayFetcher:
+    """Serves static fetches from the archive; never touches the network"""
+
+    def __init__(self, archive: FetchArchive):
+        self.archive = archive
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        result = self.archive.lookup(STATIC, url)
+        if result is None:
+            raise ArchiveMiss(f"No recorded static fetch for {url}")
+        return result
+
+
+class RecordingRenderer:
+    """BrowserPool wrapper that stores every rendered page in the archive"""
+
+    def __init__(self, pool, archive: FetchArchive):
+        self.pool = pool
+        self.archive = archive
+
+    async def start(self):
+        await self.pool.start()
+
+    async def stop(self):
+        await self.pool.stop()
+        self.archive.save()
+
+    async def render(self, url: str, **options) -> str:
+        html = await self.pool.render(url, **options)
+        self.archive.record(RENDERED, url, 200, html.encode('utf-8'), {'content-type': 'text/html; charset=utf-8'})
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+
+class ReplayRenderer:
+    """Serves rendered pages from the archive without launching a browser"""
+
+    def __init__(self, archive: FetchArchive):
+        self.archive = archive
+        self.pages_served = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def render(self, url: str, **options) -> str:
+        result = self.archive.lookup(RENDERED, url)
+        if result is None:
+            raise ArchiveMiss(f"No recorded render for {url}")
+        self.pages_served += 1
+        return result.text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": True,
+            "capacity": 0,
+            "active": 0,
+            "retiring": 0,
+            "pages_served": self.pages_served,
+            "recycles": 0,
+            "restarts": 0
+        }
+
+
+def fetch_backends(fetcher, renderer, mode: Optional[str] = None, path: Optional[str] = None):
+    """Return the (fetcher, renderer) pair for a fetch mode, wrapping the live ones as needed"""
+    mode = mode or os.environ.get('AUDIT_FETCH_MODE', 'live')
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode: {mode}")
+    if mode == 'live':
+        return fetcher, renderer
+
+    path = path or os.environ.get('AUDIT_ARCHIVE_PATH', 'audit_archive.har')
+    archive = FetchArchive(path).load()
+    logger.info(f"Audit fetch mode: {mode} ({path})")
+    if mode == 'record':
+        return RecordingFetcher(fetcher, archive), RecordingRenderer(renderer, archive)
+    return ReplayFetcher(archive), ReplayRenderer(archive)
+
+
+def main(path: str):
+    """Print seo/aeo/geo scores for every archived page as JSON lines"""
+    from analysis_executor import analyze_html
+
+    for mode, url, result in FetchArchive(path).load().entries():
+        if result.status_code != 200:
+            continue
+        analysis = analyze_html(url, result.text.encode('utf-8'))
+        print(json.dumps({
+            "url": url,
+            "mode": mode,
+            "seo_score": analysis['seo']['score'],
+            "aeo_score": analysis['aeo']['score'],
+            "geo_score": analysis['geo']['score'],
+            "text_length": analysis['text_length']
+        }))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    main(sys.argv[1])
@@ -0,0 +1,18 @@
+"""
+Findings Module
+Per-run accumulator for analyzer issues and strengths
+"""
+
+from typing import List
+
+
+class Findings:
+    """
+    Issues and strengths collected during a single analysis run.
+    Analyzers create one per call instead of keeping lists on the instance, so a
+    single analyzer can serve any number of concurrent audits.
+    """
+
+    def __init__(self):
+        self.issues: List[str] = []
+        self.strengths: List[str] = []
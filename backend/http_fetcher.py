@@ -0,0 +1,122 @@
+"""
+HTTP Fetcher Module
+Non-blocking HTTP client with a connection pool shared across audits
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class FetchResult:
+    """Response data needed by the audit pipeline, detached from the HTTP client"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, text: str, headers: Dict[str, str], http_version: str):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.text = text
+        self.headers = headers
+        self.http_version = http_version
+
+
+class HTTPFetcher:
+    """
+    Async fetcher backed by a single httpx client.
+    Connections are kept alive and reused between audits, HTTP/2 is negotiated when the
+    origin supports it, gzip/brotli bodies are decoded transparently, and each host is
+    limited to a fixed number of concurrent requests.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        timeout: float = 10.0,
+        http2: bool = True
+    ):
+        self.max_connections = max_connections or int(os.environ.get('HTTP_MAX_CONNECTIONS', 100))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.environ.get('HTTP_MAX_KEEPALIVE', 20))
+        self.per_host_limit = per_host_limit or int(os.environ.get('HTTP_PER_HOST_LIMIT', 6))
+        self.timeout = timeout
+        self.http2 = http2
+
+        self._client: Optional[httpx.AsyncClient] = None
+        # host -> [semaphore, number of requests holding or waiting for it]
+        self._hosts: Dict[str, List] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                follow_redirects=True,
+                timeout=self.timeout,
+                headers={'User-Agent': USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=30.0
+                )
+            )
+        return self._client
+
+    async def start(self):
+        """Open the connection pool"""
+        _ = self.client
+
+    async def stop(self):
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET a URL, waiting for a free per-host slot first"""
+        async with self._host_slot(url):
+            response = await self.client.get(url, headers=headers)
+
+        return FetchResult(
+            url=str(response.url),
+            status_code=response.status_code,
+            content=response.content,
+            text=response.text,
+            headers=dict(response.headers),
+            http_version=response.http_version
+        )
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """
+        GET a URL without buffering the body: yields the httpx response, whose
+        aiter_bytes() gives the (content-decoded) body in chunks. Holds a per-host slot.
+        """
+        async with self._host_slot(url):
+            async with self.client.stream('GET', url, headers=headers) as response:
+                yield response
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.per_host_limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._hosts[host]
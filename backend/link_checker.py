@@ -0,0 +1,210 @@
+"""
+Link Checker Module
+Verifies a page's links concurrently (HEAD, falling back to a ranged GET) within a hard time budget
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from cachetools import TTLCache
+
+from http_fetcher import USER_AGENT
+from single_flight import SingleFlight
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# HEAD answers that do not prove a link is broken (method not supported, bot blocking, ...)
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 429, 500, 501, 502, 503}
+
+# Statuses that say nothing about the link itself (rate limited), reported as unknown
+INCONCLUSIVE_STATUSES = {429}
+
+BROKEN_URLS_REPORTED = 20
+
+
+def _link_key(url: str) -> Optional[str]:
+    """Cache key of a checkable (http/https, well-formed) link, else None"""
+    try:
+        if urlsplit(url).scheme not in ('http', 'https'):
+            return None
+        return normalize_url(url)
+    except ValueError:
+        return None
+
+
+class LinkChecker:
+    """
+    Checks link URLs with a dedicated non-redirecting client so every hop is recorded.
+    Each link gets a HEAD; error answers are retried as `GET Range: bytes=0-0` because many
+    servers mishandle HEAD. Checks are capped overall and per host (concurrency and request
+    rate). Results live in a TTL cache shared by all audits, and concurrent checks of the
+    same URL share one request, so common outbound links are checked once.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        host_rate: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_redirects: int = 5,
+        cache_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.per_host = per_host or int(os.environ.get('LINK_CHECK_PER_HOST', 4))
+        # Requests per second started against one host
+        self.host_rate = host_rate or float(os.environ.get('LINK_CHECK_HOST_RATE', 10))
+        self.timeout = timeout or float(os.environ.get('LINK_CHECK_TIMEOUT_SECONDS', 5))
+        self.max_redirects = max_redirects
+        self.transport = transport
+
+        self._slots = asyncio.Semaphore(concurrency or int(os.environ.get('LINK_CHECK_CONCURRENCY', 50)))
+        # host -> [semaphore, earliest monotonic time the next request may start]; idle hosts expire
+        self._hosts: TTLCache = TTLCache(maxsize=10000, ttl=60)
+        self._cache = TTLCache(
+            maxsize=cache_size or int(os.environ.get('LINK_CHECK_CACHE_SIZE', 10000)),
+            ttl=cache_ttl or float(os.environ.get('LINK_CHECK_CACHE_TTL_SECONDS', 3600))
+        )
+        self._single_flight = SingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.requests = 0
+        self.cache_hits = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=False,
+                timeout=self.timeout,
+                headers={'User-Agent': USER_AGENT},
+                transport=self.transport
+            )
+        return self._client
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _host_turn(self, entry: List):
+        """Wait until the host's rate cap lets another request start"""
+        now = time.monotonic()
+        start_at = max(now, entry[1])
+        entry[1] = start_at + 1 / self.host_rate
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def _request(self, method: str, url: str) -> httpx.Response:
+        host = urlsplit(url).netloc.lower()
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.per_host), 0.0]
+        async with self._slots, entry[0]:
+            await self._host_turn(entry)
+            self.requests += 1
+            headers = {'Range': 'bytes=0-0'} if method == 'GET' else None
+            # stream() so a GET never downloads more than the headers
+            async with self.client.stream(method, url, headers=headers) as response:
+                return response
+
+    async def _check(self, url: str) -> Dict[str, Any]:
+        redirects = []
+        current = url
+        try:
+            for _ in range(self.max_redirects + 1):
+                response = await self._request('HEAD', current)
+                if response.status_code in HEAD_FALLBACK_STATUSES:
+                    response = await self._request('GET', current)
+                location = response.headers.get('location')
+                if response.is_redirect and location:
+                    redirects.append({"status": response.status_code, "url": current})
+                    current = urljoin(current, location)
+                    continue
+                status = response.status_code
+                return {
+                    "url": url,
+                    "status": status,
+                    "broken": status >= 400 and status not in INCONCLUSIVE_STATUSES,
+                    "final_url": current,
+                    "redirects": redirects
+                }
+            return {"url": url, "status": None, "broken": True, "final_url": current,
+                    "redirects": redirects, "error": "Too many redirects"}
+        except httpx.TimeoutException:
+            # A slow server is not a broken link
+            return {"url": url, "status": None, "broken": False, "final_url": current,
+                    "redirects": redirects, "error": "Timed out"}
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            return {"url": url, "status": None, "broken": True, "final_url": current,
+                    "redirects": redirects, "error": type(e).__name__}
+
+    async def _check_and_cache(self, key: str, url: str) -> Dict[str, Any]:
+        result = await self._check(url)
+        # Timeouts are not cached so the next audit tries again
+        if result.get('error') != 'Timed out':
+            self._cache[key] = result
+        return result
+
+    async def status(self, url: str) -> Dict[str, Any]:
+        """Status of one link, from the shared cache when it was checked recently"""
+        key = normalize_url(url)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        return await self._single_flight.do(key, lambda: self._check_and_cache(key, url))
+
+    async def check(self, urls: Iterable[str], budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Check every http(s) URL, returning whatever finished within `budget` seconds.
+        Unfinished checks are abandoned by this caller but keep running in the background
+        (bounded by the client timeout), so their results still land in the cache.
+        """
+        budget = budget if budget is not None else float(os.environ.get('LINK_CHECK_BUDGET_SECONDS', 5))
+        max_links = int(os.environ.get('LINK_CHECK_MAX_LINKS', 300))
+        started = time.monotonic()
+        unique = {}
+        for url in urls:
+            key = _link_key(url)
+            if key is not None and len(unique) < max_links:
+                unique.setdefault(key, url)
+        tasks = [asyncio.ensure_future(self.status(url)) for url in unique.values()]
+
+        done = set()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=budget)
+            for task in pending:
+                task.cancel()
+        results = [task.result() for task in done if task.exception() is None]
+        for task in done:
+            if task.exception() is not None:
+                logger.warning(f"Link check error: {task.exception()}")
+        broken = [result for result in results if result['broken']]
+
+        return {
+            "checked": len(results),
+            "unchecked": len(tasks) - len(results),
+            "broken": len(broken),
+            "redirected": sum(1 for result in results if result['redirects']),
+            "broken_urls": [
+                {"url": result['url'], "status": result['status'], **({"error": result['error']} if 'error' in result else {})}
+                for result in broken[:BROKEN_URLS_REPORTED]
+            ],
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "requests": self.requests,
+            "in_flight": self._single_flight.stats()['in_flight']
+        }
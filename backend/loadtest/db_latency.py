@@ -0,0 +1,127 @@
+"""
+Database Latency Load Test
+Measures how concurrent request latency on server_supabase.py responds to database latency
+
+Boots server_supabase.py in-process against FakeSupabase and, for each per-query latency,
+fires bursts of concurrent authenticated reads (GET /api/auth/me and GET /api/audits).
+If queries blocked the event loop, a burst of N requests would take about N times the
+requests' query time and p95 would grow with both N and the latency. Through the
+repository's thread pool each request costs roughly its own queries, so p95 should stay
+near `sequential_ms` (the request's query time) until the pool is saturated.
+
+Usage:
+    python loadtest/db_latency.py --latency 0 --latency 0.01 --latency 0.05 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / 'benchmarks'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from fakes import install_fake_llm, install_fake_supabase  # noqa: E402
+from run import free_socket, percentile, seed_supabase_user  # noqa: E402
+
+# Round trips per request: the session + user join (+ the audit list)
+QUERIES_PER_REQUEST = {'/api/auth/me': 1, '/api/audits': 2}
+
+
+async def burst(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault('EMERGENT_LLM_KEY', 'loadtest')
+    # Every request goes to the database: this measures the query path, not the session cache
+    os.environ['SESSION_CACHE_TTL_SECONDS'] = '0'
+    os.environ['SESSION_CACHE_NEGATIVE_TTL_SECONDS'] = '0'
+    if args.workers:
+        os.environ['SUPABASE_MAX_WORKERS'] = str(args.workers)
+    install_fake_llm()
+    supabase = install_fake_supabase()
+    module = importlib.import_module('server_supabase')
+    cookies = seed_supabase_user(supabase)
+    for i in range(args.audits):
+        supabase.add_row('audits', {"user_id": "loadtest-user", "url": f"https://example.com/{i}", "status": "completed"})
+    logging.getLogger().setLevel(args.log_level)
+
+    sock = free_socket()
+    server = uvicorn.Server(uvicorn.Config(module.app, log_level=args.log_level.lower(), access_log=False, lifespan='on'))
+    serve_task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        if serve_task.done():
+            serve_task.result()
+        await asyncio.sleep(0.05)
+
+    results = []
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{sock.getsockname()[1]}",
+            cookies=cookies,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency + 10)
+        ) as client:
+            for latency in args.latencies:
+                supabase.latency = latency
+                for path, queries in QUERIES_PER_REQUEST.items():
+                    ms = [s * 1000 for s in await burst(client, path, args.requests, args.concurrency)]
+                    results.append({
+                        "db_latency_ms": latency * 1000,
+                        "path": path,
+                        "sequential_ms": round(queries * latency * 1000, 1),
+                        "p50_ms": round(percentile(ms, 50), 1),
+                        "p95_ms": round(percentile(ms, 95), 1),
+                        "max_ms": round(max(ms), 1)
+                    })
+    finally:
+        server.should_exit = True
+        await serve_task
+
+    return {
+        "config": vars(args),
+        "max_workers": module.repository.max_workers,
+        "db_round_trips": supabase.round_trips,
+        "results": results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', dest='latencies', type=float, action='append', help='seconds per fake DB round trip, repeatable (default 0, 0.01, 0.05)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per path and latency')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--workers', type=int, help='SUPABASE_MAX_WORKERS for the server')
+    parser.add_argument('--audits', type=int, default=20, help='audits seeded for the list endpoint')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+    args.latencies = args.latencies or [0.0, 0.01, 0.05]
+    return args
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
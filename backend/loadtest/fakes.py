@@ -0,0 +1,673 @@
+"""
+Load Test Fakes
+In-process stand-ins for MongoDB (Motor), Supabase (PostgREST), the LLM chat client and target sites
+
+Each fake counts its round trips and can add a fixed latency per call so database and
+LLM cost can be dialled in without any external service.
+"""
+
+import asyncio
+import copy
+import random
+import re
+import sys
+import threading
+import time
+import types
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from corpus import generate_page, parse_size
+
+
+# ---------------------------------------------------------------------------
+# MongoDB / Motor
+# ---------------------------------------------------------------------------
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+_OPERATORS = {
+    '$gt': lambda a, b: a is not None and a > b,
+    '$gte': lambda a, b: a is not None and a >= b,
+    '$lt': lambda a, b: a is not None and a < b,
+    '$lte': lambda a, b: a is not None and a <= b,
+    '$ne': lambda a, b: a != b,
+    '$in': lambda a, b: a in b,
+    '$exists': lambda a, b: (a is not None) == bool(b),
+}
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and condition and all(op.startswith('$') for op in condition):
+            if not all(_OPERATORS[op](value, arg) for op, arg in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [key for key, flag in projection.items() if flag and key != '_id']
+    if included:
+        projected = {key: _get_path(doc, key) for key in included if _get_path(doc, key) is not None}
+        if projection.get('_id', 1) and '_id' in doc:
+            projected['_id'] = doc['_id']
+        return projected
+    for key, flag in projection.items():
+        if not flag:
+            doc.pop(key, None)
+    return doc
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeCursor:
+    def __init__(self, collection: 'FakeCollection', query: Dict[str, Any], projection: Optional[Dict[str, int]]):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._limit = 0
+        self._batch: Optional[List[Dict[str, Any]]] = None
+
+    def sort(self, key, direction: int = 1) -> 'FakeCursor':
+        self._sort = list(key) if isinstance(key, list) else [(key, direction)]
+        return self
+
+    def limit(self, count: int) -> 'FakeCursor':
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> 'FakeCursor':
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = [doc for doc in self._collection.docs if _matches(doc, self._query)]
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda doc: (_get_path(doc, key) is None, _get_path(doc, key)), reverse=direction < 0)
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self._collection.database.round_trip()
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if self._batch is None:
+            await self._collection.database.round_trip()
+            self._batch = self._results()
+        if not self._batch:
+            raise StopAsyncIteration
+        return self._batch.pop(0)
+
+
+class FakeAggregateCursor:
+    """Pipeline of $match / $limit / $lookup stages, evaluated in one round trip"""
+
+    def __init__(self, collection: 'FakeCollection', pipeline: List[Dict[str, Any]]):
+        self._collection = collection
+        self._pipeline = pipeline
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self._collection.database.round_trip()
+        docs = [copy.deepcopy(doc) for doc in self._collection.docs]
+        for stage in self._pipeline:
+            (operator, spec), = stage.items()
+            if operator == '$match':
+                docs = [doc for doc in docs if _matches(doc, spec)]
+            elif operator == '$limit':
+                docs = docs[:spec]
+            elif operator == '$lookup':
+                foreign = self._collection.database[spec['from']].docs
+                for doc in docs:
+                    key = _get_path(doc, spec['localField'])
+                    doc[spec['as']] = [copy.deepcopy(other) for other in foreign if _get_path(other, spec['foreignField']) == key]
+            else:
+                raise NotImplementedError(operator)
+        return docs[:length] if length else docs
+
+
+class FakeCollection:
+    def __init__(self, database: 'FakeDatabase', name: str):
+        self.database = database
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+        self.indexes: Dict[str, Dict[str, Any]] = {'_id_': {'key': [('_id', 1)]}}
+
+    async def insert_one(self, doc: Dict[str, Any]) -> _Result:
+        await self.database.round_trip()
+        doc.setdefault('_id', uuid.uuid4().hex)
+        self.docs.append(copy.deepcopy(doc))
+        return _Result(inserted_id=doc['_id'])
+
+    async def insert_many(self, docs: List[Dict[str, Any]]) -> _Result:
+        await self.database.round_trip()
+        for doc in docs:
+            doc.setdefault('_id', uuid.uuid4().hex)
+            self.docs.append(copy.deepcopy(doc))
+        return _Result(inserted_ids=[doc['_id'] for doc in docs])
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        await self.database.round_trip()
+        for doc in self.docs:
+            if _matches(doc, query or {}):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None) -> FakeCursor:
+        return FakeCursor(self, query or {}, projection)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> FakeAggregateCursor:
+        return FakeAggregateCursor(self, pipeline)
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> _Result:
+        await self.database.round_trip()
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query: Dict[str, Any], update: Dict[str, Any]) -> _Result:
+        await self.database.round_trip()
+        return self._update(query, update, False, many=True)
+
+    async def bulk_write(self, operations: List[Any], ordered: bool = True) -> _Result:
+        """pymongo UpdateOne/UpdateMany operations, applied in one round trip"""
+        await self.database.round_trip()
+        modified = 0
+        for operation in operations:
+            many = type(operation).__name__ == 'UpdateMany'
+            modified += self._update(operation._filter, operation._doc, bool(operation._upsert), many).modified_count
+        return _Result(matched_count=modified, modified_count=modified)
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool, many: bool) -> _Result:
+        matched = 0
+        for doc in self.docs:
+            if _matches(doc, query):
+                for key, value in update.get('$set', {}).items():
+                    _set_path(doc, key, copy.deepcopy(value))
+                matched += 1
+                if not many:
+                    break
+        if not matched and upsert:
+            doc = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            for key, value in update.get('$set', {}).items():
+                _set_path(doc, key, copy.deepcopy(value))
+            doc.setdefault('_id', uuid.uuid4().hex)
+            self.docs.append(doc)
+        return _Result(matched_count=matched, modified_count=matched)
+
+    async def delete_one(self, query: Dict[str, Any]) -> _Result:
+        await self.database.round_trip()
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                del self.docs[i]
+                return _Result(deleted_count=1)
+        return _Result(deleted_count=0)
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self.database.round_trip()
+        return sum(1 for doc in self.docs if _matches(doc, query))
+
+    async def create_index(self, keys, **options) -> str:
+        await self.database.round_trip()
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = options.get('name') or '_'.join(f"{field}_{direction}" for field, direction in keys)
+        self.indexes[name] = {'key': keys, **{k: v for k, v in options.items() if k != 'name'}}
+        return name
+
+    async def index_information(self) -> Dict[str, Dict[str, Any]]:
+        await self.database.round_trip()
+        return copy.deepcopy(self.indexes)
+
+
+class FakeDatabase:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.round_trips = 0
+        self._collections: Dict[str, FakeCollection] = {}
+
+    async def round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+
+class FakeMotorClient:
+    """Drop-in for motor's AsyncIOMotorClient; every database name maps to one shared FakeDatabase"""
+
+    latency = 0.0
+    database: Optional[FakeDatabase] = None
+
+    def __init__(self, *args, **kwargs):
+        if FakeMotorClient.database is None:
+            FakeMotorClient.database = FakeDatabase(FakeMotorClient.latency)
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        return FakeMotorClient.database
+
+    def close(self):
+        pass
+
+
+def install_fake_mongo(latency: float = 0.0) -> FakeDatabase:
+    """Make motor.motor_asyncio.AsyncIOMotorClient the fake (call before importing server)"""
+    import motor.motor_asyncio
+    FakeMotorClient.latency = latency
+    FakeMotorClient.database = FakeDatabase(latency)
+    motor.motor_asyncio.AsyncIOMotorClient = FakeMotorClient
+    return FakeMotorClient.database
+
+
+# ---------------------------------------------------------------------------
+# Supabase (PostgREST)
+# ---------------------------------------------------------------------------
+
+def _split_columns(columns: str) -> List[str]:
+    """Split a select list on top-level commas: '*, reports(*, report_items(*))' -> ['*', 'reports(...)']"""
+    parts, depth, current = [], 0, ''
+    for char in columns:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+_EMBED = re.compile(r'^(\w+)\((.*)\)$', re.S)
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """The subset of the postgrest-py request builder the backend uses"""
+
+    def __init__(self, client: 'FakeSupabase', table: str):
+        self._client = client
+        self._table = table
+        self._action = 'select'
+        self._columns = '*'
+        self._payload: Any = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._on_conflict: Optional[str] = None
+
+    def select(self, columns: str = '*', count: Optional[str] = None) -> 'FakeQuery':
+        self._action, self._columns = 'select', columns
+        return self
+
+    def insert(self, payload) -> 'FakeQuery':
+        self._action, self._payload = 'insert', payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = 'id') -> 'FakeQuery':
+        self._action, self._payload, self._on_conflict = 'upsert', payload, on_conflict
+        return self
+
+    def update(self, payload: Dict[str, Any]) -> 'FakeQuery':
+        self._action, self._payload = 'update', payload
+        return self
+
+    def delete(self) -> 'FakeQuery':
+        self._action = 'delete'
+        return self
+
+    def _filter(self, op: str, column: str, value: Any) -> 'FakeQuery':
+        self._filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        return self._filter('in', column, list(values))
+
+    def is_(self, column, value):
+        return self._filter('is', column, value)
+
+    def order(self, column: str, desc: bool = False) -> 'FakeQuery':
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> 'FakeQuery':
+        self._limit = count
+        return self
+
+    def execute(self) -> FakeResponse:
+        self._client.round_trip()
+        with self._client.lock:
+            return getattr(self, f'_execute_{self._action}')()
+
+    def _rows(self) -> List[Dict[str, Any]]:
+        return [row for row in self._client.tables.setdefault(self._table, []) if self._match(row)]
+
+    def _match(self, row: Dict[str, Any]) -> bool:
+        for op, column, value in self._filters:
+            current = row.get(column)
+            if op == 'eq' and current != value:
+                return False
+            if op == 'neq' and current == value:
+                return False
+            if op == 'in' and current not in value:
+                return False
+            if op == 'is' and value == 'null' and current is not None:
+                return False
+            if op in ('gt', 'gte', 'lt', 'lte'):
+                if current is None:
+                    return False
+                if op == 'gt' and not current > value:
+                    return False
+                if op == 'gte' and not current >= value:
+                    return False
+                if op == 'lt' and not current < value:
+                    return False
+                if op == 'lte' and not current <= value:
+                    return False
+        return True
+
+    def _execute_select(self) -> FakeResponse:
+        rows = self._rows()
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        data = [self._client.shape(self._table, row, self._columns) for row in rows]
+        return FakeResponse(data, count=len(data))
+
+    def _execute_insert(self) -> FakeResponse:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        inserted = [self._client.add_row(self._table, row) for row in payload]
+        return FakeResponse(copy.deepcopy(inserted))
+
+    def _execute_upsert(self) -> FakeResponse:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        keys = [key.strip() for key in self._on_conflict.split(',')]
+        table = self._client.tables.setdefault(self._table, [])
+        result = []
+        for row in payload:
+            existing = next((r for r in table if all(r.get(k) == row.get(k) for k in keys)), None)
+            if existing is not None:
+                existing.update(copy.deepcopy(row))
+                result.append(copy.deepcopy(existing))
+            else:
+                result.append(copy.deepcopy(self._client.add_row(self._table, row)))
+        return FakeResponse(result)
+
+    def _execute_update(self) -> FakeResponse:
+        rows = self._rows()
+        for row in rows:
+            row.update(copy.deepcopy(self._payload))
+        return FakeResponse(copy.deepcopy(rows))
+
+    def _execute_delete(self) -> FakeResponse:
+        rows = self._rows()
+        table = self._client.tables[self._table]
+        self._client.tables[self._table] = [row for row in table if row not in rows]
+        return FakeResponse(copy.deepcopy(rows))
+
+
+class FakeRpc:
+    """A call of a Postgres function: one round trip, applied atomically under the store lock"""
+
+    def __init__(self, client: 'FakeSupabase', name: str, params: Dict[str, Any]):
+        self._client = client
+        self._name = name
+        self._params = params
+
+    def execute(self) -> FakeResponse:
+        self._client.round_trip()
+        with self._client.lock:
+            return FakeResponse(getattr(self._client, f'_rpc_{self._name}')(**copy.deepcopy(self._params)))
+
+
+class FakeSupabase:
+    """
+    PostgREST-like in-memory store. Embedded selects join a child table on
+    `<parent table singular>_id` (audits -> reports.audit_id), returning lists, or
+    follow the parent's own `<table singular>_id` (user_sessions.user_id -> users)
+    to a single row.
+    Functions from supabase_schema.sql are mirrored as `_rpc_<name>` methods.
+    execute() blocks for `latency` seconds, like the synchronous supabase-py client;
+    `peak_in_flight` records how many executes were ever blocked at once.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.round_trips = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def round_trip(self):
+        with self.lock:
+            self.round_trips += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def add_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = copy.deepcopy(row)
+        row.setdefault('id', str(uuid.uuid4()))
+        row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    def shape(self, table: str, row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        shaped: Dict[str, Any] = {}
+        for column in _split_columns(columns):
+            embed = _EMBED.match(column)
+            if column == '*':
+                shaped.update(copy.deepcopy(row))
+            elif embed:
+                child, inner = embed.groups()
+                reference = f"{child.rstrip('s')}_id"
+                if reference in row:
+                    target = next((r for r in self.tables.get(child, []) if r.get('id') == row[reference]), None)
+                    shaped[child] = self.shape(child, target, inner) if target is not None else None
+                    continue
+                foreign_key = f"{table.rstrip('s')}_id"
+                shaped[child] = [
+                    self.shape(child, child_row, inner)
+                    for child_row in self.tables.get(child, []) if child_row.get(foreign_key) == row.get('id')
+                ]
+            else:
+                shaped[column] = copy.deepcopy(row.get(column))
+        return shaped
+
+    def _rpc_complete_audit(self, p_audit_id: str, p_audit: Dict[str, Any], p_report: Dict[str, Any], p_items: List[Dict[str, Any]]) -> str:
+        audit = next((row for row in self.tables.get('audits', []) if row.get('id') == p_audit_id), None)
+        if audit is None:
+            raise RuntimeError(f"Audit {p_audit_id} not found")
+        report = next((row for row in self.tables.get('reports', []) if row.get('audit_id') == p_audit_id), None)
+        if report is None:
+            report = self.add_row('reports', {**p_report, "audit_id": p_audit_id})
+        else:
+            report.update(p_report)
+        self.tables['report_items'] = [row for row in self.tables.get('report_items', []) if row.get('report_id') != report['id']]
+        for item in p_items:
+            self.add_row('report_items', {**item, "report_id": report['id']})
+        audit.update({**p_audit, "status": "completed"})
+        return report['id']
+
+
+def install_fake_supabase(latency: float = 0.0) -> FakeSupabase:
+    """Register a fake supabase_client module (call before importing server_supabase)"""
+    client = FakeSupabase(latency)
+    module = types.ModuleType('supabase_client')
+    module.supabase = client
+    module.get_supabase_client = lambda: client
+    sys.modules['supabase_client'] = module
+    return client
+
+
+# ---------------------------------------------------------------------------
+# LLM
+# ---------------------------------------------------------------------------
+
+FAKE_RECOMMENDATIONS = """SEO|High|Missing meta description|Add a 150-160 character meta description with the primary keyword.
+SEO|Medium|Images missing alt text|Describe every image in its alt attribute.
+AEO|High|No FAQ schema|Add FAQPage structured data for the common customer questions.
+AEO|Medium|Few question headings|Phrase some H2 headings as the questions customers ask.
+GEO|High|No LocalBusiness schema|Add LocalBusiness JSON-LD with address and phone number.
+GEO|Low|No embedded map|Embed a map of the business location on the contact page."""
+
+
+class FakeLlmStats:
+    calls = 0
+    failures = 0
+
+
+def install_fake_llm(latency: float = 1.0, failure_rate: float = 0.0, seed: int = 0) -> type:
+    """Register fake emergentintegrations.llm.chat modules whose send_message sleeps `latency` seconds"""
+    rng = random.Random(seed)
+
+    class UserMessage:
+        def __init__(self, text: str):
+            self.text = text
+
+    class LlmChat:
+        def __init__(self, api_key: str, session_id: str, system_message: str):
+            self.session_id = session_id
+
+        def with_model(self, provider: str, model: str) -> 'LlmChat':
+            return self
+
+        async def send_message(self, message: UserMessage) -> str:
+            FakeLlmStats.calls += 1
+            await asyncio.sleep(latency)
+            if rng.random() < failure_rate:
+                FakeLlmStats.failures += 1
+                raise RuntimeError("fake LLM failure")
+            return FAKE_RECOMMENDATIONS
+
+    package = types.ModuleType('emergentintegrations')
+    llm = types.ModuleType('emergentintegrations.llm')
+    chat = types.ModuleType('emergentintegrations.llm.chat')
+    chat.LlmChat, chat.UserMessage = LlmChat, UserMessage
+    package.llm, llm.chat = llm, chat
+    sys.modules.update({
+        'emergentintegrations': package,
+        'emergentintegrations.llm': llm,
+        'emergentintegrations.llm.chat': chat
+    })
+    return FakeLlmStats
+
+
+# ---------------------------------------------------------------------------
+# Target sites
+# ---------------------------------------------------------------------------
+
+def start_corpus_server(delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Serve corpus pages at /<kind>/<size> (e.g. /mixed/50kb); the query string is ignored,
+    so ?n=<i> gives every audit a distinct URL (and audit cache key) for the same page
+    """
+    pages: Dict[Tuple[str, int], bytes] = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            try:
+                _, kind, size = urlparse(self.path).path.split('/')
+                key = (kind, parse_size(size))
+                with lock:
+                    if key not in pages:
+                        pages[key] = generate_page(kind, key[1]).encode('utf-8')
+                body = pages[key]
+            except ValueError:
+                self.send_error(404)
+                return
+            if delay:
+                time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,267 @@
+"""
+End-to-End Load Test
+Boots server.py or server_supabase.py in-process on uvicorn against local fakes and drives audit and read traffic
+
+Mongo, Supabase and the LLM are replaced by the stand-ins in loadtest/fakes.py; audited
+sites are corpus pages served from a local HTTP server. Audits are submitted with bounded
+concurrency and followed until they complete; read requests (audit list and audit detail)
+run alongside. Reports p50/p95/p99 latency per operation, throughput and fake call counts
+as JSON.
+
+Usage:
+    python loadtest/run.py --server mongo --audits 50 --concurrency 10 --reads 200
+    python loadtest/run.py --server supabase --llm-latency 2 --db-latency 0.02 --page mixed/500kb
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / 'benchmarks'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from fakes import install_fake_llm, install_fake_mongo, install_fake_supabase, start_corpus_server  # noqa: E402
+
+TERMINAL = ('completed', 'failed')
+SESSION_TOKEN = 'loadtest-session'
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, operation: str, seconds: float, status: Any, ok: bool = True):
+        self.samples.setdefault(operation, []).append(seconds)
+        counts = self.statuses.setdefault(operation, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        result = {}
+        for operation, samples in self.samples.items():
+            ms = [s * 1000 for s in samples]
+            result[operation] = {
+                "count": len(ms),
+                "errors": self.errors.get(operation, 0),
+                "statuses": self.statuses[operation],
+                "p50_ms": round(percentile(ms, 50), 1),
+                "p95_ms": round(percentile(ms, 95), 1),
+                "p99_ms": round(percentile(ms, 99), 1),
+                "max_ms": round(max(ms), 1),
+                "mean_ms": round(sum(ms) / len(ms), 1)
+            }
+        return result
+
+
+def seed_supabase_user(client) -> Dict[str, str]:
+    now = time.time()
+    client.add_row('users', {"id": "loadtest-user", "email": "loadtest@example.com", "full_name": "Load Test"})
+    client.add_row('user_sessions', {
+        "user_id": "loadtest-user",
+        "session_token": SESSION_TOKEN,
+        "expires_at": time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(now + 86400))
+    })
+    return {"session_token": SESSION_TOKEN}
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, base_url: str, origin: str, cookies: Dict[str, str]):
+        self.args = args
+        self.base_url = base_url
+        self.origin = origin
+        self.recorder = Recorder()
+        self.audit_ids: List[str] = []
+        self.submit_path = '/api/audit' if args.server == 'mongo' else '/api/audits'
+        self.detail_path = '/api/report/{}' if args.server == 'mongo' else '/api/audits/{}'
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            cookies=cookies,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency + args.read_concurrency + 10)
+        )
+        self.rng = random.Random(args.seed)
+
+    async def timed(self, operation: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(operation, time.perf_counter() - started, type(e).__name__, ok=False)
+            return None
+        self.recorder.record(operation, time.perf_counter() - started, response.status_code, ok=response.status_code < 400)
+        return response
+
+    async def one_audit(self, index: int):
+        page = self.args.pages[index % len(self.args.pages)]
+        url = f"{self.origin}/{page}?n={index}" if self.args.unique_urls else f"{self.origin}/{page}"
+        started = time.perf_counter()
+
+        response = await self.timed('submit', 'POST', self.submit_path, json={"url": url})
+        if response is None or response.status_code != 200:
+            return
+        audit = response.json()
+        self.audit_ids.append(audit['id'])
+
+        while audit.get('status') not in TERMINAL:
+            await asyncio.sleep(self.args.poll_interval)
+            response = await self.timed('poll', 'GET', self.detail_path.format(audit['id']))
+            if response is None or response.status_code != 200:
+                return
+            audit = response.json()
+
+        self.recorder.record('audit_end_to_end', time.perf_counter() - started, audit['status'], ok=audit['status'] == 'completed')
+
+    async def audits(self):
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def bounded(index: int):
+            async with semaphore:
+                await self.one_audit(index)
+
+        await asyncio.gather(*(bounded(i) for i in range(self.args.audits)))
+
+    async def reads(self):
+        semaphore = asyncio.Semaphore(self.args.read_concurrency)
+
+        async def one_read(index: int):
+            async with semaphore:
+                if self.audit_ids and index % 2:
+                    await self.timed('read_detail', 'GET', self.detail_path.format(self.rng.choice(self.audit_ids)))
+                else:
+                    await self.timed('read_list', 'GET', '/api/audits')
+                if self.args.read_interval:
+                    await asyncio.sleep(self.args.read_interval)
+
+        await asyncio.gather(*(one_read(i) for i in range(self.args.reads)))
+
+    async def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        await asyncio.gather(self.audits(), self.reads())
+        elapsed = time.perf_counter() - started
+
+        metrics_text = (await self.client.get('/metrics')).text
+        await self.client.aclose()
+
+        summary = self.recorder.summary()
+        completed = summary.get('audit_end_to_end', {}).get('statuses', {}).get('completed', 0)
+        requests = sum(op['count'] for name, op in summary.items() if name != 'audit_end_to_end')
+        return {
+            "seconds": round(elapsed, 2),
+            "audits_completed": completed,
+            "audits_per_second": round(completed / elapsed, 3),
+            "requests_per_second": round(requests / elapsed, 1),
+            "operations": summary,
+            "metrics_bytes": len(metrics_text)
+        }
+
+
+def free_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    return sock
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault('EMERGENT_LLM_KEY', 'loadtest')
+    os.environ.setdefault('MONGO_URL', 'mongodb://fake')
+    os.environ.setdefault('DB_NAME', 'loadtest')
+
+    llm_stats = install_fake_llm(args.llm_latency, args.llm_failure_rate, args.seed)
+    if args.server == 'mongo':
+        database = install_fake_mongo(args.db_latency)
+        module = importlib.import_module('server')
+        cookies = {}
+        round_trips = lambda: database.round_trips
+    else:
+        supabase = install_fake_supabase(args.db_latency)
+        module = importlib.import_module('server_supabase')
+        cookies = seed_supabase_user(supabase)
+        round_trips = lambda: supabase.round_trips
+    logging.getLogger().setLevel(args.log_level)
+
+    origin_server = start_corpus_server(args.origin_delay)
+    origin = f"http://127.0.0.1:{origin_server.server_address[1]}"
+
+    sock = free_socket()
+    server = uvicorn.Server(uvicorn.Config(module.app, log_level=args.log_level.lower(), access_log=False, lifespan='on'))
+    serve_task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        if serve_task.done():
+            serve_task.result()
+        await asyncio.sleep(0.05)
+
+    try:
+        base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        result = await LoadTest(args, base_url, origin, cookies).run()
+    finally:
+        server.should_exit = True
+        await serve_task
+        origin_server.shutdown()
+
+    result.update({
+        "config": {k: v for k, v in vars(args).items() if k != 'output'},
+        "db_round_trips": round_trips(),
+        "llm_calls": llm_stats.calls,
+        "llm_failures": llm_stats.failures
+    })
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('mongo', 'supabase'), default='mongo')
+    parser.add_argument('--audits', type=int, default=50, help='audits to submit')
+    parser.add_argument('--concurrency', type=int, default=10, help='audits in flight at once')
+    parser.add_argument('--reads', type=int, default=200, help='read requests (audit list / detail)')
+    parser.add_argument('--read-concurrency', type=int, default=10)
+    parser.add_argument('--read-interval', type=float, default=0.05, help='pause between reads per reader')
+    parser.add_argument('--page', dest='pages', action='append', help='corpus page as kind/size, repeatable (default mixed/50kb)')
+    parser.add_argument('--no-unique-urls', dest='unique_urls', action='store_false', help='reuse URLs so the audit cache is exercised')
+    parser.add_argument('--poll-interval', type=float, default=0.25)
+    parser.add_argument('--llm-latency', type=float, default=1.0, help='seconds per fake LLM call')
+    parser.add_argument('--llm-failure-rate', type=float, default=0.0)
+    parser.add_argument('--db-latency', type=float, default=0.002, help='seconds per fake DB round trip')
+    parser.add_argument('--origin-delay', type=float, default=0.05, help='seconds before the corpus server answers')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--output', help='write the JSON report here (default: stdout)')
+    args = parser.parse_args(argv)
+    args.pages = args.pages or ['mixed/50kb']
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        print(report)
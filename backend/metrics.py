@@ -0,0 +1,284 @@
+"""
+Metrics Module
+In-process counters, gauges and histograms rendered in the Prometheus text exposition format
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values"""
+
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; observe() is one bisect plus a few additions"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class CallbackMetric(Metric):
+    """
+    Value read from a callback at scrape time, so state that components already track
+    (pool occupancy, cache hits) costs nothing on the hot path. The callback returns a
+    number, or a dict of label-value tuples to numbers when labelnames are given.
+    """
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], Any], type: str = 'gauge', labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            values = self.fn()
+        except Exception as e:
+            logger.warning(f"Metric callback {self.name} failed: {e}")
+            return []
+        if not self.labelnames:
+            values = {(): values}
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in values.items() if value is not None
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # Re-registering a name replaces it, so re-instrumenting an app never duplicates series
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    'sage_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status')
+))
+AUDIT_STAGE_DURATION = registry.register(Histogram(
+    'sage_audit_stage_duration_seconds', 'Time spent in each audit stage', ('stage',)
+))
+AUDIT_DURATION = registry.register(Histogram(
+    'sage_audit_duration_seconds', 'End-to-end AuditEngine.run_audit latency by result source', ('source',)
+))
+AUDIT_PERSIST_DURATION = registry.register(Histogram(
+    'sage_audit_persist_duration_seconds', 'Time to store a finished audit in the database', ('backend',)
+))
+AUDIT_FETCHES = registry.register(Counter(
+    'sage_audit_fetches_total', 'Pages analyzed by how their HTML was obtained (static or rendered)', ('mode',)
+))
+LLM_REQUEST_DURATION = registry.register(Histogram(
+    'sage_llm_request_duration_seconds', 'Latency of LLM recommendation requests by outcome (success, failure)', ('outcome',)
+))
+LLM_FAILURES = registry.register(Counter(
+    'sage_llm_failures_total',
+    'Recommendations that fell back to rule-based output, by reason (request, parse, no_api_key)',
+    ('reason',)
+))
+EVENT_LOOP_LAG = registry.register(Histogram(
+    'sage_event_loop_lag_seconds', 'How late the event loop woke a periodic timer',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+))
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Sleep for `interval` forever and record how much later than asked each wake-up was"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
+
+
+def instrument_app(app: FastAPI, audit_engine, audit_jobs):
+    """
+    Add the /metrics endpoint, per-route latency middleware, the event-loop lag monitor
+    and scrape-time collectors for the engine's pools, caches and queues
+    """
+
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = request.scope.get('route')
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=getattr(route, 'path', 'unmatched'),
+                status=status
+            )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    lag_monitor: Dict[str, asyncio.Task] = {}
+
+    @app.on_event("startup")
+    async def start_event_loop_monitor():
+        lag_monitor['task'] = asyncio.create_task(monitor_event_loop_lag())
+
+    @app.on_event("shutdown")
+    async def stop_event_loop_monitor():
+        task = lag_monitor.pop('task', None)
+        if task is not None:
+            task.cancel()
+
+    pool_stats = audit_engine.browser_pool.stats
+    cache_stats = audit_engine.audit_cache.stats
+    admission = audit_engine.admission
+
+    for metric in (
+        CallbackMetric('sage_browser_pool_capacity', 'Concurrent renders the browser pool allows', lambda: pool_stats()['capacity']),
+        CallbackMetric('sage_browser_pool_active_pages', 'Renders currently in progress', lambda: pool_stats()['active']),
+        CallbackMetric('sage_browser_pages_served_total', 'Pages rendered by the browser pool', lambda: pool_stats()['pages_served'], type='counter'),
+        CallbackMetric('sage_browser_restarts_total', 'Browser restarts after crashes', lambda: pool_stats()['restarts'], type='counter'),
+        CallbackMetric('sage_audit_cache_entries', 'Reports held in the audit cache', lambda: cache_stats()['entries']),
+        CallbackMetric(
+            'sage_audit_cache_requests_total', 'Audit cache lookups by result',
+            lambda: {('hit',): cache_stats()['hits'], ('miss',): cache_stats()['misses']},
+            type='counter', labelnames=('result',)
+        ),
+        CallbackMetric('sage_audit_cache_hit_ratio', 'Share of audit cache lookups served from cache', lambda: cache_stats()['hit_rate']),
+        CallbackMetric(
+            'sage_admission_active', 'Slots in use per admission budget',
+            lambda: {(b.name,): b.active for b in admission.budgets}, labelnames=('budget',)
+        ),
+        CallbackMetric(
+            'sage_admission_waiting', 'Callers queued per admission budget',
+            lambda: {(b.name,): b.waiting for b in admission.budgets}, labelnames=('budget',)
+        ),
+        CallbackMetric(
+            'sage_admission_wait_seconds_total', 'Total time spent waiting for each admission budget',
+            lambda: {(b.name,): b.wait_seconds_total for b in admission.budgets}, type='counter', labelnames=('budget',)
+        ),
+        CallbackMetric('sage_admission_rejected_total', 'Audits rejected with 429', lambda: admission.rejected, type='counter'),
+        CallbackMetric('sage_audit_jobs_pending', 'Audits waiting in the job queue', lambda: audit_jobs.pending),
+        CallbackMetric('sage_audit_jobs_running', 'Audits being processed by job workers', lambda: audit_jobs.running),
+    ):
+        registry.register(metric)
+
+    snapshots = audit_engine.snapshot_store
+    if snapshots is not None:
+        registry.register(CallbackMetric(
+            'sage_snapshots_total', 'Snapshot writes by result (stored or deduplicated)',
+            lambda: {('stored',): snapshots.stored, ('deduplicated',): snapshots.deduplicated},
+            type='counter', labelnames=('result',)
+        ))
+        registry.register(CallbackMetric(
+            'sage_snapshot_bytes_stored_total', 'Compressed bytes written to the snapshot store',
+            lambda: snapshots.bytes_stored, type='counter'
+        ))
@@ -0,0 +1,147 @@
+"""
+Mongo Indexes Module
+Declares the indexes server.py's queries rely on, creates missing ones at startup and reports drift
+
+Creation is idempotent: an index that already exists with the same keys and options is left
+alone, whatever its name. An index on the same keys with different options (say a non-unique
+email index) is reported as a mismatch and never dropped automatically, and a unique index
+that cannot be built because of duplicate values is reported as failed; both need a manual
+migration. user_sessions.expires_at carries a TTL index, so MongoDB deletes expired sessions
+itself (its TTL monitor runs about once a minute; lookups still filter on expires_at).
+
+Usage:
+    python mongo_indexes.py            # report missing/mismatched indexes, exit 1 if any
+    python mongo_indexes.py --apply    # create the missing ones
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+ROOT_DIR = Path(__file__).parent
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, int]]
+    name: str
+    unique: bool = False
+    # TTL in seconds after the indexed date; 0 expires documents at that date
+    expire_after_seconds: Optional[int] = None
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return options
+
+
+INDEXES = [
+    # create_or_update_user
+    IndexSpec('users', [('email', 1)], 'users_email_unique', unique=True),
+    # get_user_from_session / delete_session
+    IndexSpec('user_sessions', [('session_token', 1)], 'user_sessions_token_unique', unique=True),
+    IndexSpec('user_sessions', [('expires_at', 1)], 'user_sessions_expires_at_ttl', expire_after_seconds=0),
+    # Audit reads and updates by id; rescore.py pages through audits in id order
+    IndexSpec('audits', [('id', 1)], 'audits_id_unique', unique=True),
+    # GET /api/audits (newest first)
+    IndexSpec('audits', [('timestamp', -1)], 'audits_timestamp_desc'),
+]
+
+
+def _differences(spec: IndexSpec, existing: Dict[str, Any]) -> List[str]:
+    differences = []
+    if bool(existing.get('unique', False)) != spec.unique:
+        differences.append(f"unique is {bool(existing.get('unique', False))}, expected {spec.unique}")
+    ttl = existing.get('expireAfterSeconds')
+    if (int(ttl) if ttl is not None else None) != spec.expire_after_seconds:
+        differences.append(f"expireAfterSeconds is {ttl}, expected {spec.expire_after_seconds}")
+    return differences
+
+
+async def check_indexes(db, specs: Optional[List[IndexSpec]] = None) -> List[Dict[str, Any]]:
+    """State of every declared index: ok, missing or mismatch (same keys, other options)"""
+    report = []
+    information: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for spec in specs or INDEXES:
+        if spec.collection not in information:
+            information[spec.collection] = await db[spec.collection].index_information()
+        entry = {"collection": spec.collection, "name": spec.name, "keys": spec.keys, "status": "missing"}
+        for name, existing in information[spec.collection].items():
+            if [tuple(key) for key in existing['key']] != [tuple(key) for key in spec.keys]:
+                continue
+            differences = _differences(spec, existing)
+            entry.update(existing_name=name, status="mismatch" if differences else "ok")
+            if differences:
+                entry["differences"] = differences
+            break
+        report.append(entry)
+    return report
+
+
+async def ensure_indexes(db, specs: Optional[List[IndexSpec]] = None) -> Dict[str, Any]:
+    """Create the missing indexes; mismatches and failed builds are logged and reported, not fatal"""
+    report = await check_indexes(db, specs)
+    by_name = {spec.name: spec for spec in specs or INDEXES}
+    for entry in report:
+        if entry["status"] == "mismatch":
+            logger.warning(f"Index on {entry['collection']} {entry['keys']} differs ({'; '.join(entry['differences'])}), leaving it as is")
+            continue
+        if entry["status"] != "missing":
+            continue
+        spec = by_name[entry["name"]]
+        try:
+            await db[spec.collection].create_index(spec.keys, **spec.options())
+            entry["status"] = "created"
+            logger.info(f"Created index {spec.name} on {spec.collection}")
+        except OperationFailure as e:
+            # e.g. duplicate values where a unique index is declared
+            entry.update(status="failed", error=str(e))
+            logger.error(f"Could not create index {spec.name} on {spec.collection}: {e}")
+
+    counts: Dict[str, int] = {}
+    for entry in report:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {"indexes": report, **counts}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apply', action='store_true', help='create missing indexes instead of only reporting them')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(ROOT_DIR / '.env')
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    try:
+        if args.apply:
+            result = asyncio.run(ensure_indexes(db))
+            healthy = not result.get('mismatch') and not result.get('failed')
+        else:
+            indexes = asyncio.run(check_indexes(db))
+            result = {"indexes": indexes}
+            healthy = all(entry["status"] == "ok" for entry in indexes)
+    finally:
+        client.close()
+
+    print(json.dumps(result, indent=2))
+    return 0 if healthy else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Parsed Document Module
+Parses a fetched page once and caches the views every analyzer needs
+"""
+
+import json
+import logging
+from typing import Any, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from dom_visitor import DOMVisitor, VisitResult, get_selector, registered_selectors
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedDocument:
+    """
+    HTML parsed a single time per audit.
+    The first query triggers one DOM walk that builds the tag-name index, collects the
+    text nodes and answers every registered analyzer selector; JSON-LD decoding and the
+    text views are derived from that walk and cached.
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self.soup = BeautifulSoup(html, 'lxml')
+
+        self._text: Optional[str] = None
+        self._text_lower: Optional[str] = None
+        self._visible_text: Optional[str] = None
+        self._compact_text_length: Optional[int] = None
+        self._visit: Optional[VisitResult] = None
+        self._json_ld: Optional[List[Any]] = None
+
+    @property
+    def text(self) -> str:
+        """All text nodes joined as-is (equivalent to soup.get_text())"""
+        if self._text is None:
+            self._load_text()
+        return self._text
+
+    @property
+    def text_lower(self) -> str:
+        """Lowercased copy of text"""
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
+
+    @property
+    def visible_text(self) -> str:
+        """Stripped text nodes joined by spaces (equivalent to soup.get_text(separator=' ', strip=True))"""
+        if self._visible_text is None:
+            self._load_text()
+        return self._visible_text
+
+    @property
+    def compact_text_length(self) -> int:
+        """Length of soup.get_text(strip=True), used to judge whether a static fetch has real content"""
+        if self._compact_text_length is None:
+            self._load_text()
+        return self._compact_text_length
+
+    @property
+    def json_ld_scripts(self) -> List[Tag]:
+        """All <script type="application/ld+json"> tags"""
+        return [script for script in self.find_all('script') if script.get('type') == 'application/ld+json']
+
+    @property
+    def json_ld(self) -> List[Any]:
+        """Decoded JSON-LD blocks; blocks that are empty or not valid JSON are skipped"""
+        if self._json_ld is None:
+            self._json_ld = []
+            for script in self.json_ld_scripts:
+                if not script.string:
+                    continue
+                try:
+                    self._json_ld.append(json.loads(script.string))
+                except json.JSONDecodeError:
+                    continue
+        return self._json_ld
+
+    def find_all(self, *names: str) -> List[Tag]:
+        """Tags with any of the given names, in document order"""
+        visit = self._get_visit()
+        if len(names) == 1:
+            return list(visit.by_name.get(names[0], []))
+        wanted = set(names)
+        return [tag for tag in visit.tags if tag.name in wanted]
+
+    def find(self, name: str) -> Optional[Tag]:
+        """First tag with the given name"""
+        tags = self._get_visit().by_name.get(name)
+        return tags[0] if tags else None
+
+    def select(self, key: str) -> List[Tag]:
+        """Nodes matched by a registered selector, in document order"""
+        visit = self._get_visit()
+        if key not in visit.matches:
+            # Registered after this document was walked: answer it with a dedicated walk
+            selector = get_selector(key)
+            if selector is None:
+                raise KeyError(f"Unknown selector: {key}")
+            visit.matches[key] = DOMVisitor([selector]).visit(self.soup).matches[key]
+        return list(visit.matches[key])
+
+    def select_one(self, key: str) -> Optional[Tag]:
+        """First node matched by a registered selector"""
+        matches = self.select(key)
+        return matches[0] if matches else None
+
+    def _get_visit(self) -> VisitResult:
+        if self._visit is None:
+            self._visit = DOMVisitor(registered_selectors()).visit(self.soup)
+        return self._visit
+
+    def _load_text(self):
+        raw_strings = self._get_visit().strings
+        stripped = [s.strip() for s in raw_strings]
+        stripped = [s for s in stripped if s]
+
+        self._text = ''.join(raw_strings)
+        self._visible_text = ' '.join(stripped)
+        self._compact_text_length = sum(len(s) for s in stripped)
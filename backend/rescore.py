@@ -0,0 +1,355 @@
+"""
+Bulk Rescore Job
+Re-runs the analyzers over stored HTML snapshots and rewrites the scores of historical audits
+
+Audits are streamed in id order in batches; each page's snapshot is loaded and analyzed in a
+process pool while the next batch is read, and each batch's new scores go back in one bulk
+write stamped with SCORING_RULES_VERSION. Audits already on the current version (Mongo) or
+without a snapshot are skipped. Progress is checkpointed after every batch, so an interrupted
+run resumes where it stopped; pages per second are logged as it goes. Pages whose snapshot
+could not be read (storage errors) are counted as errors; rerun with --restart to retry them.
+
+Usage:
+    python rescore.py --backend mongo
+    python rescore.py --backend supabase --workers 8 --batch-size 200
+    python rescore.py --backend mongo --restart --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from analysis_executor import SCORING_RULES_VERSION, analyze_html, seo_analyzer
+from snapshot_store import SnapshotStore, create_snapshot_store
+
+ROOT_DIR = Path(__file__).parent
+
+logger = logging.getLogger(__name__)
+
+# Audit ids are UUID strings; every one sorts after this
+FIRST_ID = '00000000-0000-0000-0000-000000000000'
+
+# Per-process snapshot store used by rescore_page (set by the pool initializer)
+_snapshot_store: Optional[SnapshotStore] = None
+
+
+def _init_worker():
+    global _snapshot_store
+    _snapshot_store = create_snapshot_store()
+
+
+def rescore_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: analyze one stored snapshot; never raises"""
+    try:
+        html = _snapshot_store.get(page['sha256'])
+    except KeyError:
+        return {**page, "outcome": "missing"}
+    except Exception as e:
+        # Storage trouble (network, permissions), not a missing snapshot
+        return {**page, "outcome": "error", "error": f"Snapshot read failed: {e}"}
+    try:
+        analysis = analyze_html(page['url'], html.encode('utf-8'))
+        # Link status needs the network, so the audit's original link check is carried over
+        if page.get('link_check'):
+            seo_analyzer.apply_link_check(analysis['seo'], page['link_check'])
+    except Exception as e:
+        return {**page, "outcome": "failed", "error": str(e)}
+    return {**page, "outcome": "rescored", "seo": analysis['seo'], "aeo": analysis['aeo'], "geo": analysis['geo']}
+
+
+class MongoSource:
+    """
+    Completed Mongo audits with a snapshot and an older scoring version; details are rewritten too.
+    Crawl audits are left out: their scores are site means, not the scores of the snapshotted start page.
+    """
+
+    name = 'mongo'
+
+    def __init__(self, db):
+        self.db = db
+
+    async def fetch(self, after_id: str, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        docs = await self.db.audits.find(
+            {
+                "id": {"$gt": after_id},
+                "status": "completed",
+                "snapshot.sha256": {"$exists": True},
+                "scoring_version": {"$ne": SCORING_RULES_VERSION},
+                # Missing or null: single-page audits store site=None
+                "site": None
+            },
+            {"_id": 0, "id": 1, "url": 1, "snapshot": 1, "seo_details.links.link_check": 1}
+        ).sort("id", 1).limit(limit).to_list(limit)
+        pages = [
+            {
+                "id": doc['id'],
+                "url": doc['url'],
+                "sha256": doc['snapshot']['sha256'],
+                "link_check": ((doc.get('seo_details') or {}).get('links') or {}).get('link_check')
+            }
+            for doc in docs
+        ]
+        return pages, docs[-1]['id'] if docs else None
+
+    async def write(self, results: List[Dict[str, Any]]) -> int:
+        from pymongo import UpdateOne
+
+        operations = [
+            UpdateOne({"id": result['id']}, {"$set": {
+                "seo_score": result['seo']['score'],
+                "aeo_score": result['aeo']['score'],
+                "geo_score": result['geo']['score'],
+                "seo_details": result['seo'],
+                "aeo_details": result['aeo'],
+                "geo_details": result['geo'],
+                "scoring_version": SCORING_RULES_VERSION
+            }})
+            for result in results
+        ]
+        outcome = await self.db.audits.bulk_write(operations, ordered=False)
+        return outcome.modified_count
+
+
+class SupabaseSource:
+    """
+    Completed Supabase audits with a snapshot; scores live on the audit's report row.
+    Crawl audits (site rollup set) are left out, as for Mongo.
+    The client is synchronous, so its calls run in a thread to keep the pool fed meanwhile.
+    """
+
+    name = 'supabase'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _fetch(self, after_id: str, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        rows = self.client.table('audits') \
+            .select('id, url, snapshot_sha256, reports(id, audit_id, scoring_version, link_check)') \
+            .eq('status', 'completed') \
+            .is_('site', 'null') \
+            .gt('id', after_id) \
+            .order('id') \
+            .limit(limit) \
+            .execute().data
+        pages = []
+        for row in rows:
+            report = (row.get('reports') or [None])[0]
+            if not row.get('snapshot_sha256') or not report or report.get('scoring_version') == SCORING_RULES_VERSION:
+                continue
+            pages.append({
+                "id": row['id'],
+                "url": row['url'],
+                "sha256": row['snapshot_sha256'],
+                "report_id": report['id'],
+                "link_check": report.get('link_check')
+            })
+        return pages, rows[-1]['id'] if rows else None
+
+    async def fetch(self, after_id: str, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await asyncio.to_thread(self._fetch, after_id, limit)
+
+    async def write(self, results: List[Dict[str, Any]]) -> int:
+        rows = []
+        for result in results:
+            seo, aeo, geo = result['seo']['score'], result['aeo']['score'], result['geo']['score']
+            rows.append({
+                "id": result['report_id'],
+                "audit_id": result['id'],
+                "seo_score": seo,
+                "aeo_score": aeo,
+                "geo_score": geo,
+                "overall_score": int((seo + aeo + geo) / 3),
+                "scoring_version": SCORING_RULES_VERSION
+            })
+        response = await asyncio.to_thread(lambda: self.client.table('reports').upsert(rows).execute())
+        return len(response.data)
+
+
+class Checkpoint:
+    """Last processed audit id and running totals, rewritten atomically after each batch"""
+
+    COUNTERS = ('processed', 'updated', 'missing', 'failed', 'errors')
+
+    def __init__(self, path: str, backend: str):
+        self.path = path
+        self.backend = backend
+        self.last_id = FIRST_ID
+        self.totals = {counter: 0 for counter in self.COUNTERS}
+        self.resumed = False
+
+    def load(self) -> 'Checkpoint':
+        """Resume from the file if it belongs to the same backend and scoring version"""
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get('backend') != self.backend or state.get('scoring_version') != SCORING_RULES_VERSION:
+            logger.info(f"Ignoring checkpoint {self.path} from another backend or scoring version")
+            return self
+        self.last_id = state['last_id']
+        self.totals.update({counter: state.get(counter, 0) for counter in self.COUNTERS})
+        self.resumed = True
+        logger.info(f"Resuming after audit {self.last_id} ({self.totals['processed']} already processed)")
+        return self
+
+    def save(self, done: bool = False):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                "backend": self.backend,
+                "scoring_version": SCORING_RULES_VERSION,
+                "last_id": self.last_id,
+                "done": done,
+                **self.totals
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+class Rescorer:
+    """
+    Streams, analyzes and writes back one batch at a time. workers=0 analyzes in this
+    process with `snapshot_store`; otherwise each worker process builds its own store
+    from the environment.
+    """
+
+    def __init__(
+        self,
+        source,
+        checkpoint: Checkpoint,
+        workers: int = 0,
+        batch_size: int = 100,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+        snapshot_store: Optional[SnapshotStore] = None
+    ):
+        self.source = source
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.batch_size = batch_size
+        self.limit = limit
+        self.dry_run = dry_run
+        self.snapshot_store = snapshot_store
+
+    async def _analyze(self, executor: Optional[ProcessPoolExecutor], pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if executor is None:
+            return [rescore_page(page) for page in pages]
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(executor, rescore_page, page) for page in pages))
+
+    async def run(self) -> Dict[str, Any]:
+        global _snapshot_store
+        # Workers build their store from the same environment, so check it here first
+        store = self.snapshot_store or create_snapshot_store()
+        if store is None:
+            raise RuntimeError("No snapshot store configured (SNAPSHOT_STORE=off): there is nothing to rescore from")
+        executor = None
+        if self.workers:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        else:
+            _snapshot_store = store
+
+        started = time.monotonic()
+        processed = 0
+        exhausted = False
+        try:
+            next_batch = asyncio.create_task(self.source.fetch(self.checkpoint.last_id, self.batch_size))
+            while True:
+                pages, last_id = await next_batch
+                if last_id is None:
+                    exhausted = True
+                    break
+                if self.limit is not None:
+                    remaining = self.limit - processed
+                    if remaining <= 0:
+                        break
+                    if len(pages) > remaining:
+                        pages = pages[:remaining]
+                        last_id = pages[-1]['id']
+                # Read the following batch while this one is analyzed and written
+                next_batch = asyncio.create_task(self.source.fetch(last_id, self.batch_size))
+
+                results = await self._analyze(executor, pages)
+                rescored = [result for result in results if result['outcome'] == 'rescored']
+                updated = await self.source.write(rescored) if rescored and not self.dry_run else 0
+                for result in results:
+                    if result['outcome'] in ('failed', 'error'):
+                        logger.warning(f"Rescore {result['outcome']} for audit {result['id']}: {result['error']}")
+
+                processed += len(pages)
+                totals = self.checkpoint.totals
+                totals['processed'] += len(pages)
+                totals['updated'] += updated
+                totals['missing'] += sum(1 for result in results if result['outcome'] == 'missing')
+                totals['failed'] += sum(1 for result in results if result['outcome'] == 'failed')
+                totals['errors'] += sum(1 for result in results if result['outcome'] == 'error')
+                self.checkpoint.last_id = last_id
+                if not self.dry_run:
+                    self.checkpoint.save()
+
+                elapsed = time.monotonic() - started
+                logger.info(f"{totals['processed']} processed, {totals['updated']} updated, "
+                            f"{processed / elapsed:.1f} pages/s")
+            next_batch.cancel()
+            if exhausted and not self.dry_run:
+                self.checkpoint.save(done=True)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.monotonic() - started
+        return {
+            "backend": self.source.name,
+            "scoring_version": SCORING_RULES_VERSION,
+            "resumed": self.checkpoint.resumed,
+            "dry_run": self.dry_run,
+            "done": exhausted,
+            **self.checkpoint.totals,
+            "processed_this_run": processed,
+            "seconds": round(elapsed, 2),
+            "pages_per_second": round(processed / elapsed, 2) if elapsed else None
+        }
+
+
+def connect(backend: str):
+    if backend == 'mongo':
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return MongoSource(AsyncIOMotorClient(os.environ['MONGO_URL'])[os.environ['DB_NAME']])
+    from supabase_client import get_supabase_client
+    return SupabaseSource(get_supabase_client())
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('mongo', 'supabase'), default='mongo')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='analysis processes (0 = in-process)')
+    parser.add_argument('--batch-size', type=int, default=100, help='audits per read and bulk write')
+    parser.add_argument('--limit', type=int, help='stop after this many audits')
+    parser.add_argument('--checkpoint', default='rescore_checkpoint.json', help='progress file used to resume')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='analyze but write neither scores nor checkpoint')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(ROOT_DIR / '.env')
+    if create_snapshot_store() is None:
+        parser.error("SNAPSHOT_STORE is off: rescoring needs the stored snapshots")
+    checkpoint = Checkpoint(args.checkpoint, args.backend)
+    if not args.restart:
+        checkpoint.load()
+
+    rescorer = Rescorer(connect(args.backend), checkpoint, args.workers, args.batch_size, args.limit, args.dry_run)
+    return asyncio.run(rescorer.run())
+
+
+if __name__ == "__main__":
+    print(json.dumps(main(), indent=2))
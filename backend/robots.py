@@ -0,0 +1,84 @@
+"""
+Robots Module
+Fetches and caches robots.txt per host and answers whether a URL may be crawled
+"""
+
+import logging
+import os
+from typing import List, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from cachetools import TTLCache
+
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Only the first 500 KiB of a robots.txt is honoured, as major crawlers do
+MAX_ROBOTS_BYTES = 500 * 1024
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def parse_robots(text: str) -> RobotFileParser:
+    parser = RobotFileParser()
+    parser.parse(text[:MAX_ROBOTS_BYTES].splitlines())
+    return parser
+
+
+class RobotsCache:
+    """
+    robots.txt rules per origin, kept for `ttl` seconds in a bounded TTL cache.
+    Concurrent lookups for an uncached origin share one fetch. A missing robots.txt (4xx)
+    allows everything; so does an unreachable one (5xx, network error), which is logged
+    since the site owner asked for the audit.
+    """
+
+    def __init__(self, fetcher, ttl: Optional[float] = None, maxsize: Optional[int] = None, user_agent: Optional[str] = None):
+        self.fetcher = fetcher
+        self.user_agent = user_agent or os.environ.get('ROBOTS_USER_AGENT', 'SageAuditBot')
+        self._cache = TTLCache(
+            maxsize=maxsize or int(os.environ.get('ROBOTS_CACHE_SIZE', 1024)),
+            ttl=ttl or float(os.environ.get('ROBOTS_CACHE_TTL_SECONDS', 3600))
+        )
+        self._single_flight = SingleFlight()
+
+        self.fetches = 0
+        self.hits = 0
+
+    async def rules(self, url: str) -> RobotFileParser:
+        origin = _origin(url)
+        parser = self._cache.get(origin)
+        if parser is not None:
+            self.hits += 1
+            return parser
+        parser = await self._single_flight.do(origin, lambda: self._fetch(origin))
+        self._cache[origin] = parser
+        return parser
+
+    async def _fetch(self, origin: str) -> RobotFileParser:
+        self.fetches += 1
+        try:
+            response = await self.fetcher.get(f"{origin}/robots.txt")
+        except Exception as e:
+            logger.warning(f"robots.txt unreachable for {origin}, allowing all: {e}")
+            return parse_robots('')
+        if response.status_code == 200:
+            return parse_robots(response.text)
+        if response.status_code >= 500:
+            logger.warning(f"robots.txt returned {response.status_code} for {origin}, allowing all")
+        return parse_robots('')
+
+    async def allowed(self, url: str) -> bool:
+        return (await self.rules(url)).can_fetch(self.user_agent, url)
+
+    async def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs declared in the origin's robots.txt"""
+        return (await self.rules(url)).site_maps() or []
+
+    def stats(self):
+        return {"entries": len(self._cache), "fetches": self.fetches, "hits": self.hits}
@@ -4,37 +4,52 @@ Analyzes website SEO metrics including meta tags, headings, keywords, and perfor
 """
 
 import logging
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from typing import Dict, Any, List, Union
+from urllib.parse import urljoin, urlparse
 import re
 
+from dom_visitor import Selector, register_selectors
+from findings import Findings
+from parsed_document import ParsedDocument
+
 logger = logging.getLogger(__name__)
 
+# Cap on the resolved internal and external URLs kept per page (input to crawling and link checks)
+MAX_LINK_URLS = 500
+
+# Nodes collected for this analyzer during the shared DOM walk
+register_selectors(
+    Selector('seo.meta_description', 'meta', {'name': 'description'}),
+    Selector('seo.meta_viewport', 'meta', {'name': 'viewport'}),
+    Selector('seo.meta_charset', 'meta', {'charset': True}),
+    Selector('seo.meta_robots', 'meta', {'name': 'robots'}),
+    Selector('seo.og_tags', 'meta', {'property': re.compile(r'^og:')}),
+    Selector('seo.links', 'a', {'href': True}),
+)
+
 
 class SEOAnalyzer:
-    def __init__(self):
-        self.issues = []
-        self.strengths = []
+    async def analyze(self, url: str, document: Union[str, ParsedDocument]) -> Dict[str, Any]:
+        """Analyze SEO aspects of the website (accepts raw HTML or a shared ParsedDocument)"""
+        return self.analyze_document(url, document)
     
-    async def analyze(self, url: str, html_content: str) -> Dict[str, Any]:
-        """Analyze SEO aspects of the website"""
+    def analyze_document(self, url: str, document: Union[str, ParsedDocument]) -> Dict[str, Any]:
+        """Synchronous analysis entry point, used directly by executor workers"""
         try:
-            # Reset issues and strengths for each analysis
-            self.issues = []
-            self.strengths = []
+            # Fresh accumulator per call; analyzers hold no per-audit state
+            findings = Findings()
             
-            soup = BeautifulSoup(html_content, 'lxml')
+            doc = document if isinstance(document, ParsedDocument) else ParsedDocument(document)
             
             # Analyze various SEO factors
-            meta_data = self._analyze_meta_tags(soup)
-            heading_data = self._analyze_headings(soup)
-            content_data = self._analyze_content(soup)
-            image_data = self._analyze_images(soup)
-            link_data = self._analyze_links(soup, url)
+            meta_data = self._analyze_meta_tags(doc, findings)
+            heading_data = self._analyze_headings(doc, findings)
+            content_data = self._analyze_content(doc, findings)
+            image_data = self._analyze_images(doc, findings)
+            link_data = self._analyze_links(doc, url, findings)
             
             # Calculate SEO score (0-100)
-            score = self._calculate_score()
+            score = self._calculate_score(findings)
             
             return {
                 "score": score,
@@ -43,8 +58,8 @@ class SEOAnalyzer:
                 "content": content_data,
                 "images": image_data,
                 "links": link_data,
-                "issues": self.issues,
-                "strengths": self.strengths
+                "issues": findings.issues,
+                "strengths": findings.strengths
             }
         except Exception as e:
             logger.error(f"SEO analysis error: {e}")
@@ -55,62 +70,62 @@ class SEOAnalyzer:
                 "strengths": []
             }
     
-    def _analyze_meta_tags(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_meta_tags(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze meta tags"""
-        title = soup.find('title')
+        title = doc.find('title')
         title_text = title.text.strip() if title else None
         title_length = len(title_text) if title_text else 0
         
         # Check title
         if not title_text:
-            self.issues.append("Missing page title")
+            findings.issues.append("Missing page title")
         elif title_length < 30:
-            self.issues.append(f"Title too short ({title_length} chars, recommended 50-60)")
+            findings.issues.append(f"Title too short ({title_length} chars, recommended 50-60)")
         elif title_length > 60:
-            self.issues.append(f"Title too long ({title_length} chars, recommended 50-60)")
+            findings.issues.append(f"Title too long ({title_length} chars, recommended 50-60)")
         else:
-            self.strengths.append("Title length is optimal")
+            findings.strengths.append("Title length is optimal")
         
         # Check meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = doc.select_one('seo.meta_description')
         desc_content = meta_desc.get('content', '').strip() if meta_desc else None
         desc_length = len(desc_content) if desc_content else 0
         
         if not desc_content:
-            self.issues.append("Missing meta description")
+            findings.issues.append("Missing meta description")
         elif desc_length < 120:
-            self.issues.append(f"Meta description too short ({desc_length} chars, recommended 150-160)")
+            findings.issues.append(f"Meta description too short ({desc_length} chars, recommended 150-160)")
         elif desc_length > 160:
-            self.issues.append(f"Meta description too long ({desc_length} chars, recommended 150-160)")
+            findings.issues.append(f"Meta description too long ({desc_length} chars, recommended 150-160)")
         else:
-            self.strengths.append("Meta description length is optimal")
+            findings.strengths.append("Meta description length is optimal")
         
         # Check viewport
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
+        viewport = doc.select_one('seo.meta_viewport')
         if not viewport:
-            self.issues.append("Missing viewport meta tag (not mobile-friendly)")
+            findings.issues.append("Missing viewport meta tag (not mobile-friendly)")
         else:
-            self.strengths.append("Mobile viewport configured")
+            findings.strengths.append("Mobile viewport configured")
         
         # Check charset
-        charset = soup.find('meta', attrs={'charset': True})
+        charset = doc.select_one('seo.meta_charset')
         if not charset:
-            self.issues.append("Missing charset declaration")
+            findings.issues.append("Missing charset declaration")
         
         # Check robots
-        robots = soup.find('meta', attrs={'name': 'robots'})
+        robots = doc.select_one('seo.meta_robots')
         robots_content = robots.get('content', '') if robots else ''
         
         # Check Open Graph tags
-        og_tags = soup.find_all('meta', attrs={'property': re.compile(r'^og:')})
+        og_tags = doc.select('seo.og_tags')
         og_count = len(og_tags)
         
         if og_count == 0:
-            self.issues.append("Missing Open Graph tags for social sharing")
+            findings.issues.append("Missing Open Graph tags for social sharing")
         elif og_count < 4:
-            self.issues.append("Incomplete Open Graph tags (minimum: og:title, og:description, og:image, og:url)")
+            findings.issues.append("Incomplete Open Graph tags (minimum: og:title, og:description, og:image, og:url)")
         else:
-            self.strengths.append("Open Graph tags present for social sharing")
+            findings.strengths.append("Open Graph tags present for social sharing")
         
         return {
             "title": title_text,
@@ -123,25 +138,25 @@ class SEOAnalyzer:
             "og_tags_count": og_count
         }
     
-    def _analyze_headings(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_headings(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze heading structure"""
-        h1_tags = soup.find_all('h1')
+        h1_tags = doc.find_all('h1')
         h1_count = len(h1_tags)
         
         if h1_count == 0:
-            self.issues.append("Missing H1 tag")
+            findings.issues.append("Missing H1 tag")
         elif h1_count > 1:
-            self.issues.append(f"Multiple H1 tags found ({h1_count}), should have only one")
+            findings.issues.append(f"Multiple H1 tags found ({h1_count}), should have only one")
         else:
-            self.strengths.append("Single H1 tag present")
+            findings.strengths.append("Single H1 tag present")
         
         # Count other headings
-        h2_count = len(soup.find_all('h2'))
-        h3_count = len(soup.find_all('h3'))
-        h4_count = len(soup.find_all('h4'))
+        h2_count = len(doc.find_all('h2'))
+        h3_count = len(doc.find_all('h3'))
+        h4_count = len(doc.find_all('h4'))
         
         if h2_count == 0:
-            self.issues.append("No H2 tags found (poor content structure)")
+            findings.issues.append("No H2 tags found (poor content structure)")
         
         return {
             "h1_count": h1_count,
@@ -152,23 +167,23 @@ class SEOAnalyzer:
             "total_headings": h1_count + h2_count + h3_count + h4_count
         }
     
-    def _analyze_content(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_content(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze content quality"""
         # Get all text content
-        text_content = soup.get_text(separator=' ', strip=True)
+        text_content = doc.visible_text
         word_count = len(text_content.split())
         
         if word_count < 300:
-            self.issues.append(f"Low word count ({word_count} words, recommended 300+ for SEO)")
+            findings.issues.append(f"Low word count ({word_count} words, recommended 300+ for SEO)")
         elif word_count > 300:
-            self.strengths.append(f"Good content length ({word_count} words)")
+            findings.strengths.append(f"Good content length ({word_count} words)")
         
         # Check for paragraphs
-        paragraphs = soup.find_all('p')
+        paragraphs = doc.find_all('p')
         p_count = len(paragraphs)
         
         if p_count < 3:
-            self.issues.append("Limited paragraph content")
+            findings.issues.append("Limited paragraph content")
         
         return {
             "word_count": word_count,
@@ -176,18 +191,18 @@ class SEOAnalyzer:
             "text_length": len(text_content)
         }
     
-    def _analyze_images(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_images(self, doc: ParsedDocument, findings: Findings) -> Dict[str, Any]:
         """Analyze image optimization"""
-        images = soup.find_all('img')
+        images = doc.find_all('img')
         total_images = len(images)
         images_without_alt = sum(1 for img in images if not img.get('alt'))
         images_with_alt = total_images - images_without_alt
         
         if total_images > 0:
             if images_without_alt > 0:
-                self.issues.append(f"{images_without_alt} of {total_images} images missing alt text")
+                findings.issues.append(f"{images_without_alt} of {total_images} images missing alt text")
             else:
-                self.strengths.append("All images have alt text")
+                findings.strengths.append("All images have alt text")
         
         return {
             "total_images": total_images,
@@ -196,13 +211,15 @@ class SEOAnalyzer:
             "alt_coverage": (images_with_alt / total_images * 100) if total_images > 0 else 0
         }
     
-    def _analyze_links(self, soup: BeautifulSoup, base_url: str) -> Dict[str, Any]:
+    def _analyze_links(self, doc: ParsedDocument, base_url: str, findings: Findings) -> Dict[str, Any]:
         """Analyze internal and external links"""
-        links = soup.find_all('a', href=True)
+        links = doc.select('seo.links')
         base_domain = urlparse(base_url).netloc
         
         internal_links = []
         external_links = []
+        internal_urls = {}
+        external_urls = {}
         broken_links = 0
         
         for link in links:
@@ -218,32 +235,62 @@ class SEOAnalyzer:
                     internal_links.append(href)
                 else:
                     external_links.append(href)
+                    if len(external_urls) < MAX_LINK_URLS:
+                        external_urls.setdefault(href.split('#', 1)[0], None)
+                    continue
             else:
                 internal_links.append(href)
+            
+            # Absolute, fragment-free form of crawlable internal links (skips mailto:, tel:, javascript:)
+            if len(internal_urls) < MAX_LINK_URLS:
+                try:
+                    absolute = urlparse(urljoin(base_url, href))._replace(fragment='')
+                except ValueError:
+                    continue
+                if absolute.scheme in ('http', 'https') and absolute.netloc == base_domain:
+                    internal_urls.setdefault(absolute.geturl(), None)
         
         total_links = len(links)
         internal_count = len(internal_links)
         external_count = len(external_links)
         
         if total_links == 0:
-            self.issues.append("No links found on the page")
+            findings.issues.append("No links found on the page")
         elif internal_count < 3:
-            self.issues.append("Few internal links (poor site structure)")
+            findings.issues.append("Few internal links (poor site structure)")
         
         return {
             "total_links": total_links,
             "internal_links": internal_count,
             "external_links": external_count,
-            "broken_links": broken_links
+            "broken_links": broken_links,
+            "internal_urls": list(internal_urls),
+            "external_urls": list(external_urls)
         }
     
-    def _calculate_score(self) -> int:
+    def apply_link_check(self, results: Dict[str, Any], link_check: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fold a LinkChecker result into finished SEO results: set broken_links, add the issue
+        and recompute the score. Links are verified after analysis because it needs network I/O.
+        """
+        if 'error' in results or 'links' not in results:
+            return results
+        results['links']['broken_links'] = link_check['broken']
+        results['links']['link_check'] = link_check
+        if link_check['broken']:
+            results['issues'].append(f"{link_check['broken']} broken link{'s' if link_check['broken'] != 1 else ''} found")
+            findings = Findings()
+            findings.issues, findings.strengths = results['issues'], results['strengths']
+            results['score'] = self._calculate_score(findings)
+        return results
+    
+    def _calculate_score(self, findings: Findings) -> int:
         """Calculate overall SEO score based on issues and strengths"""
         base_score = 100
         
         # Deduct points for issues
         penalty_per_issue = 5
-        score = base_score - (len(self.issues) * penalty_per_issue)
+        score = base_score - (len(findings.issues) * penalty_per_issue)
         
         # Ensure score is between 0 and 100
         score = max(0, min(100, score))
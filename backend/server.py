@@ -1,17 +1,26 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
 from datetime import datetime, timezone
 import random
+import time
 
+from admission import AdmissionRejected
 from audit_engine import AuditEngine
+from audit_events import AuditEventBroker
+from audit_jobs import AuditJobQueue, QueueFullError
+from metrics import AUDIT_PERSIST_DURATION, instrument_app
+from mongo_indexes import ensure_indexes
+from session_cache import get_session_cache
+from timings import elapsed_ms
 from auth import (
     process_session_id,
     create_or_update_user,
@@ -46,6 +55,12 @@ audit_engine = AuditEngine()
 # Define Models
 class AuditRequest(BaseModel):
     url: str
+    # Whole-site audit: crawl internal links from `url` (limits default to CRAWL_MAX_PAGES / CRAWL_MAX_DEPTH)
+    crawl: bool = False
+    max_pages: Optional[int] = Field(default=None, ge=1)
+    max_depth: Optional[int] = Field(default=None, ge=0)
+    # Incremental re-crawl: skip sitemap URLs whose lastmod is older than this
+    changed_since: Optional[datetime] = None
 
 class Recommendation(BaseModel):
     category: str
@@ -58,15 +73,19 @@ class Audit(BaseModel):
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     url: str
-    seo_score: int
-    aeo_score: int
-    geo_score: int
-    recommendations: List[Recommendation]
+    seo_score: int = 0
+    aeo_score: int = 0
+    geo_score: int = 0
+    recommendations: List[Recommendation] = []
     status: str = "completed"
     seo_details: Optional[Dict[str, Any]] = None
     aeo_details: Optional[Dict[str, Any]] = None
     geo_details: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    scoring_version: Optional[int] = None
+    site: Optional[Dict[str, Any]] = None
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
@@ -230,46 +249,191 @@ async def get_current_user(request: Request) -> User:
     return user
 
 
+async def run_audit_job(
+    audit_id: str,
+    url: str,
+    queued_at: Optional[float] = None,
+    insert_ms: Optional[float] = None,
+    crawl: Optional[Dict[str, Any]] = None
+):
+    """Background worker: run a queued audit and store the results (and its timings) on its record"""
+    queue_wait_ms = elapsed_ms(queued_at)
+    try:
+        await db.audits.update_one({"id": audit_id}, {"$set": {"status": "running"}})
+        audit_events.publish(audit_id, "running", {"url": url})
+        
+        if crawl is not None:
+            audit_results = await audit_engine.run_site_audit(url, progress=audit_events.progress(audit_id), **crawl)
+        else:
+            audit_results = await audit_engine.run_audit(url, progress=audit_events.progress(audit_id))
+        update = {
+            "url": audit_results['url'],
+            "seo_score": audit_results['seo_score'],
+            "aeo_score": audit_results['aeo_score'],
+            "geo_score": audit_results['geo_score'],
+            "recommendations": audit_results.get('recommendations', []),
+            "status": audit_results.get('status', 'completed'),
+            "seo_details": audit_results.get('seo_details'),
+            "aeo_details": audit_results.get('aeo_details'),
+            "geo_details": audit_results.get('geo_details'),
+            "error": audit_results.get('error'),
+            "snapshot": audit_results.get('snapshot'),
+            "scoring_version": audit_results.get('scoring_version'),
+            "site": audit_results.get('site'),
+            "timings": audit_results.get('timings', {})
+        }
+    except Exception as e:
+        logger.error(f"Audit job error: {e}")
+        update = {"status": "failed", "error": str(e), "timings": {}}
+    
+    update['timings'].update({"insert_ms": insert_ms, "queue_wait_ms": queue_wait_ms})
+    
+    persist_started = time.monotonic()
+    persist_ms = None
+    try:
+        await db.audits.update_one({"id": audit_id}, {"$set": update})
+        # The write can only be timed after it happened, so its duration is logged and
+        # observed in the metrics instead of being stored with the timings
+        persist_ms = elapsed_ms(persist_started)
+        AUDIT_PERSIST_DURATION.observe(persist_ms / 1000, backend='mongo')
+        audit_events.publish(audit_id, "persisted")
+    except Exception as e:
+        # Subscribers still get a terminal event; the record is failed if the database lets us
+        logger.error(f"Could not store the result of audit {audit_id}: {e}")
+        update = {"status": "failed", "error": f"Could not store the audit result: {e}"}
+        try:
+            await db.audits.update_one({"id": audit_id}, {"$set": update})
+        except Exception as update_error:
+            logger.error(f"Could not mark audit {audit_id} failed: {update_error}")
+    audit_events.publish(audit_id, update['status'], {
+        key: update.get(key) for key in ("seo_score", "aeo_score", "geo_score", "error")
+    })
+    logger.info(f"Audit {audit_id} finished for {url}: {update['status']} (persisted in {persist_ms}ms)")
+
+
+async def fail_unfinished_audits(query: Dict[str, Any], error: str) -> int:
+    """Mark pending/running audits matching `query` failed (their job will never finish)"""
+    result = await db.audits.update_many(
+        {**query, "status": {"$in": ["pending", "running"]}},
+        {"$set": {"status": "failed", "error": error}}
+    )
+    return result.modified_count
+
+
+async def load_audit_state(audit_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Stored status of an audit and the payload of its terminal event"""
+    audit = await db.audits.find_one(
+        {"id": audit_id}, {"_id": 0, "status": 1, "seo_score": 1, "aeo_score": 1, "geo_score": 1, "error": 1}
+    )
+    if not audit:
+        return None
+    return audit.get('status'), {key: audit.get(key) for key in ("seo_score", "aeo_score", "geo_score", "error")}
+
+
+# Stage events for live progress streams
+audit_events = AuditEventBroker()
+
+# Bounded worker pool that runs queued audits
+audit_jobs = AuditJobQueue(run_audit_job)
+
+
 @api_router.post("/audit", response_model=Audit)
 async def create_audit(request: AuditRequest):
-    """Run a real website audit and return scores with AI-powered recommendations"""
+    """
+    Queue a website audit and return its pending record immediately
+    Poll GET /api/audits/{id} until status is completed or failed
+    """
     try:
-        # Run the audit
-        logger.info(f"Starting audit for: {request.url}")
-        audit_results = await audit_engine.run_audit(request.url)
-        
-        # Create audit object
-        audit_obj = Audit(
-            url=audit_results['url'],
-            seo_score=audit_results['seo_score'],
-            aeo_score=audit_results['aeo_score'],
-            geo_score=audit_results['geo_score'],
-            recommendations=audit_results.get('recommendations', []),
-            status=audit_results.get('status', 'completed'),
-            seo_details=audit_results.get('seo_details'),
-            aeo_details=audit_results.get('aeo_details'),
-            geo_details=audit_results.get('geo_details'),
-            error=audit_results.get('error')
-        )
+        audit_engine.admission.admit(audit_jobs.pending)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {e}", headers={"Retry-After": str(e.retry_after)})
+    
+    try:
+        audit_obj = Audit(url=request.url, status="pending")
         
-        # Store in database
+        # Store the pending record before a worker can pick the job up
         doc = audit_obj.model_dump()
         doc['timestamp'] = doc['timestamp'].isoformat()
         
+        insert_started = time.monotonic()
         await db.audits.insert_one(doc)
         
-        logger.info(f"Audit completed for {request.url}: SEO={audit_obj.seo_score}, AEO={audit_obj.aeo_score}, GEO={audit_obj.geo_score}")
+        audit_jobs.submit(
+            audit_obj.id,
+            url=request.url,
+            queued_at=time.monotonic(),
+            insert_ms=elapsed_ms(insert_started),
+            crawl={
+                "max_pages": request.max_pages,
+                "max_depth": request.max_depth,
+                "changed_since": request.changed_since
+            } if request.crawl else None
+        )
+        audit_events.publish(audit_obj.id, "queued", {"url": request.url})
+        logger.info(f"Queued audit {audit_obj.id} for: {request.url}")
         
         return audit_obj
         
+    except QueueFullError as e:
+        await db.audits.update_one({"id": audit_obj.id}, {"$set": {"status": "failed", "error": str(e)}})
+        raise HTTPException(
+            status_code=429,
+            detail="Server busy: audit queue is full",
+            headers={"Retry-After": str(audit_engine.admission.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Audit endpoint error: {e}")
         raise HTTPException(status_code=500, detail=f"Audit failed: {str(e)}")
 
+@api_router.get("/audits/{audit_id}/events")
+async def stream_audit_events(audit_id: str, request: Request):
+    """
+    Server-Sent Events stream of an audit's stages (queued, fetch, scores, recommendations,
+    persisted, completed/failed). Disconnecting only ends the stream, never the audit.
+    """
+    last_event_id = request.headers.get('last-event-id', '0')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    if audit_events.has_events(audit_id):
+        events = audit_events.stream(audit_id, last_event_id)
+    else:
+        # Not live on this instance (finished long ago, running elsewhere or lost in a
+        # restart): follow the stored state
+        state = await load_audit_state(audit_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Audit not found")
+        events = audit_events.watch(audit_id, lambda: load_audit_state(audit_id), state, last_event_id)
+    
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.get("/admission/stats")
+async def get_admission_stats():
+    """Concurrency budgets, queue waits and rejections of the admission controller"""
+    return {**audit_engine.admission.stats(), "jobs": audit_jobs.stats()}
+
+
+@api_router.get("/audit-cache/stats")
+async def get_audit_cache_stats():
+    """Hit/miss statistics for the audit result cache"""
+    return audit_engine.audit_cache.stats()
+
+
+@api_router.get("/session-cache/stats")
+async def get_session_cache_stats():
+    """Hit/miss statistics for the session token cache"""
+    return get_session_cache().stats()
+
+
 @api_router.get("/audits", response_model=List[Audit])
 async def get_audits():
     """Get all audit history"""
-    audits = await db.audits.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
+    # Per-page crawl rollups are only needed on the detail view
+    audits = await db.audits.find({}, {"_id": 0, "site": 0}).sort("timestamp", -1).to_list(100)
     
     # Convert ISO string timestamps back to datetime objects
     for audit in audits:
@@ -279,8 +443,9 @@ async def get_audits():
     return audits
 
 @api_router.get("/report/{audit_id}")
+@api_router.get("/audits/{audit_id}")
 async def get_report(audit_id: str):
-    """Get detailed report for a specific audit"""
+    """Get detailed report (or pending/running status) for a specific audit"""
     audit = await db.audits.find_one({"id": audit_id}, {"_id": 0})
     
     if not audit:
@@ -295,6 +460,9 @@ async def get_report(audit_id: str):
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus /metrics endpoint and request/engine instrumentation
+instrument_app(app, audit_engine, audit_jobs)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -310,6 +478,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_audit_engine():
+    if os.environ.get('MONGO_ENSURE_INDEXES', '1') == '1':
+        try:
+            await ensure_indexes(db)
+        except Exception as e:
+            # An unreachable database fails the requests that need it, not the whole server
+            logger.error(f"Index bootstrap failed: {e}")
+    # Off by default: with several workers or pods on one database, "pending/running" also
+    # matches audits another live instance is running. Enable only for a single instance,
+    # where unfinished records were necessarily lost with the previous process.
+    if os.environ.get('AUDIT_FAIL_ORPHANS_ON_STARTUP', '0') == '1':
+        try:
+            orphaned = await fail_unfinished_audits({}, "Server restarted before the audit finished")
+            if orphaned:
+                logger.warning(f"Marked {orphaned} orphaned audits failed")
+        except Exception as e:
+            logger.error(f"Orphaned audit cleanup failed: {e}")
+    await audit_engine.start()
+    await audit_jobs.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    interrupted = await audit_jobs.stop()
+    if interrupted:
+        error = "Server shut down before the audit finished"
+        try:
+            await fail_unfinished_audits({"id": {"$in": interrupted}}, error)
+        except Exception as e:
+            logger.error(f"Could not mark {len(interrupted)} interrupted audits failed: {e}")
+        for audit_id in interrupted:
+            audit_events.publish(audit_id, "failed", {"error": error})
+    await audit_engine.stop()
     client.close()
\ No newline at end of file
@@ -1,15 +1,22 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
 from datetime import datetime, timezone
+import time
 
+from admission import AdmissionRejected
 from audit_engine import AuditEngine
+from audit_events import AuditEventBroker
+from audit_jobs import AuditJobQueue, QueueFullError
+from metrics import AUDIT_PERSIST_DURATION, instrument_app
+from session_cache import get_session_cache
 from auth_supabase import (
     process_session_id,
     create_or_update_user,
@@ -21,7 +28,8 @@ from auth_supabase import (
     clear_session_cookie,
     User
 )
-from supabase_client import get_supabase_client
+from supabase_repository import get_repository
+from timings import elapsed_ms
 
 
 ROOT_DIR = Path(__file__).parent
@@ -36,13 +44,19 @@ api_router = APIRouter(prefix="/api")
 # Initialize audit engine
 audit_engine = AuditEngine()
 
-# Get Supabase client
-supabase = get_supabase_client()
+# Async Supabase access (blocking client calls run on a bounded thread pool)
+repository = get_repository()
 
 
 # Define Models
 class AuditRequest(BaseModel):
     url: str
+    # Whole-site audit: crawl internal links from `url` (limits default to CRAWL_MAX_PAGES / CRAWL_MAX_DEPTH)
+    crawl: bool = False
+    max_pages: Optional[int] = Field(default=None, ge=1)
+    max_depth: Optional[int] = Field(default=None, ge=0)
+    # Incremental re-crawl: skip sitemap URLs whose lastmod is older than this
+    changed_since: Optional[datetime] = None
 
 class Recommendation(BaseModel):
     category: str
@@ -168,110 +182,201 @@ async def get_current_user(request: Request) -> User:
     return user
 
 
-@api_router.post("/audits", response_model=AuditResponse)
-async def create_audit(request_data: AuditRequest, current_user: User = Depends(get_current_user)):
-    """Run a website audit and return results"""
+async def run_audit_job(
+    audit_id: str,
+    url: str,
+    queued_at: Optional[float] = None,
+    insert_ms: Optional[float] = None,
+    crawl: Optional[Dict[str, Any]] = None
+):
+    """Background worker: run a queued audit and store its report and timings"""
+    timings = {"insert_ms": insert_ms, "queue_wait_ms": elapsed_ms(queued_at)}
     try:
-        audit_id = str(uuid.uuid4())
-        
-        # Create audit record in pending state
-        audit_doc = {
-            "id": audit_id,
-            "user_id": current_user.id,
-            "url": request_data.url,
-            "status": "running",
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
+        await repository.update_audit(audit_id, {"status": "running"})
+        audit_events.publish(audit_id, "running", {"url": url})
         
-        result = supabase.table('audits').insert(audit_doc).execute()
+        logger.info(f"Starting audit for: {url}")
+        if crawl is not None:
+            audit_results = await audit_engine.run_site_audit(url, progress=audit_events.progress(audit_id), **crawl)
+        else:
+            audit_results = await audit_engine.run_audit(url, progress=audit_events.progress(audit_id))
         
-        if not result.data:
-            raise HTTPException(status_code=500, detail="Failed to create audit")
+        timings.update(audit_results.get('timings', {}))
         
-        # Run the audit
-        logger.info(f"Starting audit for: {request_data.url}")
-        audit_results = await audit_engine.run_audit(request_data.url)
+        if audit_results.get('status') == 'failed':
+            raise RuntimeError(audit_results.get('error', 'Audit failed'))
         
         # Calculate overall score
         overall_score = int((audit_results['seo_score'] + audit_results['aeo_score'] + audit_results['geo_score']) / 3)
         
-        # Update audit status
-        supabase.table('audits').update({
-            "status": "completed",
-            "completed_at": datetime.now(timezone.utc).isoformat()
-        }).eq('id', audit_id).execute()
-        
         # Create report
         report_doc = {
-            "audit_id": audit_id,
             "overall_score": overall_score,
             "seo_score": audit_results['seo_score'],
             "aeo_score": audit_results['aeo_score'],
-            "geo_score": audit_results['geo_score']
+            "geo_score": audit_results['geo_score'],
+            "scoring_version": audit_results.get('scoring_version'),
+            # Kept so rescore.py can reapply the broken-links penalty
+            "link_check": ((audit_results.get('seo_details') or {}).get('links') or {}).get('link_check')
         }
         
-        report_result = supabase.table('reports').insert(report_doc).execute()
+        # Report items (detailed findings)
+        report_items = []
+        for rec in audit_results.get('recommendations', []):
+            report_items.append({
+                "category": rec['category'].lower(),
+                "check_name": rec['issue'],
+                "status": "fail" if rec['priority'] in ['High', 'Medium'] else "warning",
+                "description": rec['issue'],
+                "recommendation": rec['solution'],
+                "score_impact": 10 if rec['priority'] == 'High' else 5 if rec['priority'] == 'Medium' else 2
+            })
+        
+        # Report, items and the completed status in one transaction, so pollers never see a
+        # bare or half-written audit (persist time is logged and observed: the timings are part of the write)
+        persist_started = time.monotonic()
+        await repository.complete_audit(audit_id, {
+            "timings": timings,
+            "snapshot_sha256": (audit_results.get('snapshot') or {}).get('sha256'),
+            "site": audit_results.get('site'),
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        }, report_doc, report_items)
+        persist_ms = elapsed_ms(persist_started)
+        AUDIT_PERSIST_DURATION.observe(persist_ms / 1000, backend='supabase')
         
-        if not report_result.data:
-            raise HTTPException(status_code=500, detail="Failed to create report")
+        audit_events.publish(audit_id, "persisted")
+        audit_events.publish(audit_id, "completed", {
+            "seo_score": audit_results['seo_score'],
+            "aeo_score": audit_results['aeo_score'],
+            "geo_score": audit_results['geo_score'],
+            "overall_score": overall_score
+        })
+        logger.info(f"Audit completed for {url}: SEO={audit_results['seo_score']}, AEO={audit_results['aeo_score']}, GEO={audit_results['geo_score']} (persisted in {persist_ms}ms)")
         
-        report_id = report_result.data[0]['id']
+    except Exception as e:
+        logger.error(f"Audit job error: {e}")
         
-        # Store report items (detailed findings)
-        if 'recommendations' in audit_results:
-            report_items = []
-            for rec in audit_results['recommendations']:
-                item = {
-                    "report_id": report_id,
-                    "category": rec['category'].lower(),
-                    "check_name": rec['issue'],
-                    "status": "fail" if rec['priority'] in ['High', 'Medium'] else "warning",
-                    "description": rec['issue'],
-                    "recommendation": rec['solution'],
-                    "score_impact": 10 if rec['priority'] == 'High' else 5 if rec['priority'] == 'Medium' else 2
-                }
-                report_items.append(item)
-            
-            if report_items:
-                supabase.table('report_items').insert(report_items).execute()
+        # Subscribers get the failed event even if the database rejects this write too
+        try:
+            await repository.update_audit(audit_id, {
+                "status": "failed",
+                "error_message": str(e),
+                "timings": timings,
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            })
+        except Exception as update_error:
+            logger.error(f"Could not mark audit {audit_id} failed: {update_error}")
+        audit_events.publish(audit_id, "failed", {"error": str(e)})
+
+
+# Stage events for live progress streams
+audit_events = AuditEventBroker()
+
+# Bounded worker pool that runs queued audits
+audit_jobs = AuditJobQueue(run_audit_job)
+
+
+@api_router.post("/audits", response_model=AuditResponse)
+async def create_audit(request_data: AuditRequest, current_user: User = Depends(get_current_user)):
+    """
+    Queue a website audit and return its pending record immediately
+    Poll GET /api/audits/{id} until status is completed or failed
+    """
+    try:
+        audit_engine.admission.admit(audit_jobs.pending)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {e}", headers={"Retry-After": str(e.retry_after)})
+    
+    try:
+        audit_id = str(uuid.uuid4())
         
-        logger.info(f"Audit completed for {request_data.url}: SEO={audit_results['seo_score']}, AEO={audit_results['aeo_score']}, GEO={audit_results['geo_score']}")
+        # Create audit record in pending state
+        audit_doc = {
+            "id": audit_id,
+            "user_id": current_user.id,
+            "url": request_data.url,
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        insert_started = time.monotonic()
+        created = await repository.insert_audit(audit_doc)
+        
+        if not created:
+            raise HTTPException(status_code=500, detail="Failed to create audit")
+        
+        audit_jobs.submit(
+            audit_id,
+            url=request_data.url,
+            queued_at=time.monotonic(),
+            insert_ms=elapsed_ms(insert_started),
+            crawl={
+                "max_pages": request_data.max_pages,
+                "max_depth": request_data.max_depth,
+                "changed_since": request_data.changed_since
+            } if request_data.crawl else None
+        )
+        audit_events.publish(audit_id, "queued", {"url": request_data.url})
+        logger.info(f"Queued audit {audit_id} for: {request_data.url}")
         
         return AuditResponse(
             id=audit_id,
             url=request_data.url,
-            status="completed",
-            seo_score=audit_results['seo_score'],
-            aeo_score=audit_results['aeo_score'],
-            geo_score=audit_results['geo_score'],
-            overall_score=overall_score,
-            created_at=audit_doc['created_at'],
-            completed_at=datetime.now(timezone.utc).isoformat()
+            status="pending",
+            created_at=audit_doc['created_at']
         )
         
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        await repository.update_audit(audit_id, {
+            "status": "failed",
+            "error_message": str(e),
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        })
+        raise HTTPException(
+            status_code=429,
+            detail="Server busy: audit queue is full",
+            headers={"Retry-After": str(audit_engine.admission.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Audit endpoint error: {e}")
-        
-        # Update audit status to failed
-        if 'audit_id' in locals():
-            supabase.table('audits').update({
-                "status": "failed",
-                "error_message": str(e),
-                "completed_at": datetime.now(timezone.utc).isoformat()
-            }).eq('id', audit_id).execute()
-        
         raise HTTPException(status_code=500, detail=f"Audit failed: {str(e)}")
 
 
+@api_router.get("/admission/stats")
+async def get_admission_stats():
+    """Concurrency budgets, queue waits and rejections of the admission controller"""
+    return {**audit_engine.admission.stats(), "jobs": audit_jobs.stats()}
+
+
+@api_router.get("/db/stats")
+async def get_db_stats():
+    """Queries issued and in flight on the Supabase thread pool"""
+    return repository.stats()
+
+
+@api_router.get("/audit-cache/stats")
+async def get_audit_cache_stats():
+    """Hit/miss statistics for the audit result cache"""
+    return audit_engine.audit_cache.stats()
+
+
+@api_router.get("/session-cache/stats")
+async def get_session_cache_stats():
+    """Hit/miss statistics for the session token cache"""
+    return get_session_cache().stats()
+
+
 @api_router.get("/audits", response_model=List[AuditResponse])
 async def get_audits(current_user: User = Depends(get_current_user)):
     """Get all audits for the current user (My Audits)"""
     try:
         # Get audits for current user
-        result = supabase.table('audits').select('*, reports(*)').eq('user_id', current_user.id).order('created_at', desc=True).limit(100).execute()
+        rows = await repository.list_audits(current_user.id)
         
         audits = []
-        for audit in result.data:
+        for audit in rows:
             audit_response = AuditResponse(
                 id=audit['id'],
                 url=audit['url'],
@@ -302,20 +407,21 @@ async def get_audit_detail(audit_id: str, current_user: User = Depends(get_curre
     """Get detailed report for a specific audit"""
     try:
         # Get audit with report and report items
-        audit_result = supabase.table('audits').select('*, reports(*, report_items(*))').eq('id', audit_id).eq('user_id', current_user.id).execute()
+        audit = await repository.get_audit(audit_id, current_user.id, '*, reports(*, report_items(*))')
         
-        if not audit_result.data or len(audit_result.data) == 0:
+        if not audit:
             raise HTTPException(status_code=404, detail="Audit not found")
         
-        audit = audit_result.data[0]
-        
         response = {
             "id": audit['id'],
             "url": audit['url'],
             "status": audit['status'],
             "created_at": audit['created_at'],
             "completed_at": audit.get('completed_at'),
-            "error_message": audit.get('error_message')
+            "error_message": audit.get('error_message'),
+            "timings": audit.get('timings'),
+            "snapshot_sha256": audit.get('snapshot_sha256'),
+            "site": audit.get('site')
         }
         
         # Add report data if exists
@@ -336,9 +442,52 @@ async def get_audit_detail(audit_id: str, current_user: User = Depends(get_curre
         raise HTTPException(status_code=500, detail="Failed to fetch audit detail")
 
 
+@api_router.get("/audits/{audit_id}/events")
+async def stream_audit_events(audit_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of an audit's stages (queued, fetch, scores, recommendations,
+    persisted, completed/failed). Disconnecting only ends the stream, never the audit.
+    """
+    async def load_state() -> Optional[Tuple[str, Dict[str, Any]]]:
+        audit = await repository.get_audit(audit_id, current_user.id, 'status, error_message, reports(*)')
+        if not audit:
+            return None
+        report = audit['reports'][0] if audit.get('reports') else {}
+        return audit['status'], {
+            "seo_score": report.get('seo_score'),
+            "aeo_score": report.get('aeo_score'),
+            "geo_score": report.get('geo_score'),
+            "overall_score": report.get('overall_score'),
+            "error": audit.get('error_message')
+        }
+    
+    state = await load_state()
+    if state is None:
+        raise HTTPException(status_code=404, detail="Audit not found")
+    
+    last_event_id = request.headers.get('last-event-id', '0')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    if audit_events.has_events(audit_id):
+        events = audit_events.stream(audit_id, last_event_id)
+    else:
+        # Not live on this instance (finished long ago, running elsewhere or lost in a
+        # restart): follow the stored state
+        events = audit_events.watch(audit_id, load_state, state, last_event_id)
+    
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus /metrics endpoint and request/engine instrumentation
+instrument_app(app, audit_engine, audit_jobs)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -353,3 +502,34 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+
+@app.on_event("startup")
+async def start_audit_engine():
+    # Off by default: with several workers or pods on one database, "pending/running" also
+    # matches audits another live instance is running. Enable only for a single instance,
+    # where unfinished records were necessarily lost with the previous process.
+    if os.environ.get('AUDIT_FAIL_ORPHANS_ON_STARTUP', '0') == '1':
+        try:
+            orphaned = await repository.fail_unfinished_audits(
+                "Server restarted before the audit finished", datetime.now(timezone.utc).isoformat()
+            )
+            if orphaned:
+                logger.warning(f"Marked {orphaned} orphaned audits failed")
+        except Exception as e:
+            logger.error(f"Orphaned audit cleanup failed: {e}")
+    await audit_engine.start()
+    await audit_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_audit_engine():
+    interrupted = await audit_jobs.stop()
+    if interrupted:
+        error = "Server shut down before the audit finished"
+        try:
+            await repository.fail_unfinished_audits(error, datetime.now(timezone.utc).isoformat(), interrupted)
+        except Exception as e:
+            logger.error(f"Could not mark {len(interrupted)} interrupted audits failed: {e}")
+        for audit_id in interrupted:
+            audit_events.publish(audit_id, "failed", {"error": error})
+    await audit_engine.stop()
+    repository.close()
@@ -0,0 +1,125 @@
+"""
+Session Cache Module
+Bounded in-process cache of session token -> user, including short-lived negative entries
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Returned by SessionCache.get when the token has to be looked up
+MISS = object()
+
+
+def join_lookup_enabled() -> bool:
+    """Whether a cache miss resolves session and user with one join query instead of two lookups"""
+    return os.environ.get('SESSION_LOOKUP_JOIN', '1') == '1'
+
+
+class SessionCache:
+    """
+    Users are cached for `ttl` seconds but never past their session's expires_at.
+    Unknown or expired tokens are remembered for `negative_ttl` seconds in a separate
+    LRU, so a stream of bad tokens cannot push out real sessions. The cache is per
+    process: a logout on another instance takes effect here within `ttl`.
+
+    A lookup that overlaps an invalidation is not cached (see `generation`), so a
+    deleted session cannot be put back by a request that read it just before.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None, negative_ttl: Optional[float] = None):
+        self.max_entries = max_entries or int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', 10000))
+        self.ttl = ttl if ttl is not None else float(os.environ.get('SESSION_CACHE_TTL_SECONDS', 60))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.environ.get('SESSION_CACHE_NEGATIVE_TTL_SECONDS', 5))
+        # token -> (monotonic expiry, user)
+        self._users = LRUCache(self.max_entries)
+        # token -> monotonic expiry
+        self._missing = LRUCache(self.max_entries)
+        self.generation = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Any:
+        """The cached user, None for a cached unknown token, or MISS"""
+        now = time.monotonic()
+        entry = self._users.get(token)
+        if entry is not None:
+            if entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            del self._users[token]
+        expires = self._missing.get(token)
+        if expires is not None:
+            if expires > now:
+                self.negative_hits += 1
+                return None
+            del self._missing[token]
+        self.misses += 1
+        return MISS
+
+    def set(self, token: str, user: Any, expires_at: datetime, generation: int):
+        """
+        Cache a looked-up user. `generation` is the value read before the lookup; if a
+        session was invalidated meanwhile the result may be stale and is dropped.
+        """
+        if generation != self.generation:
+            return
+        if expires_at.tzinfo is None:
+            # Mongo hands back naive UTC datetimes
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            self.set_missing(token, generation)
+            return
+        self._missing.pop(token, None)
+        self._users[token] = (time.monotonic() + min(self.ttl, remaining), user)
+
+    def set_missing(self, token: str, generation: int):
+        """Remember that a token has no valid session"""
+        if generation != self.generation or self.negative_ttl <= 0:
+            return
+        self._users.pop(token, None)
+        self._missing[token] = time.monotonic() + self.negative_ttl
+
+    def invalidate(self, token: str):
+        """Forget a token (logout, or a new session created for it)"""
+        self.generation += 1
+        self._users.pop(token, None)
+        self._missing.pop(token, None)
+
+    def clear(self):
+        self.generation += 1
+        self._users.clear()
+        self._missing.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "users": len(self._users),
+            "missing": len(self._missing),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl
+        }
+
+
+_session_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> SessionCache:
+    """Process-wide cache shared by the auth helpers"""
+    global _session_cache
+    if _session_cache is None:
+        _session_cache = SessionCache()
+    return _session_cache
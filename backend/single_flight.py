@@ -0,0 +1,77 @@
+"""
+Single Flight Module
+Coalesces concurrent calls for the same key into one in-flight execution
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Concurrent callers with the same key await one shared task instead of each doing
+    the work. After the task finishes its result is handed out for reuse_window more
+    seconds (only when should_reuse accepts it, e.g. to skip failed audits).
+    """
+
+    def __init__(self, reuse_window: float = 0.0, should_reuse: Optional[Callable[[Any], bool]] = None):
+        self.reuse_window = reuse_window
+        self.should_reuse = should_reuse or (lambda result: True)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._recent: Dict[str, Tuple[float, Any]] = {}
+
+        self.executions = 0
+        self.coalesced = 0
+        self.reused = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result, sharing it with every concurrent caller using the same key"""
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > time.monotonic():
+                self.reused += 1
+                return recent[1]
+            del self._recent[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        else:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight execution for {key}")
+
+        # Shield so one caller going away does not cancel the work the others wait for
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for this key is currently executing"""
+        return key in self._inflight
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "reused": self.reused
+        }
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if self.reuse_window <= 0 or task.cancelled() or task.exception() is not None:
+            return
+
+        now = time.monotonic()
+        for stale_key in [k for k, (expires, _) in self._recent.items() if expires <= now]:
+            del self._recent[stale_key]
+
+        result = task.result()
+        if self.should_reuse(result):
+            self._recent[key] = (now + self.reuse_window, result)
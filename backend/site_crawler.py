@@ -0,0 +1,261 @@
+"""
+Site Crawler Module
+Whole-site audits: crawls internal links from the submitted URL and rolls page scores up into one report
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from audit_events import ProgressCallback
+from sitemap import iter_sitemap
+from timings import StageTimer
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Issues listed in the site rollup, most widespread first
+TOP_ISSUES = 10
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class CrawlFrontier:
+    """
+    Deduplicated queue of (url, depth) pairs. A URL is admitted once (by normalized form),
+    only on the start host, only up to `max_depth` links away and only while fewer than
+    `max_pages` URLs have been admitted; other URLs are recorded as skipped. The crawler
+    records URLs robots.txt disallows in `disallowed`.
+    """
+
+    def __init__(self, start_url: str, max_pages: int, max_depth: int):
+        # Normalized like the URLs accepts() compares, so https://example.com:443/ is on its own host
+        self.host = _host(normalize_url(start_url))
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.seen: Set[str] = set()
+        self.skipped: Set[str] = set()
+        self.disallowed: Set[str] = set()
+        # Sitemap lastmod of admitted URLs, by normalized URL
+        self.lastmod: Dict[str, datetime] = {}
+        self.add(start_url, 0)
+
+    @property
+    def full(self) -> bool:
+        return len(self.seen) >= self.max_pages
+
+    def accepts(self, url: str, depth: int) -> bool:
+        """Whether add() would admit the URL (recording it as skipped if it never can be)"""
+        try:
+            key = normalize_url(url)
+        except ValueError:
+            # Malformed link, e.g. a port out of range
+            return False
+        if key in self.seen or key in self.disallowed:
+            return False
+        if depth > self.max_depth or self.full or _host(key) != self.host:
+            self.skipped.add(key)
+            return False
+        return True
+
+    def redirected(self, final_url: str):
+        """The start page landed elsewhere (e.g. apex -> www): crawl the host it ended up on"""
+        key = normalize_url(final_url)
+        self.host = _host(key)
+        self.seen.add(key)
+
+    def add(self, url: str, depth: int, lastmod: Optional[datetime] = None) -> bool:
+        if not self.accepts(url, depth):
+            return False
+        key = normalize_url(url)
+        self.seen.add(key)
+        if lastmod is not None:
+            self.lastmod[key] = lastmod
+        self.queue.put_nowait((url, depth))
+        return True
+
+
+class SiteCrawler:
+    """
+    Fetches and analyzes pages through the audit engine as the frontier yields them, so
+    fetching, analysis and link discovery overlap. At most `per_host_concurrency` pages of
+    a host are in flight at once; fetches also go through the engine's admission budgets.
+
+    The frontier is also seeded (at depth 1) from the site's sitemaps, streamed while the
+    crawl runs; with `changed_since`, sitemap URLs whose lastmod is older are left out.
+    Discovered URLs that robots.txt disallows are never fetched; the submitted URL itself
+    always is, since the site owner asked for it.
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        use_sitemap: Optional[bool] = None,
+        changed_since: Optional[datetime] = None
+    ):
+        self.engine = engine
+        # Requests may ask for more pages than the default, but never more than CRAWL_PAGE_LIMIT
+        self.max_pages = min(max_pages or int(os.environ.get('CRAWL_MAX_PAGES', 50)), int(os.environ.get('CRAWL_PAGE_LIMIT', 500)))
+        self.max_depth = max_depth if max_depth is not None else int(os.environ.get('CRAWL_MAX_DEPTH', 3))
+        self.per_host_concurrency = per_host_concurrency or int(os.environ.get('CRAWL_PER_HOST_CONCURRENCY', 4))
+        self.use_sitemap = use_sitemap if use_sitemap is not None else os.environ.get('CRAWL_USE_SITEMAP', '1') == '1'
+        self.changed_since = changed_since
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = _host(url)
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_slots[host]
+
+    async def _admit(self, frontier: CrawlFrontier, url: str, depth: int, lastmod: Optional[datetime] = None) -> bool:
+        """Add a discovered URL to the frontier unless it is out of bounds or disallowed by robots.txt"""
+        if not frontier.accepts(url, depth):
+            return False
+        if not await self.engine.robots.allowed(url):
+            frontier.disallowed.add(normalize_url(url))
+            return False
+        # The robots lookup may have yielded to another worker that admitted the URL meanwhile
+        return frontier.add(url, depth, lastmod)
+
+    async def _seed_from_sitemaps(self, frontier: CrawlFrontier, start_url: str):
+        """Stream the sitemaps robots.txt declares (or /sitemap.xml) into the frontier until it is full"""
+        parts = urlsplit(start_url)
+        sitemaps = await self.engine.robots.sitemaps(start_url) or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+        for sitemap_url in sitemaps:
+            try:
+                async with aclosing(iter_sitemap(self.engine.http_fetcher, sitemap_url, since=self.changed_since)) as entries:
+                    async for entry in entries:
+                        if frontier.full:
+                            return
+                        await self._admit(frontier, entry.loc, 1, entry.lastmod)
+            except Exception as e:
+                logger.info(f"Sitemap {sitemap_url} not used: {e}")
+
+    async def crawl(
+        self,
+        start_url: str,
+        progress: Optional[ProgressCallback] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[List[Dict[str, Any]], CrawlFrontier]:
+        """
+        Crawl the site; returns one entry per admitted page (in completion order) and the
+        frontier. `progress` gets a "page" event as each page finishes and must not raise.
+        """
+        timer = timer or StageTimer()
+        frontier = CrawlFrontier(start_url, self.max_pages, self.max_depth)
+        pages: List[Dict[str, Any]] = []
+
+        async def worker():
+            while True:
+                url, depth = await frontier.queue.get()
+                try:
+                    try:
+                        page = await self._crawl_page(url, depth, timer)
+                    except Exception as e:
+                        logger.warning(f"Crawl of {url} failed: {e}")
+                        page = {"url": url, "depth": depth, "status": "failed", "error": str(e)}
+                    final_url = page.pop('final_url', None)
+                    if depth == 0 and final_url and _host(normalize_url(final_url)) != frontier.host:
+                        frontier.redirected(final_url)
+                    lastmod = frontier.lastmod.get(normalize_url(url))
+                    page['lastmod'] = lastmod.isoformat() if lastmod else None
+                    pages.append(page)
+                    for link in page.pop('links', []):
+                        await self._admit(frontier, link, depth + 1)
+                    if progress is not None:
+                        progress("page", {
+                            "url": url,
+                            "status": page['status'],
+                            "pages_done": len(pages),
+                            "pages_queued": frontier.queue.qsize()
+                        })
+                finally:
+                    frontier.queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.per_host_concurrency)]
+        if self.use_sitemap:
+            workers.append(asyncio.create_task(self._seed_from_sitemaps(frontier, start_url)))
+        try:
+            # Seeding must finish before an empty queue can mean the crawl is done
+            if self.use_sitemap:
+                await workers[-1]
+            await frontier.queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return pages, frontier
+
+    async def _crawl_page(self, url: str, depth: int, timer: StageTimer) -> Dict[str, Any]:
+        page_timer = StageTimer()
+        async with self._slot(url):
+            # Links are checked once for the start page after the crawl, not for every page
+            html_content, analysis, response = await self.engine._fetch_and_analyze(url, timer=page_timer, check_links=False)
+        if not analysis:
+            timer.add_ms(page_timer.as_dict()['stages_ms'])
+            return {"url": url, "depth": depth, "status": "failed", "error": "Failed to fetch website content"}
+
+        snapshot = await self.engine._save_snapshot(html_content, page_timer)
+        # Per-page stage times are summed into the crawl's timings
+        timer.add_ms(page_timer.as_dict()['stages_ms'])
+        return {
+            "url": url,
+            "depth": depth,
+            "status": "completed",
+            "seo_score": analysis['seo']['score'],
+            "aeo_score": analysis['aeo']['score'],
+            "geo_score": analysis['geo']['score'],
+            "fetch_mode": page_timer.values.get('fetch_mode'),
+            "snapshot": snapshot,
+            "analysis": analysis,
+            "links": analysis['seo'].get('links', {}).get('internal_urls', []),
+            # After redirects; the links above were classified against it
+            "final_url": response.url if response is not None else url
+        }
+
+
+def rollup(start_url: str, pages: List[Dict[str, Any]], frontier: CrawlFrontier) -> Dict[str, Any]:
+    """Site-level summary: mean scores over crawled pages, weakest pages and the most widespread issues"""
+    completed = [page for page in pages if page['status'] == 'completed']
+    scores = {}
+    for key in ('seo_score', 'aeo_score', 'geo_score'):
+        scores[key] = round(sum(page[key] for page in completed) / len(completed)) if completed else 0
+
+    issues = Counter()
+    for page in completed:
+        for category in ('seo', 'aeo', 'geo'):
+            # Counted once per page, so the number reads as "pages affected"
+            issues.update({(category.upper(), issue) for issue in page['analysis'][category].get('issues', [])})
+
+    ordered = sorted(pages, key=lambda page: (page['depth'], page['url']))
+    return {
+        "start_url": start_url,
+        **scores,
+        "pages_crawled": len(completed),
+        "pages_failed": len(pages) - len(completed),
+        "pages_skipped": len(frontier.skipped - frontier.seen),
+        "pages_disallowed": len(frontier.disallowed),
+        "max_pages": frontier.max_pages,
+        "max_depth": frontier.max_depth,
+        "weakest_pages": [
+            {"url": page['url'], "score": round((page['seo_score'] + page['aeo_score'] + page['geo_score']) / 3)}
+            for page in sorted(completed, key=lambda page: page['seo_score'] + page['aeo_score'] + page['geo_score'])[:5]
+        ],
+        "common_issues": [
+            {"category": category, "issue": issue, "pages": count}
+            for (category, issue), count in issues.most_common(TOP_ISSUES)
+        ],
+        "pages": [{key: value for key, value in page.items() if key != 'analysis'} for page in ordered]
+    }
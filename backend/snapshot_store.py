@@ -0,0 +1,162 @@
+"""
+Snapshot Store Module
+Content-addressed, zstd-compressed storage of fetched HTML so audits can be re-analyzed without refetching
+
+SNAPSHOT_STORE selects the backend:
+    local - files under SNAPSHOT_DIR (default)
+    s3    - objects in SNAPSHOT_S3_BUCKET under SNAPSHOT_S3_PREFIX (needs boto3)
+    off   - snapshots disabled
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = Path(__file__).parent
+
+
+class BlobStore:
+    """Minimal key/value blob interface; implementations are synchronous and thread-safe"""
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files, fanned out by the first two key bytes (ab/cd/abcd...zst)"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / f"{key}.zst"
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as S3 objects; boto3 is imported only when this backend is used"""
+
+    def __init__(self, bucket: str, prefix: str = 'snapshots/', client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('s3')
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key}.zst"
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data, ContentType='application/zstd')
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))['Body'].read()
+        except self.client.exceptions.NoSuchKey:
+            raise KeyError(key)
+
+
+class SnapshotStore:
+    """
+    Stores each distinct page once: the key is the sha256 of the HTML, so re-audits of an
+    unchanged page (and identical pages on different URLs) share one compressed blob.
+    Blocking compression and I/O run in a worker thread via save()/load().
+    """
+
+    def __init__(self, blobs: BlobStore, level: Optional[int] = None):
+        self.blobs = blobs
+        self.level = level if level is not None else int(os.environ.get('SNAPSHOT_ZSTD_LEVEL', 3))
+
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_in = 0
+        self.bytes_stored = 0
+
+    def put(self, html: str) -> Dict[str, Any]:
+        """Store a page (unless already present) and return its reference"""
+        raw = html.encode('utf-8')
+        key = hashlib.sha256(raw).hexdigest()
+        self.bytes_in += len(raw)
+
+        if self.blobs.exists(key):
+            self.deduplicated += 1
+        else:
+            # Compressor objects are not thread-safe, so each call gets its own
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(raw)
+            self.blobs.put(key, compressed)
+            self.stored += 1
+            self.bytes_stored += len(compressed)
+
+        return {"sha256": key, "size": len(raw), "encoding": "zstd"}
+
+    def get(self, key: str) -> str:
+        """HTML of a snapshot; raises KeyError when it is not stored"""
+        return zstandard.ZstdDecompressor().decompress(self.blobs.get(key)).decode('utf-8')
+
+    async def save(self, html: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.put, html)
+
+    async def load(self, key: str) -> str:
+        return await asyncio.to_thread(self.get, key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "bytes_in": self.bytes_in,
+            "bytes_stored": self.bytes_stored,
+            "compression_ratio": round(self.bytes_in / self.bytes_stored, 2) if self.bytes_stored else None
+        }
+
+
+def create_snapshot_store() -> Optional[SnapshotStore]:
+    """Snapshot store configured from the environment, or None when disabled"""
+    backend = os.environ.get('SNAPSHOT_STORE', 'local')
+    if backend == 'off':
+        return None
+    if backend == 'local':
+        return SnapshotStore(LocalBlobStore(os.environ.get('SNAPSHOT_DIR', str(ROOT_DIR / 'snapshots'))))
+    if backend == 's3':
+        return SnapshotStore(S3BlobStore(os.environ['SNAPSHOT_S3_BUCKET'], os.environ.get('SNAPSHOT_S3_PREFIX', 'snapshots/')))
+    raise ValueError(f"Unknown snapshot store: {backend}")
@@ -0,0 +1,155 @@
+"""
+Supabase Repository Module
+Async access to the SAGE tables in Supabase without blocking the event loop
+
+supabase-py's client is synchronous: every execute() is a blocking HTTP round trip. The
+repository runs those calls on its own bounded thread pool, so a slow database delays
+only the requests waiting on it instead of the whole server. All threads share the one
+client, and therefore its pooled keep-alive connections to PostgREST.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns of the "My Audits" list (no timings, site rollups or report items)
+AUDIT_LIST_COLUMNS = 'id, url, status, created_at, completed_at, reports(seo_score, aeo_score, geo_score, overall_score)'
+
+
+class SupabaseRepository:
+    """
+    Async wrappers for the queries the API makes. At most `max_workers` queries run at
+    once; further calls wait for a free thread without holding up the event loop. Keep
+    max_workers below the HTTP client's connection limit (100 for httpx) so threads
+    never queue for a connection.
+    """
+
+    def __init__(self, client, max_workers: Optional[int] = None):
+        self.client = client
+        self.max_workers = max_workers or int(os.environ.get('SUPABASE_MAX_WORKERS', 20))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='supabase')
+
+        self.queries = 0
+        self.in_flight = 0
+
+    async def execute(self, query) -> Any:
+        """Run a built postgrest query (anything with a blocking execute()) on the pool"""
+        self.queries += 1
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, query.execute)
+        finally:
+            self.in_flight -= 1
+
+    def close(self):
+        """Stop the pool; queries already running finish in the background"""
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"max_workers": self.max_workers, "queries": self.queries, "in_flight": self.in_flight}
+
+    async def _first(self, query) -> Optional[Dict[str, Any]]:
+        result = await self.execute(query)
+        return result.data[0] if result.data else None
+
+    # Users
+
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._first(self.client.table('users').select('*').eq('id', user_id))
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self._first(self.client.table('users').select('*').eq('email', email))
+
+    async def insert_user(self, user_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._first(self.client.table('users').insert(user_doc))
+
+    # Sessions
+
+    async def insert_session(self, session_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._first(self.client.table('user_sessions').insert(session_doc))
+
+    async def get_valid_session(self, session_token: str, now: str) -> Optional[Dict[str, Any]]:
+        """The session for this token if it expires after `now` (ISO timestamp)"""
+        return await self._first(
+            self.client.table('user_sessions').select('*').eq('session_token', session_token).gt('expires_at', now)
+        )
+
+    async def get_valid_session_with_user(self, session_token: str, now: str) -> Optional[Dict[str, Any]]:
+        """Like get_valid_session, with the session's user embedded as `users` (one round trip)"""
+        return await self._first(
+            self.client.table('user_sessions').select('user_id, expires_at, users(*)')
+            .eq('session_token', session_token).gt('expires_at', now)
+        )
+
+    async def delete_session(self, session_token: str):
+        await self.execute(self.client.table('user_sessions').delete().eq('session_token', session_token))
+
+    # Audits
+
+    async def insert_audit(self, audit_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._first(self.client.table('audits').insert(audit_doc))
+
+    async def update_audit(self, audit_id: str, fields: Dict[str, Any]):
+        await self.execute(self.client.table('audits').update(fields).eq('id', audit_id))
+
+    async def list_audits(self, user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """The user's most recent audits with their scores"""
+        result = await self.execute(
+            self.client.table('audits').select(AUDIT_LIST_COLUMNS)
+            .eq('user_id', user_id).order('created_at', desc=True).limit(limit)
+        )
+        return result.data
+
+    async def get_audit(self, audit_id: str, user_id: str, columns: str = '*') -> Optional[Dict[str, Any]]:
+        """One of the user's audits (None if it does not exist or belongs to someone else)"""
+        return await self._first(
+            self.client.table('audits').select(columns).eq('id', audit_id).eq('user_id', user_id)
+        )
+
+    async def fail_unfinished_audits(self, error: str, completed_at: str, audit_ids: Optional[List[str]] = None) -> int:
+        """Mark pending/running audits (all, or those in `audit_ids`) failed; returns how many"""
+        query = self.client.table('audits').update({
+            "status": "failed",
+            "error_message": error,
+            "completed_at": completed_at
+        }).in_('status', ['pending', 'running'])
+        if audit_ids is not None:
+            query = query.in_('id', audit_ids)
+        result = await self.execute(query)
+        return len(result.data)
+
+    async def complete_audit(
+        self,
+        audit_id: str,
+        audit_fields: Dict[str, Any],
+        report_doc: Dict[str, Any],
+        report_items: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Store the report, its items and the audit's completed state in one transactional
+        round trip (the complete_audit function in supabase_schema.sql). Returns the report id.
+        """
+        result = await self.execute(self.client.rpc('complete_audit', {
+            "p_audit_id": audit_id,
+            "p_audit": audit_fields,
+            "p_report": report_doc,
+            "p_items": report_items
+        }))
+        return result.data
+
+
+_repository: Optional[SupabaseRepository] = None
+
+
+def get_repository() -> SupabaseRepository:
+    """Shared repository instance, created on first use"""
+    global _repository
+    if _repository is None:
+        # Imported here: creating the client needs the Supabase credentials
+        from supabase_client import get_supabase_client
+        _repository = SupabaseRepository(get_supabase_client())
+    return _repository
@@ -21,10 +21,20 @@ CREATE TABLE IF NOT EXISTS audits (
     url TEXT NOT NULL,
     status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
     error_message TEXT,
+    timings JSONB,
+    snapshot_sha256 TEXT,
+    site JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     completed_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Added after the first release: per-stage timings of each audit run
+ALTER TABLE audits ADD COLUMN IF NOT EXISTS timings JSONB;
+-- Added later: content hash of the analyzed HTML in the snapshot store
+ALTER TABLE audits ADD COLUMN IF NOT EXISTS snapshot_sha256 TEXT;
+-- Added later: per-page rollup of whole-site (crawl) audits
+ALTER TABLE audits ADD COLUMN IF NOT EXISTS site JSONB;
+
 -- Reports table (stores high-level scores)
 CREATE TABLE IF NOT EXISTS reports (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -33,9 +43,16 @@ CREATE TABLE IF NOT EXISTS reports (
     seo_score INTEGER CHECK (seo_score >= 0 AND seo_score <= 100),
     aeo_score INTEGER CHECK (aeo_score >= 0 AND aeo_score <= 100),
     geo_score INTEGER CHECK (geo_score >= 0 AND geo_score <= 100),
+    scoring_version INTEGER,
+    link_check JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Added later: analyzer scoring rules the report's scores were computed with
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS scoring_version INTEGER;
+-- Added later: the audit's broken-link check, reapplied when rescoring (it needs the network)
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS link_check JSONB;
+
 -- Report items table (stores detailed findings)
 CREATE TABLE IF NOT EXISTS report_items (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -154,9 +171,74 @@ CREATE TRIGGER update_users_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Persist a finished audit in one transaction (a single round trip from the API): the report
+-- (replaced if the audit was reported before), its items and the audit's completed state.
+-- Any failure rolls the whole write back, so an audit is never left with a partial report.
+CREATE OR REPLACE FUNCTION complete_audit(
+    p_audit_id UUID,
+    p_audit JSONB,
+    p_report JSONB,
+    p_items JSONB DEFAULT '[]'::jsonb
+)
+RETURNS UUID AS $$
+DECLARE
+    v_report_id UUID;
+BEGIN
+    INSERT INTO reports (audit_id, overall_score, seo_score, aeo_score, geo_score, scoring_version, link_check)
+    VALUES (
+        p_audit_id,
+        (p_report->>'overall_score')::INTEGER,
+        (p_report->>'seo_score')::INTEGER,
+        (p_report->>'aeo_score')::INTEGER,
+        (p_report->>'geo_score')::INTEGER,
+        (p_report->>'scoring_version')::INTEGER,
+        NULLIF(p_report->'link_check', 'null'::jsonb)
+    )
+    ON CONFLICT (audit_id) DO UPDATE SET
+        overall_score = EXCLUDED.overall_score,
+        seo_score = EXCLUDED.seo_score,
+        aeo_score = EXCLUDED.aeo_score,
+        geo_score = EXCLUDED.geo_score,
+        scoring_version = EXCLUDED.scoring_version,
+        link_check = EXCLUDED.link_check
+    RETURNING id INTO v_report_id;
+
+    DELETE FROM report_items WHERE report_id = v_report_id;
+    INSERT INTO report_items (report_id, category, check_name, status, description, recommendation, score_impact)
+    SELECT
+        v_report_id,
+        item->>'category',
+        item->>'check_name',
+        item->>'status',
+        item->>'description',
+        item->>'recommendation',
+        COALESCE((item->>'score_impact')::INTEGER, 0)
+    FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) AS item;
+
+    UPDATE audits SET
+        status = 'completed',
+        timings = NULLIF(p_audit->'timings', 'null'::jsonb),
+        snapshot_sha256 = p_audit->>'snapshot_sha256',
+        site = NULLIF(p_audit->'site', 'null'::jsonb),
+        completed_at = COALESCE((p_audit->>'completed_at')::TIMESTAMPTZ, NOW())
+    WHERE id = p_audit_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Audit % not found', p_audit_id;
+    END IF;
+
+    RETURN v_report_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) persists audits
+REVOKE EXECUTE ON FUNCTION complete_audit(UUID, JSONB, JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION complete_audit(UUID, JSONB, JSONB, JSONB) TO service_role;
+
 -- Comments for documentation
 COMMENT ON TABLE users IS 'User profiles synced with Supabase Auth';
 COMMENT ON TABLE audits IS 'Audit requests and their status';
 COMMENT ON TABLE reports IS 'High-level audit scores and results';
 COMMENT ON TABLE report_items IS 'Detailed findings for each audit category';
 COMMENT ON TABLE user_sessions IS 'Custom session tokens for authentication';
+COMMENT ON FUNCTION complete_audit(UUID, JSONB, JSONB, JSONB) IS 'Stores a finished audit''s report, report items and completed state atomically';
@@ -0,0 +1,79 @@
+"""
+Timings Module
+Monotonic stage timers, byte counters and RSS tracking for audit reports
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import psutil
+
+
+def current_rss_kb() -> int:
+    """Current resident set size of this process, in KiB"""
+    return psutil.Process().memory_info().rss // 1024
+
+
+class StageTimer:
+    """
+    Accumulates wall time per named stage (a stage entered twice adds up), byte
+    counters and extra values, and reports them as the `timings` block of a report.
+    RSS is sampled at every stage boundary; the reported delta is the highest sample
+    minus the one taken at creation. Samples cover the whole process, so it is only
+    specific to one audit where one process runs one job at a time (an analysis worker).
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.rss_start_kb = current_rss_kb()
+        self.rss_max_kb = self.rss_start_kb
+        self.stages: Dict[str, float] = {}
+        self.bytes: Dict[str, int] = {}
+        self.values: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block (sync or async code) as one stage"""
+        self.sample_rss()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started)
+            self.sample_rss()
+
+    def sample_rss(self):
+        self.rss_max_kb = max(self.rss_max_kb, current_rss_kb())
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_ms(self, stages: Dict[str, float]):
+        """Merge stage durations already measured in milliseconds (e.g. by a worker)"""
+        for name, ms in stages.items():
+            self.add(name, ms / 1000)
+
+    def count_bytes(self, name: str, size: int):
+        self.bytes[name] = self.bytes.get(name, 0) + size
+
+    def set(self, name: str, value: Any):
+        self.values[name] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": _ms(time.monotonic() - self.started),
+            "stages_ms": {name: _ms(seconds) for name, seconds in self.stages.items()},
+            "bytes": dict(self.bytes),
+            "peak_rss_delta_kb": self.rss_max_kb - self.rss_start_kb,
+            **self.values
+        }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def elapsed_ms(started: Optional[float]) -> Optional[float]:
+    """Milliseconds since a time.monotonic() reading, or None when there is none"""
+    return _ms(time.monotonic() - started) if started is not None else None
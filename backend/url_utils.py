@@ -0,0 +1,39 @@
+"""
+URL Utilities
+Normalization shared by request coalescing, caching and crawling
+"""
+
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def ensure_scheme(url: str) -> str:
+    """Default bare domains to https, as the audit entry points always have"""
+    url = url.strip()
+    # Checked textually: urlsplit reads "example.com:8080" as scheme "example.com"
+    if '://' not in url:
+        url = f"https://{url}"
+    return url
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for use as a key: https default scheme, lowercase
+    scheme and host, no default port, no fragment and '/' for an empty path.
+    """
+    parts = urlsplit(ensure_scheme(url))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        # IPv6 literal: hostname drops the brackets the netloc needs
+        host = f"[{host}]"
+
+    port = parts.port
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else '')
+        host = f"{userinfo}@{host}"
+
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
@@ -5,6 +5,25 @@ import axios from "axios";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const STAGE_LABELS = {
+  queued: "Waiting in queue...",
+  running: "Starting audit...",
+  joined: "Joining an audit already in progress...",
+  cached: "Using a recent audit of this page...",
+  revalidating: "Checking whether the page changed...",
+  fetch_started: "Fetching page...",
+  fetched: "Analyzing content...",
+  link_check_started: "Checking links...",
+  page: "Crawling site...",
+  score: "Scoring...",
+  recommendations_started: "Generating AI recommendations...",
+  recommendations: "Recommendations ready",
+  persisted: "Saving report...",
+};
 
 const AuditPage = () => {
   const navigate = useNavigate();
@@ -12,6 +31,36 @@ const AuditPage = () => {
   const [loading, setLoading] = useState(false);
   const [auditResult, setAuditResult] = useState(null);
   const [error, setError] = useState("");
+  const [stage, setStage] = useState("");
+  const [partialScores, setPartialScores] = useState({});
+
+  // Follow the audit's stage events; resolves when it ends or the stream drops
+  const followAudit = (auditId) => new Promise((resolve) => {
+    const source = new EventSource(`${API}/audits/${auditId}/events`);
+    const finish = () => {
+      source.close();
+      resolve();
+    };
+
+    Object.keys(STAGE_LABELS).forEach((name) => {
+      source.addEventListener(name, (event) => {
+        const data = JSON.parse(event.data);
+        if (name === "fetch_started" && data.mode === "rendered") {
+          setStage("Rendering JavaScript...");
+        } else if (name === "page") {
+          setStage(`Crawling site... ${data.pages_done} pages audited, ${data.pages_queued} queued`);
+        } else {
+          setStage(STAGE_LABELS[name]);
+        }
+        if (name === "score") {
+          setPartialScores((prev) => ({ ...prev, [data.analyzer]: data.score }));
+        }
+      });
+    });
+    source.addEventListener("completed", finish);
+    source.addEventListener("failed", finish);
+    source.onerror = finish;
+  });
 
   const runAudit = async () => {
     if (!url) {
@@ -21,12 +70,31 @@ const AuditPage = () => {
 
     setLoading(true);
     setError("");
+    setAuditResult(null);
+    setStage("");
+    setPartialScores({});
     
     try {
+      // The audit is queued server-side; stream its progress, then poll for the stored result
       const response = await axios.post(`${API}/audit`, { url });
-      setAuditResult(response.data);
+      let audit = response.data;
+      await followAudit(audit.id);
+      while (audit.status === "pending" || audit.status === "running") {
+        await sleep(POLL_INTERVAL_MS);
+        const poll = await axios.get(`${API}/audits/${audit.id}`);
+        audit = poll.data;
+      }
+      if (audit.status === "failed") {
+        throw new Error(audit.error || "Audit failed");
+      }
+      setAuditResult(audit);
     } catch (err) {
-      setError("Failed to run audit. Please try again.");
+      if (err.response && err.response.status === 429) {
+        const retryAfter = err.response.headers["retry-after"];
+        setError(`The audit service is busy. Please try again in ${retryAfter || "a few"} seconds.`);
+      } else {
+        setError("Failed to run audit. Please try again.");
+      }
       console.error('Audit error:', err);
     } finally {
       setLoading(false);
@@ -174,6 +242,23 @@ const AuditPage = () => {
           </div>
         )}
 
+        {/* Live progress */}
+        {loading && (
+          <div className="glass-panel p-8 mb-8 text-center" data-testid="audit-progress">
+            <p className="text-gray-400 mb-4">{stage || "Submitting audit..."}</p>
+            <div className="grid md:grid-cols-3 gap-6">
+              {["seo", "aeo", "geo"].map((analyzer) => (
+                <div key={analyzer} className="text-center">
+                  <div className="text-sm text-gray-400">{analyzer.toUpperCase()}</div>
+                  <div className="text-3xl font-bold gradient-text">
+                    {partialScores[analyzer] !== undefined ? partialScores[analyzer] : "--"}
+                  </div>
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
+
         {!auditResult && !loading && (
           <div className="glass-panel p-12 text-center">
             <Search className="w-16 h-16 text-gray-600 mx-auto mb-4" />
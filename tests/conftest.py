@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Backend modules use flat imports (e.g. `from seo_analyzer import SEOAnalyzer`)
+sys.path.insert(0, str(BACKEND_DIR))
+# The load-test fakes (and the benchmark corpus they serve) double as test doubles
+sys.path.append(str(BACKEND_DIR / "loadtest"))
+sys.path.append(str(BACKEND_DIR / "benchmarks"))
+
+LLM_MODULES = ("emergentintegrations", "emergentintegrations.llm", "emergentintegrations.llm.chat")
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Instant fake of the optional emergentintegrations LLM client, removed after the test"""
+    from fakes import install_fake_llm
+
+    for name in LLM_MODULES:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    stats = install_fake_llm(latency=0.0)
+    for name in LLM_MODULES:
+        monkeypatch.setitem(sys.modules, name, sys.modules[name])
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test")
+    return stats
+
+
+@pytest.fixture
+def audit_engine_with_fake_llm(fake_llm, monkeypatch):
+    """Factory for AuditEngines that stay offline: fake LLM, no link checks, no snapshot writes"""
+    monkeypatch.setenv("LINK_CHECK_ENABLED", "0")
+    monkeypatch.setenv("SNAPSHOT_STORE", "off")
+    from audit_engine import AuditEngine
+    return AuditEngine
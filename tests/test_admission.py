@@ -0,0 +1,69 @@
+"""
+Admission control: budgets cap concurrency, and new audits are shed while queues are deep
+"""
+
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_render_budget_caps_concurrency_and_sheds_load():
+    async def scenario():
+        admission = AdmissionController(static_limit=4, render_limit=2, llm_limit=1, max_queue_depth=10, retry_after=7)
+        admission.render.max_queue = 2
+        release = asyncio.Event()
+        peak = 0
+
+        async def render():
+            nonlocal peak
+            async with admission.render.slot():
+                peak = max(peak, admission.render.active)
+                await release.wait()
+
+        tasks = [asyncio.create_task(render()) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert admission.render.active == 2
+        assert admission.render.waiting == 2
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            admission.admit(queue_depth=0)
+        assert rejected.value.retry_after == 7
+
+        release.set()
+        await asyncio.gather(*tasks)
+        admission.admit(queue_depth=0)
+        with pytest.raises(AdmissionRejected):
+            admission.admit(queue_depth=10)
+        return peak, admission.stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert stats["render"]["admitted"] == 4
+    assert stats["render"]["rejected"] == 1
+    assert stats["rejected"] == 2
+    assert stats["render"]["wait_seconds_max"] >= 0
+
+
+def test_queued_audits_count_against_the_budgets_they_need():
+    async def scenario():
+        admission = AdmissionController()
+
+        # Every audit calls the LLM: its budget fills up before the job queue limit
+        assert admission.llm.max_queue < admission.max_queue_depth
+        admission.admit(queue_depth=admission.llm.max_queue - 1)
+        with pytest.raises(AdmissionRejected, match="llm queue is full"):
+            admission.admit(queue_depth=admission.llm.max_queue)
+
+        # Once pages have needed renders, queued audits are expected to need them too
+        admission.admit(queue_depth=admission.render.max_queue)
+        for budget in (admission.static, admission.render):
+            async with budget.slot():
+                pass
+        with pytest.raises(AdmissionRejected, match="render queue is full"):
+            admission.admit(queue_depth=admission.render.max_queue)
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["llm"]["rejected"] == 1 and stats["render"]["rejected"] == 1
@@ -0,0 +1,67 @@
+"""
+LLM recommendations: every fallback is counted by reason and every request is timed by outcome
+"""
+
+import asyncio
+
+import pytest
+
+from metrics import LLM_FAILURES, LLM_REQUEST_DURATION
+
+SEO = {"score": 40, "issues": ["Missing meta description"]}
+AEO = {"score": 50, "issues": ["No FAQ section"]}
+GEO = {"score": 60, "issues": ["No address found"]}
+
+
+def stub_chat(reply):
+    class Chat:
+        def __init__(self, **kwargs):
+            pass
+
+        def with_model(self, provider, model):
+            return self
+
+        async def send_message(self, message):
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+    return Chat
+
+
+def requests_timed(outcome):
+    return LLM_REQUEST_DURATION._values.get(LLM_REQUEST_DURATION._key({"outcome": outcome}), [None, 0, 0])[2]
+
+
+@pytest.mark.parametrize("reply, outcome, reason", [
+    ("SEO|High|Missing meta description|Add one.", "success", None),
+    (RuntimeError("timed out"), "failure", "request"),
+    ("Sorry, I cannot help with that.", "success", "parse"),
+])
+def test_outcomes_and_fallback_reasons(fake_llm, monkeypatch, reply, outcome, reason):
+    import ai_recommendations
+    monkeypatch.setattr(ai_recommendations, "LlmChat", stub_chat(reply))
+    engine = ai_recommendations.AIRecommendationEngine()
+
+    failures = {r: LLM_FAILURES.value(reason=r) for r in ("request", "parse", "no_api_key")}
+    timed = {o: requests_timed(o) for o in ("success", "failure")}
+    recommendations = asyncio.run(engine.generate_recommendations("https://example.com/", SEO, AEO, GEO))
+
+    assert recommendations
+    assert {r: LLM_FAILURES.value(reason=r) - before for r, before in failures.items()} == {
+        r: int(r == reason) for r in failures
+    }
+    assert {o: requests_timed(o) - before for o, before in timed.items()} == {o: int(o == outcome) for o in timed}
+
+
+def test_missing_api_key_is_counted_without_a_request(fake_llm, monkeypatch):
+    import ai_recommendations
+    monkeypatch.delenv("EMERGENT_LLM_KEY")
+    engine = ai_recommendations.AIRecommendationEngine()
+
+    before = LLM_FAILURES.value(reason="no_api_key")
+    timed = requests_timed("success") + requests_timed("failure")
+    recommendations = asyncio.run(engine.generate_recommendations("https://example.com/", SEO, AEO, GEO))
+    assert [r["issue"] for r in recommendations] == ["Missing meta description", "No FAQ section", "No address found"]
+    assert LLM_FAILURES.value(reason="no_api_key") == before + 1
+    assert requests_timed("success") + requests_timed("failure") == timed
@@ -0,0 +1,71 @@
+"""
+Analysis executor: a broken pool is replaced once, however many jobs were on it
+"""
+
+import asyncio
+import logging
+import os
+import signal
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis_executor import AnalysisExecutor
+
+PAGE = "<html><head><title>Acme</title></head><body><p>Hand made furniture.</p></body></html>"
+
+
+class BrokenPool(Executor):
+    """Fails every job the way a pool whose worker died does"""
+
+    def __init__(self):
+        self.shutdowns = 0
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdowns += 1
+
+
+def test_concurrent_jobs_on_a_broken_pool_replace_it_once(caplog):
+    caplog.set_level(logging.INFO, logger="analysis_executor")
+
+    async def scenario():
+        executor = AnalysisExecutor(mode="thread", max_workers=2)
+        broken = BrokenPool()
+        executor._pool = broken
+
+        results = await asyncio.gather(*(executor.analyze(f"https://example.com/{i}", PAGE) for i in range(4)))
+        replacement = executor._pool
+        try:
+            assert all("seo" in result for result in results)
+            assert broken.shutdowns == 1
+            starts = [r for r in caplog.records if r.getMessage().startswith("Analysis executor started")]
+            assert len(starts) == 1
+            # The late failures retried on the replacement instead of shutting it down
+            assert replacement is not broken and not replacement._shutdown
+        finally:
+            await executor.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_killed_worker_process_is_replaced_and_the_job_retried():
+    async def scenario():
+        executor = AnalysisExecutor(mode="process", max_workers=1)
+        try:
+            assert "seo" in await executor.analyze("https://example.com/", PAGE)
+            pool = executor._pool
+            for process in list(pool._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+                process.join()
+
+            result = await executor.analyze("https://example.com/", PAGE)
+            assert "seo" in result
+            assert executor._pool is not pool
+        finally:
+            await executor.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+"""
+Audit progress streaming: replay to late subscribers, live fan-out and clean disconnects
+"""
+
+import asyncio
+
+from audit_events import AuditEventBroker
+
+
+def event_names(messages):
+    return [line.split(": ", 1)[1] for message in messages for line in message.splitlines() if line.startswith("event: ")]
+
+
+def test_late_subscriber_gets_history_then_live_events():
+    async def scenario():
+        broker = AuditEventBroker(retention=60)
+        broker.publish("a1", "queued", {"url": "https://example.com"})
+        broker.publish("a1", "score", {"analyzer": "seo", "score": 80})
+
+        received = []
+
+        async def consume():
+            async for message in broker.stream("a1"):
+                received.append(message)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        broker.publish("a1", "score", {"analyzer": "aeo", "score": 60})
+        broker.publish("a1", "completed", {"seo_score": 80})
+        await asyncio.wait_for(consumer, timeout=1)
+
+        # A reconnect resumes after the last event it saw
+        resumed = [message async for message in broker.stream("a1", last_event_id=3)]
+        return received, resumed, broker.stats()
+
+    received, resumed, stats = asyncio.run(scenario())
+    assert event_names(received) == ["queued", "score", "score", "completed"]
+    assert event_names(resumed) == ["completed"]
+    assert received[-1].startswith("id: 4\n")
+    assert stats["subscribers"] == 0
+
+
+def test_disconnect_unsubscribes_without_touching_the_audit():
+    async def scenario():
+        broker = AuditEventBroker(retention=60)
+        broker.publish("a2", "running")
+
+        stream = broker.stream("a2")
+        first = await stream.__anext__()
+        assert broker.stats()["subscribers"] == 1
+        await stream.aclose()
+
+        broker.publish("a2", "failed", {"error": "boom"})
+        return first, broker.stats(), broker.has_events("a2")
+
+    first, stats, has_events = asyncio.run(scenario())
+    assert "event: running" in first
+    assert stats["subscribers"] == 0
+    assert has_events
+
+
+def test_watch_follows_stored_state_of_audits_not_live_here():
+    async def scenario():
+        broker = AuditEventBroker(retention=60, poll_interval=0.01, watch_timeout=0.05)
+
+        # Running on another instance: polled until the record is terminal
+        states = iter([("running", {}), ("completed", {"seo_score": 70})])
+        finished = [m async for m in broker.watch("a3", lambda: asyncio.sleep(0, next(states)), ("pending", {}))]
+
+        # Lost in a restart: never terminal, so the stream gives up
+        async def stuck():
+            return "running", {}
+        orphaned = [m async for m in broker.watch("a4", stuck, ("running", {}))]
+
+        # Events show up here meanwhile: switch to the live stream
+        broker.publish("a5", "queued")
+        broker.publish("a5", "failed", {"error": "boom"})
+        live = [m async for m in broker.watch("a5", stuck, ("pending", {}))]
+        return finished, orphaned, live
+
+    finished, orphaned, live = asyncio.run(scenario())
+    assert event_names(finished) == ["completed"]
+    assert '"seo_score": 70' in finished[-1]
+    assert event_names(orphaned) == ["timeout"]
+    assert event_names(live) == ["queued", "failed"]
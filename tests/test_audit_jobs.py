@@ -0,0 +1,68 @@
+"""
+Background audit queue: jobs run off the request path and the queue bound is enforced
+"""
+
+import asyncio
+
+import pytest
+
+from audit_jobs import AuditJobQueue, QueueFullError
+
+
+def test_jobs_run_in_background_and_queue_is_bounded():
+    async def scenario():
+        release = asyncio.Event()
+        done = []
+
+        async def handler(job_id, url):
+            await release.wait()
+            if url == "bad":
+                raise RuntimeError("boom")
+            done.append(job_id)
+
+        queue = AuditJobQueue(handler, workers=2, max_pending=3)
+        await queue.start()
+
+        # Two jobs occupy the workers, three more fill the queue, the sixth is rejected
+        for i in range(2):
+            queue.submit(f"job-{i}", url=f"https://example.com/{i}")
+        await asyncio.sleep(0)
+        assert queue.stats()["running"] == 2
+        for i in range(2, 5):
+            queue.submit(f"job-{i}", url="bad" if i == 4 else f"https://example.com/{i}")
+        assert not queue.has_capacity()
+        with pytest.raises(QueueFullError):
+            queue.submit("job-5", url="https://example.com/5")
+
+        release.set()
+        await queue._queue.join()
+        await queue.stop()
+        return queue.stats(), done
+
+    stats, done = asyncio.run(scenario())
+    assert sorted(done) == [f"job-{i}" for i in range(4)]
+    assert stats["completed"] == 4
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+
+
+def test_stop_reports_interrupted_and_dropped_jobs():
+    async def scenario():
+        started = asyncio.Event()
+
+        async def handler(job_id):
+            started.set()
+            await asyncio.Event().wait()
+
+        queue = AuditJobQueue(handler, workers=1, max_pending=5)
+        await queue.start()
+        for i in range(3):
+            queue.submit(f"job-{i}")
+        await started.wait()
+        interrupted = await queue.stop()
+        return interrupted, queue.stats()
+
+    interrupted, stats = asyncio.run(scenario())
+    # The running job was cancelled, the two queued ones never started
+    assert interrupted == ["job-0", "job-1", "job-2"]
+    assert stats["running"] == 0 and stats["pending"] == 0
@@ -0,0 +1,77 @@
+"""
+Browser pool: memory recycling judged per browser off the lock, and crashed or retired browsers tracked until closed
+"""
+
+import asyncio
+import os
+
+from browser_pool import BrowserPool, _BrowserSlot
+
+
+def test_memory_sampler_measures_only_the_current_browser():
+    async def scenario():
+        pool = BrowserPool(max_memory_mb=1, memory_check_interval=0.01)
+        # Stand-ins for browsers: this process tree for the current one, an untracked retiring one
+        current = _BrowserSlot(browser=None)
+        current.pid = os.getpid()
+        retiring = _BrowserSlot(browser=None)
+        retiring.retired = True
+        pool._slot, pool._retiring = current, [retiring]
+
+        assert not pool._needs_recycle(current)
+        sampler = asyncio.create_task(pool._sample_memory())
+        try:
+            while current.memory_mb == 0:
+                await asyncio.sleep(0.01)
+        finally:
+            sampler.cancel()
+
+        assert current.memory_mb > 1 and retiring.memory_mb == 0
+        assert pool._needs_recycle(current)
+        # A fresh browser starts from zero instead of inheriting what the retiring ones use
+        assert not pool._needs_recycle(_BrowserSlot(browser=None))
+
+    asyncio.run(scenario())
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+def test_crashed_browser_contexts_stay_counted_until_released():
+    async def scenario():
+        pool = BrowserPool(max_memory_mb=0)
+        crashed = _BrowserSlot(browser=FakeBrowser())
+        crashed.active = 2
+        pool._slot = crashed
+
+        pool._on_disconnected(crashed)
+        assert pool._slot is None
+        assert pool.active == 2 and pool.stats()["retiring"] == 1
+
+        await pool._release_slot(crashed)
+        await pool._release_slot(crashed)
+        assert pool.active == 0 and pool._retiring == []
+
+    asyncio.run(scenario())
+
+
+def test_retiring_an_idle_browser_keeps_its_close_task():
+    async def scenario():
+        pool = BrowserPool(max_memory_mb=0)
+        idle = _BrowserSlot(browser=FakeBrowser())
+
+        pool._retire(idle)
+        assert len(pool._closing) == 1
+        await asyncio.gather(*pool._closing)
+        assert idle.browser.closed and not pool._closing
+
+    asyncio.run(scenario())
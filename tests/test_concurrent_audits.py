@@ -0,0 +1,103 @@
+"""
+Concurrency stress tests: one shared analyzer set / AuditEngine serving many overlapping audits
+"""
+
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from aeo_analyzer import AEOAnalyzer
+from geo_analyzer import GEOAnalyzer
+from seo_analyzer import SEOAnalyzer
+
+AUDITS = 300
+
+
+def make_page(seed: int) -> str:
+    """Pages that differ in every analyzer's issue list, so cross-talk changes results"""
+    rng = random.Random(seed)
+    parts = ["<html><head>"]
+    if rng.random() < 0.7:
+        parts.append(f"<title>{'Acme ' * rng.randint(1, 15)}</title>")
+    if rng.random() < 0.5:
+        parts.append('<meta name="description" content="' + "d" * rng.randint(60, 200) + '">')
+    if rng.random() < 0.5:
+        parts.append('<script type="application/ld+json">{"@type": "LocalBusiness"}</script>')
+    parts.append("</head><body>")
+    # Enough text that the static fetch counts as real content (no Playwright fallback)
+    parts.append("<p>Acme makes hand made furniture and repairs chairs for customers all over town.</p>")
+    for _ in range(rng.randint(1, 30)):
+        parts.append(rng.choice([
+            "<h1>Welcome to our shop</h1>",
+            "<h2>What do we offer?</h2>",
+            "<p>Visit our store on Main street, call (555) 123-4567 or mail hello@example.com.</p>",
+            "<p>Open Monday 9:00 to Friday 17:00 in the city centre.</p>",
+            '<img src="a.png" alt="logo">',
+            '<img src="b.png">',
+            '<a href="/about">About</a>',
+            '<a href="https://other.example.org/">Partner</a>',
+            "<ul><li>one</li><li>two</li></ul>",
+            "<table><tr><td>1</td></tr></table>",
+        ]))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def analyze_all(analyzers, url: str, html: str):
+    return tuple(analyzer.analyze_document(url, html) for analyzer in analyzers)
+
+
+def test_shared_analyzers_are_reentrant_across_threads():
+    pages = {f"https://site{i}.example.com/": make_page(i) for i in range(AUDITS)}
+    expected = {
+        url: analyze_all((SEOAnalyzer(), AEOAnalyzer(), GEOAnalyzer()), url, html)
+        for url, html in pages.items()
+    }
+
+    shared = (SEOAnalyzer(), AEOAnalyzer(), GEOAnalyzer())
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = {url: pool.submit(analyze_all, shared, url, html) for url, html in pages.items()}
+        results = {url: future.result() for url, future in futures.items()}
+
+    assert results == expected
+
+
+def test_one_engine_serves_overlapping_audits_deterministically(audit_engine_with_fake_llm):
+    # The fake LLM returns fixed recommendations, so reports only differ if audits interfere
+    from analysis_executor import AnalysisExecutor
+    from http_fetcher import FetchResult
+
+    pages = {f"https://site{i}.example.com/": make_page(i) for i in range(AUDITS)}
+
+    async def fake_get(url, headers=None):
+        # Random latency so audits interleave at every await point
+        await asyncio.sleep(random.random() / 100)
+        html = pages[url]
+        return FetchResult(url, 200, html.encode(), html, {}, "HTTP/1.1")
+
+    async def run_each_time(key, fn):
+        return await fn()
+
+    async def run():
+        engine = audit_engine_with_fake_llm()
+        engine.analysis_executor = AnalysisExecutor(mode="thread", max_workers=8)
+        engine.http_fetcher.get = fake_get
+        # Every call must run a full audit: no cached reports, no sharing of concurrent runs
+        engine.audit_cache.put = lambda *args: None
+        engine.single_flight.do = run_each_time
+
+        sequential = {url: await engine.run_audit(url) for url in pages}
+        urls = list(pages) * 2
+        random.Random(0).shuffle(urls)
+        concurrent = await asyncio.gather(*(engine.run_audit(url) for url in urls))
+        await engine.stop()
+        return sequential, list(zip(urls, concurrent)), engine.audit_cache.stats()
+
+    sequential, concurrent, cache_stats = asyncio.run(run())
+
+    assert cache_stats["hits"] == 0
+    for url, report in [*sequential.items(), *concurrent]:
+        assert report["status"] == "completed", report.get("error")
+        assert report.pop("timings")["source"] == "audit"
+    for url, report in concurrent:
+        assert report == sequential[url]
@@ -0,0 +1,69 @@
+"""
+HAR record/replay: recorded static and rendered fetches come back identical with no network
+"""
+
+import asyncio
+
+import pytest
+
+from fetch_archive import ArchiveMiss, FetchArchive, fetch_backends
+from http_fetcher import FetchResult
+
+PAGE = "<html><head><title>Café</title></head><body><p>Recorded page</p></body></html>"
+
+
+class LiveFetcher:
+    def __init__(self):
+        self.calls = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def get(self, url, headers=None):
+        self.calls += 1
+        return FetchResult(url, 200, PAGE.encode('utf-8'), PAGE, {'etag': '"v1"', 'content-type': 'text/html'}, 'HTTP/2')
+
+
+class LivePool:
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def render(self, url, **options):
+        return "<html><body>rendered " + url + "</body></html>"
+
+    def stats(self):
+        return {}
+
+
+def test_record_then_replay_without_network(tmp_path):
+    path = str(tmp_path / "archive.har")
+
+    async def record():
+        fetcher, renderer = fetch_backends(LiveFetcher(), LivePool(), mode='record', path=path)
+        await fetcher.get("https://Example.com")
+        await renderer.render("https://example.com/app")
+        await fetcher.stop()
+        await renderer.stop()
+
+    async def replay():
+        fetcher, renderer = fetch_backends(None, None, mode='replay', path=path)
+        static = await fetcher.get("https://example.com/")
+        rendered = await renderer.render("https://example.com/app")
+        with pytest.raises(ArchiveMiss):
+            await fetcher.get("https://example.com/never-recorded")
+        return static, rendered
+
+    asyncio.run(record())
+    assert len(FetchArchive(path).load()) == 2
+
+    static, rendered = asyncio.run(replay())
+    assert static.status_code == 200
+    assert static.text == PAGE
+    assert static.headers['etag'] == '"v1"'
+    assert rendered == "<html><body>rendered https://example.com/app</body></html>"
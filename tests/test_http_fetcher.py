@@ -0,0 +1,80 @@
+"""
+HTTP fetcher: the per-host concurrency cap, and how responses and transport errors reach callers
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from http_fetcher import HTTPFetcher
+
+
+def _fetcher(handler, per_host_limit=2):
+    fetcher = HTTPFetcher(per_host_limit=per_host_limit)
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    return fetcher
+
+
+def test_requests_to_one_host_are_capped_without_blocking_other_hosts():
+    in_flight, peak = {}, {}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    async def scenario():
+        fetcher = _fetcher(handler)
+        try:
+            urls = [f"https://slow.example/{i}" for i in range(6)] + [f"https://other.example/{i}" for i in range(3)]
+            results = await asyncio.gather(*(fetcher.get(url) for url in urls))
+        finally:
+            await fetcher.stop()
+        assert all(result.status_code == 200 for result in results)
+        # Idle hosts are forgotten
+        assert fetcher._hosts == {}
+
+    asyncio.run(scenario())
+    assert peak == {"slow.example": 2, "other.example": 2}
+
+
+def test_get_maps_the_final_response_into_a_fetch_result():
+    def handler(request):
+        if request.url.path == "/":
+            return httpx.Response(301, headers={"Location": "https://www.example.com/home"})
+        return httpx.Response(404, html="<p>Café</p>", headers={"ETag": '"v1"'})
+
+    async def scenario():
+        fetcher = _fetcher(handler)
+        try:
+            return await fetcher.get("https://example.com/")
+        finally:
+            await fetcher.stop()
+
+    result = asyncio.run(scenario())
+    # Statuses are returned, not raised; the URL is where the redirects ended up
+    assert (result.url, result.status_code) == ("https://www.example.com/home", 404)
+    assert result.text == "<p>Café</p>" and result.content == "<p>Café</p>".encode()
+    assert result.headers["etag"] == '"v1"'
+    assert result.http_version == "HTTP/1.1"
+
+
+def test_transport_errors_propagate_and_release_the_host_slot():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def scenario():
+        fetcher = _fetcher(handler, per_host_limit=1)
+        try:
+            for _ in range(2):
+                with pytest.raises(httpx.ConnectError):
+                    await fetcher.get("https://down.example/")
+            assert fetcher._hosts == {}
+        finally:
+            await fetcher.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+"""
+Link checking: HEAD with ranged-GET fallback, recorded redirects, a shared cache and a hard time budget
+"""
+
+import asyncio
+
+import httpx
+
+from analysis_executor import analyze_html
+from link_checker import LinkChecker
+from seo_analyzer import SEOAnalyzer
+
+
+def make_checker(handler, **kwargs):
+    requests = []
+
+    async def record(request):
+        requests.append((request.method, request.url.path, request.headers.get('range')))
+        return await handler(request)
+
+    return LinkChecker(transport=httpx.MockTransport(record), **kwargs), requests
+
+
+async def site(request):
+    path = request.url.path
+    if path == "/no-head":
+        return httpx.Response(405 if request.method == "HEAD" else 206)
+    if path == "/old":
+        return httpx.Response(301, headers={"location": "/new"})
+    if path == "/slow":
+        await asyncio.sleep(1)
+    if path in ("/new", "/ok", "/slow"):
+        return httpx.Response(200)
+    return httpx.Response(404)
+
+
+def test_head_fallback_redirects_and_broken_links():
+    checker, requests = make_checker(site)
+
+    async def run():
+        urls = ["https://l.example.com/no-head", "https://l.example.com/old", "https://l.example.com/gone",
+                "https://l.example.com/ok#top", "mailto:hi@l.example.com"]
+        first = await checker.check(urls)
+        sent = len(requests)
+        again = await checker.check(urls)
+        redirect = await checker.status("https://l.example.com/old")
+        await checker.stop()
+        return first, sent, again, redirect
+
+    first, sent, again, redirect = asyncio.run(run())
+
+    assert first["checked"] == 4 and first["unchecked"] == 0
+    assert first["broken"] == 1 and first["broken_urls"] == [{"url": "https://l.example.com/gone", "status": 404}]
+    assert first["redirected"] == 1
+    assert redirect["final_url"] == "https://l.example.com/new"
+    assert redirect["redirects"] == [{"status": 301, "url": "https://l.example.com/old"}]
+    # HEAD was refused, so a one-byte ranged GET decided the status
+    assert ("GET", "/no-head", "bytes=0-0") in requests
+    # The second audit is answered from the shared cache
+    assert len(requests) == sent and again["broken"] == 1
+
+
+def test_time_budget_returns_partial_results():
+    checker, _ = make_checker(site)
+
+    async def run():
+        result = await checker.check(["https://l.example.com/ok", "https://l.example.com/slow"], budget=0.2)
+        await checker.stop()
+        return result
+
+    result = asyncio.run(run())
+    assert result["checked"] == 1 and result["unchecked"] == 1
+
+
+def test_broken_links_lower_the_seo_score():
+    url = "https://l.example.com/"
+    seo = analyze_html(url, b'<html><head><title>T</title></head><body><a href="/gone">x</a></body></html>')["seo"]
+    assert seo["links"]["internal_urls"] == ["https://l.example.com/gone"]
+    score = seo["score"]
+
+    SEOAnalyzer().apply_link_check(seo, {"checked": 1, "unchecked": 0, "broken": 1, "redirected": 0, "broken_urls": []})
+    assert seo["links"]["broken_links"] == 1
+    assert seo["score"] == score - 5
+    assert "1 broken link found" in seo["issues"]
@@ -0,0 +1,29 @@
+"""
+Prometheus exposition: histogram buckets are cumulative and label sets render separately
+"""
+
+from metrics import CallbackMetric, Counter, Histogram, Registry
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    latency = registry.register(Histogram('test_latency_seconds', 'Latency', ('route',), buckets=(0.1, 1)))
+    fetches = registry.register(Counter('test_fetches_total', 'Fetches', ('mode',)))
+    registry.register(CallbackMetric('test_pool_active', 'Active', lambda: 3))
+
+    latency.observe(0.05, route='/a')
+    latency.observe(0.1, route='/a')
+    latency.observe(5, route='/a')
+    fetches.inc(mode='static')
+    fetches.inc(mode='static')
+    fetches.inc(mode='rendered')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE test_latency_seconds histogram' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/a"} 3' in lines
+    assert 'test_fetches_total{mode="static"} 2' in lines
+    assert 'test_fetches_total{mode="rendered"} 1' in lines
+    assert 'test_pool_active 3' in lines
@@ -0,0 +1,37 @@
+"""
+Mongo index bootstrap: missing indexes are created once, equivalent ones are kept, conflicts are reported
+"""
+
+import asyncio
+
+from fakes import FakeDatabase
+from mongo_indexes import INDEXES, check_indexes, ensure_indexes
+
+
+def test_ensure_indexes_creates_missing_ones_idempotently():
+    db = FakeDatabase()
+    # Already there under another name: left alone
+    db.users.indexes['email_1'] = {'key': [('email', 1)], 'unique': True}
+
+    first = asyncio.run(ensure_indexes(db))
+    assert (first["ok"], first["created"]) == (1, len(INDEXES) - 1)
+    assert db.user_sessions.indexes['user_sessions_expires_at_ttl'] == {'key': [('expires_at', 1)], 'expireAfterSeconds': 0}
+    assert db.audits.indexes['audits_timestamp_desc']['key'] == [('timestamp', -1)]
+
+    second = asyncio.run(ensure_indexes(db))
+    assert second["ok"] == len(INDEXES) and "created" not in second
+
+
+def test_check_reports_missing_and_mismatched_indexes():
+    db = FakeDatabase()
+    db.audits.indexes['id_1'] = {'key': [('id', 1)]}
+
+    report = {entry["name"]: entry for entry in asyncio.run(check_indexes(db))}
+    assert report["audits_id_unique"]["status"] == "mismatch"
+    assert report["audits_id_unique"]["differences"] == ["unique is False, expected True"]
+    assert report["users_email_unique"]["status"] == "missing"
+
+    # A conflicting index is never replaced automatically
+    result = asyncio.run(ensure_indexes(db))
+    assert result["mismatch"] == 1
+    assert db.audits.indexes['id_1'] == {'key': [('id', 1)]}
@@ -0,0 +1,114 @@
+"""
+Bulk rescoring: stale audits get new scores and the version stamp, and a run resumes from its checkpoint
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from analysis_executor import SCORING_RULES_VERSION
+from fakes import FakeDatabase, FakeSupabase
+from rescore import Checkpoint, MongoSource, Rescorer, SupabaseSource
+from snapshot_store import LocalBlobStore, SnapshotStore
+
+PAGE = "<html><head><title>Stored page</title></head><body><h1>Hello</h1><p>Some stored content.</p></body></html>"
+
+
+def _ids(count):
+    return sorted(str(uuid.uuid4()) for _ in range(count))
+
+
+def test_rescore_mongo_resumes_from_checkpoint(tmp_path):
+    store = SnapshotStore(LocalBlobStore(str(tmp_path / "snapshots")))
+    snapshot = store.put(PAGE)
+    db = FakeDatabase()
+    ids = _ids(5)
+    for audit_id in ids:
+        db.audits.docs.append({"id": audit_id, "url": "https://example.com/", "status": "completed",
+                               "seo_score": 0, "snapshot": snapshot})
+    # Already on the current rules, and an audit with no snapshot: both left alone
+    db.audits.docs[0]["scoring_version"] = SCORING_RULES_VERSION
+    db.audits.docs.append({"id": str(uuid.uuid4()), "url": "https://example.com/", "status": "completed", "seo_score": 0})
+    # A crawl audit: its scores are site means, the snapshot is only the start page's
+    crawl_id = str(uuid.uuid4())
+    db.audits.docs.append({"id": crawl_id, "url": "https://example.com/", "status": "completed", "seo_score": 42,
+                           "snapshot": snapshot, "scoring_version": 0, "site": {"pages_crawled": 3}})
+
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+
+    def run(limit=None):
+        checkpoint = Checkpoint(checkpoint_path, "mongo").load()
+        rescorer = Rescorer(MongoSource(db), checkpoint, batch_size=2, limit=limit, snapshot_store=store)
+        return asyncio.run(rescorer.run())
+
+    first = run(limit=2)
+    assert (first["processed"], first["updated"], first["done"]) == (2, 2, False)
+
+    second = run()
+    assert second["resumed"] and second["done"]
+    assert (second["processed"], second["updated"], second["processed_this_run"]) == (4, 4, 2)
+
+    rescored = [doc for doc in db.audits.docs if doc.get("snapshot") and not doc.get("site")]
+    assert all(doc["scoring_version"] == SCORING_RULES_VERSION for doc in rescored)
+    assert all(doc["seo_score"] == doc["seo_details"]["score"] for doc in rescored[1:])
+    assert "scoring_version" not in db.audits.docs[-2]
+    crawl = next(doc for doc in db.audits.docs if doc["id"] == crawl_id)
+    assert (crawl["seo_score"], crawl["scoring_version"]) == (42, 0)
+
+
+def test_rescore_supabase_upserts_reports(tmp_path):
+    store = SnapshotStore(LocalBlobStore(str(tmp_path / "snapshots")))
+    sha = store.put(PAGE)["sha256"]
+    client = FakeSupabase()
+    for audit_id in _ids(3):
+        client.add_row("audits", {"id": audit_id, "url": "https://example.com/", "status": "completed", "snapshot_sha256": sha})
+        client.add_row("reports", {"audit_id": audit_id, "seo_score": 0, "aeo_score": 0, "geo_score": 0, "overall_score": 0})
+    # The stored link check is reapplied: two broken links cost this report one more issue
+    broken = client.tables["reports"][0]
+    broken["link_check"] = {"checked": 3, "broken": 2, "unknown": 0, "broken_urls": []}
+    missing = client.add_row("audits", {"url": "https://example.com/gone", "status": "completed", "snapshot_sha256": "0" * 64})
+    client.add_row("reports", {"audit_id": missing["id"], "seo_score": 0})
+    crawl = client.add_row("audits", {"url": "https://example.com/", "status": "completed", "snapshot_sha256": sha, "site": {"pages_crawled": 3}})
+    client.add_row("reports", {"audit_id": crawl["id"], "seo_score": 42})
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), "supabase")
+    result = asyncio.run(Rescorer(SupabaseSource(client), checkpoint, batch_size=10, snapshot_store=store).run())
+
+    assert (result["processed"], result["updated"], result["missing"]) == (4, 3, 1)
+    reports = [r for r in client.tables["reports"] if r["audit_id"] not in (missing["id"], crawl["id"])]
+    assert all(r["scoring_version"] == SCORING_RULES_VERSION and r["seo_score"] > 0 for r in reports)
+    assert broken["seo_score"] == reports[1]["seo_score"] - 5 and broken["link_check"]["broken"] == 2
+    assert len(client.tables["reports"]) == 5
+    crawl_report = next(r for r in client.tables["reports"] if r["audit_id"] == crawl["id"])
+    assert crawl_report["seo_score"] == 42 and "scoring_version" not in crawl_report
+
+
+class FlakyStore(SnapshotStore):
+    """Reads fail the way an unreachable bucket does"""
+
+    def __init__(self):
+        pass
+
+    def get(self, sha256):
+        raise OSError("bucket unreachable")
+
+
+def test_rescore_counts_storage_errors_per_page(tmp_path):
+    db = FakeDatabase()
+    for audit_id in _ids(2):
+        db.audits.docs.append({"id": audit_id, "url": "https://example.com/", "status": "completed",
+                               "seo_score": 0, "snapshot": {"sha256": "0" * 64}})
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), "mongo")
+    result = asyncio.run(Rescorer(MongoSource(db), checkpoint, snapshot_store=FlakyStore()).run())
+
+    assert (result["processed"], result["updated"], result["errors"], result["done"]) == (2, 0, 2, True)
+    assert all("scoring_version" not in doc for doc in db.audits.docs)
+
+
+def test_rescore_refuses_to_start_without_a_snapshot_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_STORE", "off")
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), "mongo")
+    with pytest.raises(RuntimeError, match="SNAPSHOT_STORE=off"):
+        asyncio.run(Rescorer(MongoSource(FakeDatabase()), checkpoint, workers=1).run())
@@ -0,0 +1,91 @@
+"""
+Session cache: token lookups are served from memory (negatives too), honour expires_at and logout
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import session_cache
+import supabase_repository
+from fakes import FakeDatabase, FakeSupabase
+from session_cache import MISS, SessionCache
+from supabase_repository import SupabaseRepository
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SessionCache(ttl=60, negative_ttl=60)
+    monkeypatch.setattr(session_cache, "_session_cache", cache)
+    return cache
+
+
+def mongo_db(expires_in=3600):
+    db = FakeDatabase()
+    db.users.docs.append({"_id": "u1", "email": "a@example.com", "name": "A", "created_at": datetime.now(timezone.utc)})
+    db.user_sessions.docs.append({"user_id": "u1", "session_token": "good", "expires_at": datetime.now(timezone.utc) + timedelta(seconds=expires_in)})
+    return db
+
+
+def test_mongo_lookups_hit_the_cache_and_logout_invalidates(cache):
+    from auth import delete_session, get_user_from_session
+    db = mongo_db()
+
+    async def run():
+        trips = []
+        for token in ("good", "good", "bogus", "bogus"):
+            user = await get_user_from_session(db, token)
+            trips.append(db.round_trips)
+        await delete_session(db, "good")
+        return user, trips, await get_user_from_session(db, "good")
+
+    user, trips, after_logout = asyncio.run(run())
+    # One join query per miss, nothing for repeats (the unknown token included)
+    assert trips == [1, 1, 2, 2]
+    assert user is None and after_logout is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["negative_hits"] == 1
+
+
+def test_mongo_two_lookups_without_join(cache, monkeypatch):
+    from auth import get_user_from_session
+    monkeypatch.setenv("SESSION_LOOKUP_JOIN", "0")
+    db = mongo_db()
+    user = asyncio.run(get_user_from_session(db, "good"))
+    assert user.email == "a@example.com" and db.round_trips == 2
+
+
+def test_entries_never_outlive_the_session(cache):
+    from auth import get_user_from_session
+    db = mongo_db(expires_in=0.2)
+
+    assert asyncio.run(get_user_from_session(db, "good")).id == "u1"
+    time.sleep(0.25)
+    assert cache.get("good") is MISS
+    assert asyncio.run(get_user_from_session(db, "good")) is None
+
+
+def test_lookup_overlapping_an_invalidation_is_not_cached():
+    cache = SessionCache(ttl=60, negative_ttl=60)
+    generation = cache.generation
+    cache.invalidate("good")
+    cache.set("good", "user", datetime.now(timezone.utc) + timedelta(hours=1), generation)
+    assert cache.get("good") is MISS
+
+
+def test_supabase_join_resolves_session_and_user_in_one_round_trip(cache, monkeypatch):
+    from auth_supabase import get_user_from_session
+    client = FakeSupabase()
+    client.add_row('users', {"id": "u1", "email": "a@example.com", "created_at": "2026-01-01T00:00:00+00:00"})
+    client.add_row('user_sessions', {"user_id": "u1", "session_token": "good",
+                                     "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()})
+    monkeypatch.setattr(supabase_repository, "_repository", SupabaseRepository(client, max_workers=2))
+
+    async def run():
+        return [await get_user_from_session(token) for token in ("good", "good", "bogus", "bogus")]
+
+    users = asyncio.run(run())
+    assert users[0].email == "a@example.com" and users[1] is users[0]
+    assert users[2] is None and users[3] is None
+    assert client.round_trips == 2
@@ -0,0 +1,141 @@
+"""
+Site crawl: internal links are followed once each within the depth/page limits and scores roll up per site
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from analysis_executor import analyze_html
+from http_fetcher import FetchResult
+from robots import RobotsCache
+from site_crawler import SiteCrawler, rollup
+
+SITE = {
+    "/": ['/a', '/b', '/b#section', 'https://other.example.org/', 'mailto:hi@site.example.com'],
+    "/from-sitemap": [],
+    "/a": ['/', '/a/deep'],
+    "/b": ['/a'],
+    "/a/deep": ['/a/deeper'],
+    "/a/deeper": [],
+}
+
+
+def page(path):
+    links = ''.join(f'<a href="{href}">link</a>' for href in SITE[path])
+    return f"<html><head><title>Page {path}</title></head><body><h1>{path}</h1><p>Some content here.</p>{links}</body></html>"
+
+
+class FakeFetcher:
+    """Serves robots.txt and sitemap.xml; 404 for anything not configured"""
+
+    def __init__(self, files=None):
+        self.files = files or {}
+
+    async def get(self, url, headers=None):
+        path = url.split("site.example.com", 1)[1]
+        if path not in self.files:
+            return FetchResult(url, 404, b"", "", {}, "HTTP/1.1")
+        body = self.files[path]
+        return FetchResult(url, 200, body.encode(), body, {}, "HTTP/1.1")
+
+
+class FakeEngine:
+    def __init__(self, files=None):
+        self.http_fetcher = FakeFetcher(files)
+        self.robots = RobotsCache(self.http_fetcher)
+        self.fetched = []
+        self.checked_links = []
+        self.active = 0
+        self.max_active = 0
+
+    async def _fetch_and_analyze(self, url, response=None, progress=None, timer=None, check_links=True):
+        self.checked_links.append(check_links)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        path = urlsplit(url).path or "/"
+        self.fetched.append(path)
+        if path not in SITE:
+            return None, None, None
+        html = page(path)
+        return html, analyze_html(url, html.encode()), None
+
+    async def _save_snapshot(self, html, timer):
+        return None
+
+
+def test_crawl_follows_internal_links_within_limits():
+    engine = FakeEngine()
+    events = []
+    crawler = SiteCrawler(engine, max_pages=10, max_depth=2, per_host_concurrency=2)
+    pages, frontier = asyncio.run(crawler.crawl("https://site.example.com/", lambda stage, data: events.append(data)))
+
+    # Each page once, the fragment variant folded into /b, nothing beyond depth 2 or off-site
+    assert sorted(engine.fetched) == ["/", "/a", "/a/deep", "/b"]
+    # No per-page link checks: each would spend its own time budget
+    assert not any(engine.checked_links)
+    assert engine.max_active == 2
+    assert [event["pages_done"] for event in events] == [1, 2, 3, 4]
+    assert {p["url"]: p["depth"] for p in pages}["https://site.example.com/a/deep"] == 2
+
+    site = rollup("https://site.example.com/", pages, frontier)
+    assert site["pages_crawled"] == 4 and site["pages_failed"] == 0
+    assert site["pages_skipped"] == 1
+    assert site["seo_score"] == round(sum(p["seo_score"] for p in pages) / 4)
+    assert site["common_issues"][0]["pages"] == 4
+    assert "analysis" not in site["pages"][0]
+
+
+def test_crawl_respects_page_limit():
+    engine = FakeEngine()
+    pages, _ = asyncio.run(SiteCrawler(engine, max_pages=2, max_depth=5).crawl("https://site.example.com/"))
+    assert len(pages) == 2
+
+
+def test_crawl_seeds_from_sitemap_and_obeys_robots():
+    sitemap = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://site.example.com/from-sitemap</loc><lastmod>2026-09-01</lastmod></url>
+  <url><loc>https://site.example.com/stale</loc><lastmod>2025-01-01</lastmod></url>
+  <url><loc>https://elsewhere.example.com/</loc></url>
+</urlset>"""
+    engine = FakeEngine({
+        "/robots.txt": "User-agent: *\nDisallow: /a/\nSitemap: https://site.example.com/pages.xml\n",
+        "/pages.xml": sitemap,
+    })
+    crawler = SiteCrawler(engine, max_pages=10, max_depth=2, changed_since=datetime(2026, 6, 1, tzinfo=timezone.utc))
+    pages, frontier = asyncio.run(crawler.crawl("https://site.example.com/"))
+
+    assert sorted(engine.fetched) == ["/", "/a", "/b", "/from-sitemap"]
+    assert frontier.disallowed == {"https://site.example.com/a/deep"}
+    seeded = next(p for p in pages if p["url"].endswith("/from-sitemap"))
+    assert (seeded["depth"], seeded["lastmod"]) == (1, "2026-09-01T00:00:00+00:00")
+    assert engine.robots.fetches == 1
+
+
+def test_crawl_accepts_start_url_with_default_port():
+    engine = FakeEngine()
+    pages, frontier = asyncio.run(SiteCrawler(engine, max_pages=10, max_depth=1).crawl("https://site.example.com:443/"))
+    assert sorted(engine.fetched) == ["/", "/a", "/b"]
+    assert frontier.host == "site.example.com"
+
+
+class RedirectingEngine(FakeEngine):
+    """Every apex URL redirects to www, whose pages link with absolute www URLs"""
+
+    async def _fetch_and_analyze(self, url, response=None, progress=None, timer=None, check_links=True):
+        final = url.replace("://site.example.com", "://www.site.example.com")
+        html, analysis, _ = await super()._fetch_and_analyze(final, response, progress, timer, check_links)
+        return html, analysis, FetchResult(final, 200, b"", "", {}, "HTTP/1.1") if html else None
+
+
+def test_crawl_follows_the_start_page_redirect_host():
+    engine = RedirectingEngine()
+    pages, frontier = asyncio.run(SiteCrawler(engine, max_pages=10, max_depth=1).crawl("https://site.example.com/"))
+    assert frontier.host == "www.site.example.com"
+    # The www root linked back from /a is the start page itself, not a new page
+    assert sorted(p["url"] for p in pages) == [
+        "https://site.example.com/", "https://www.site.example.com/a", "https://www.site.example.com/b"
+    ]
@@ -0,0 +1,71 @@
+"""
+Sitemap streaming: indexes and gzipped sitemaps are followed incrementally, lastmod filters entries
+"""
+
+import asyncio
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from http_fetcher import FetchResult
+from sitemap import SitemapParser, SitemapTooLarge, iter_sitemap
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(count, lastmod="2026-09-01"):
+    urls = ''.join(f"<url><loc>https://s.example.com/p/{i}</loc><lastmod>{lastmod}</lastmod></url>" for i in range(count))
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'.encode()
+
+
+class FakeFetcher:
+    def __init__(self, files):
+        self.files = files
+
+    async def get(self, url, headers=None):
+        body = self.files.get(url)
+        if body is None:
+            return FetchResult(url, 404, b"", "", {}, "HTTP/1.1")
+        return FetchResult(url, 200, body, "", {}, "HTTP/1.1")
+
+
+def collect(fetcher, url, **kwargs):
+    async def run():
+        return [entry async for entry in iter_sitemap(fetcher, url, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_index_with_gzipped_children_and_lastmod_filter():
+    index = f"""<sitemapindex {NS}>
+      <sitemap><loc>https://s.example.com/new.xml.gz</loc><lastmod>2026-09-02T10:00:00Z</lastmod></sitemap>
+      <sitemap><loc>https://s.example.com/old.xml</loc><lastmod>2024-01-01</lastmod></sitemap>
+      <sitemap><loc>https://s.example.com/missing.xml</loc></sitemap>
+    </sitemapindex>""".encode()
+    fetcher = FakeFetcher({
+        "https://s.example.com/sitemap.xml": index,
+        "https://s.example.com/new.xml.gz": gzip.compress(urlset(60000)),
+        "https://s.example.com/old.xml": urlset(3, lastmod="2024-01-01"),
+    })
+
+    every = collect(fetcher, "https://s.example.com/sitemap.xml")
+    assert len(every) == 60003
+    assert every[0].loc == "https://s.example.com/p/0"
+    assert every[0].lastmod == datetime(2026, 9, 1, tzinfo=timezone.utc)
+
+    # The old child sitemap is skipped without being downloaded
+    recent = collect(fetcher, "https://s.example.com/sitemap.xml", since=datetime(2026, 1, 1))
+    assert len(recent) == 60000
+
+
+def test_parser_streams_in_small_chunks_and_enforces_size_limit():
+    body = gzip.compress(urlset(50))
+    parser = SitemapParser()
+    entries = []
+    for start in range(0, len(body), 7):
+        entries += parser.feed(body[start:start + 7])
+    entries += parser.close()
+    assert [kind for kind, _ in entries] == ["url"] * 50
+
+    with pytest.raises(SitemapTooLarge):
+        SitemapParser(max_bytes=1000).feed(urlset(50))
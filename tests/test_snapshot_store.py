@@ -0,0 +1,38 @@
+"""
+Snapshot store: pages round-trip through zstd and identical content is stored only once
+"""
+
+import asyncio
+
+import pytest
+
+from snapshot_store import LocalBlobStore, SnapshotStore
+
+PAGE = "<html><head><title>Café</title></head><body>" + "<p>Repeated paragraph</p>" * 500 + "</body></html>"
+
+
+def test_snapshots_round_trip_and_deduplicate(tmp_path):
+    store = SnapshotStore(LocalBlobStore(str(tmp_path)))
+
+    first = store.put(PAGE)
+    second = store.put(PAGE)
+    other = store.put(PAGE + "<!-- changed -->")
+
+    assert first == second
+    assert first["size"] == len(PAGE.encode('utf-8'))
+    assert other["sha256"] != first["sha256"]
+    assert store.get(first["sha256"]) == PAGE
+    assert len(list(tmp_path.rglob("*.zst"))) == 2
+
+    stats = store.stats()
+    assert (stats["stored"], stats["deduplicated"]) == (2, 1)
+    assert stats["bytes_stored"] < stats["bytes_in"]
+
+    # A fresh store on the same directory sees what earlier runs wrote
+    reopened = SnapshotStore(LocalBlobStore(str(tmp_path)))
+    assert asyncio.run(reopened.save(PAGE)) == first
+    assert asyncio.run(reopened.load(first["sha256"])) == PAGE
+    assert reopened.stats()["stored"] == 0
+
+    with pytest.raises(KeyError):
+        store.get("0" * 64)
@@ -0,0 +1,122 @@
+"""
+Supabase repository: blocking queries run on a bounded pool so the event loop keeps serving,
+and a finished audit is persisted in one atomic round trip
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import session_cache
+import supabase_repository
+from fakes import FakeSupabase
+from supabase_repository import SupabaseRepository
+
+LATENCY = 0.1
+
+
+@pytest.fixture(autouse=True)
+def fresh_session_cache(monkeypatch):
+    # The auth helpers share a process-wide session cache; start each test without one
+    monkeypatch.setattr(session_cache, "_session_cache", None)
+
+
+def test_queries_overlap_up_to_the_pool_size_without_blocking_the_loop():
+    client = FakeSupabase(latency=LATENCY)
+    client.add_row('users', {"id": "u1", "email": "a@example.com"})
+    repository = SupabaseRepository(client, max_workers=10)
+    seen_in_flight = []
+
+    async def watcher(stop):
+        while not stop.is_set():
+            seen_in_flight.append(client.in_flight)
+            await asyncio.sleep(0)
+
+    async def run(count):
+        stop = asyncio.Event()
+        watching = asyncio.create_task(watcher(stop))
+        started = time.perf_counter()
+        users = await asyncio.gather(*(repository.get_user("u1") for _ in range(count)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await watching
+        return users, elapsed
+
+    users, elapsed = asyncio.run(run(10))
+    repository.close()
+
+    assert all(user["email"] == "a@example.com" for user in users)
+    assert client.peak_in_flight == 10
+    # The loop kept running while queries were blocked in the pool
+    assert max(seen_in_flight) > 0
+    # Overlapped, so well under the serial time (generous slack for a loaded machine)
+    assert elapsed < LATENCY * 10 / 2
+    assert repository.stats() == {"max_workers": 10, "queries": 10, "in_flight": 0}
+
+
+def test_pool_size_bounds_concurrent_queries():
+    client = FakeSupabase(latency=LATENCY)
+    repository = SupabaseRepository(client, max_workers=2)
+
+    async def run():
+        await asyncio.gather(*(repository.get_user("missing") for _ in range(6)))
+
+    asyncio.run(run())
+    repository.close()
+    assert client.peak_in_flight == 2 and client.round_trips == 6
+
+
+def test_auth_functions_go_through_the_repository(monkeypatch):
+    from auth_supabase import create_session, delete_session, get_user_from_session
+
+    client = FakeSupabase()
+    client.add_row('users', {"id": "u1", "email": "a@example.com", "created_at": "2026-01-01T00:00:00+00:00"})
+    monkeypatch.setattr(supabase_repository, "_repository", SupabaseRepository(client, max_workers=2))
+
+    async def run():
+        await create_session("u1", "token-1")
+        user = await get_user_from_session("token-1")
+        await delete_session("token-1")
+        return user, await get_user_from_session("token-1")
+
+    user, after_logout = asyncio.run(run())
+    assert user.email == "a@example.com"
+    assert after_logout is None
+
+
+def test_complete_audit_is_one_round_trip_and_replaces_a_previous_report():
+    client = FakeSupabase()
+    client.add_row('audits', {"id": "a1", "user_id": "u1", "url": "https://example.com/", "status": "running"})
+    repository = SupabaseRepository(client, max_workers=2)
+    report = {"overall_score": 70, "seo_score": 80, "aeo_score": 60, "geo_score": 70, "scoring_version": 1}
+    item = {"category": "seo", "check_name": "Title", "status": "fail", "description": "Title", "recommendation": "Fix", "score_impact": 10}
+
+    async def run():
+        first = await repository.complete_audit("a1", {"timings": {"total_ms": 5}}, report, [item, item])
+        trips = client.round_trips
+        # A retried write replaces the report's items instead of duplicating them
+        second = await repository.complete_audit("a1", {"timings": {"total_ms": 6}}, {**report, "seo_score": 90}, [item])
+        audit = await repository.get_audit("a1", "u1", '*, reports(*, report_items(*))')
+        return first, trips, second, audit
+
+    first, trips, second, audit = asyncio.run(run())
+    repository.close()
+
+    assert trips == 1 and first == second
+    assert audit["status"] == "completed" and audit["timings"] == {"total_ms": 6}
+    assert len(audit["reports"]) == 1 and audit["reports"][0]["seo_score"] == 90
+    assert len(audit["reports"][0]["report_items"]) == 1
+
+
+def test_complete_audit_for_a_missing_audit_writes_nothing():
+    client = FakeSupabase()
+    repository = SupabaseRepository(client, max_workers=1)
+
+    async def run():
+        await repository.complete_audit("missing", {}, {"overall_score": 1}, [{"category": "seo"}])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    repository.close()
+    assert not client.tables.get('reports') and not client.tables.get('report_items')
@@ -0,0 +1,79 @@
+"""
+complete_audit as written in supabase_schema.sql, run on a real Postgres.
+Set SUPABASE_TEST_DATABASE_URL (and install psycopg) to run it; each run works in a throwaway schema.
+"""
+
+import os
+import re
+import uuid
+from pathlib import Path
+
+import pytest
+
+SCHEMA_SQL = Path(__file__).resolve().parent.parent / "backend" / "supabase_schema.sql"
+DATABASE_URL = os.environ.get("SUPABASE_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="SUPABASE_TEST_DATABASE_URL is not set")
+
+
+def _statements():
+    """The tables complete_audit writes and the function itself (the rest of the schema needs Supabase's auth)"""
+    sql = SCHEMA_SQL.read_text()
+    tables = [
+        re.search(rf"CREATE TABLE IF NOT EXISTS {table} \(.*?\n\);", sql, re.S).group(0)
+        for table in ("users", "audits", "reports", "report_items")
+    ]
+    function = re.search(r"CREATE OR REPLACE FUNCTION complete_audit\(.*?LANGUAGE plpgsql;", sql, re.S).group(0)
+    return tables + [function]
+
+
+@pytest.fixture
+def pg():
+    psycopg = pytest.importorskip("psycopg")
+    schema = f"complete_audit_test_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+        conn.execute(f"CREATE SCHEMA {schema}")
+        try:
+            conn.execute(f"SET search_path TO {schema}, public")
+            for statement in _statements():
+                conn.execute(statement)
+            yield conn
+        finally:
+            conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def _complete(conn, audit_id, audit, report, items):
+    from psycopg.types.json import Jsonb
+
+    return conn.execute(
+        "SELECT complete_audit(%s, %s, %s, %s)", (audit_id, Jsonb(audit), Jsonb(report), Jsonb(items))
+    ).fetchone()[0]
+
+
+def test_complete_audit_upserts_the_report_and_replaces_its_items(pg):
+    audit_id = pg.execute("INSERT INTO audits (url, status) VALUES ('https://example.com/', 'running') RETURNING id").fetchone()[0]
+    report = {"overall_score": 70, "seo_score": 80, "aeo_score": 60, "geo_score": 70, "scoring_version": 1}
+    item = {"category": "seo", "check_name": "Title", "status": "fail", "description": "Title", "recommendation": "Fix", "score_impact": 10}
+
+    first = _complete(pg, audit_id, {"timings": {"total_ms": 5}}, report, [item, item])
+    second = _complete(pg, audit_id, {"timings": {"total_ms": 6}, "snapshot_sha256": "ab" * 32},
+                       {**report, "seo_score": 90, "link_check": {"broken": 1}}, [item])
+
+    assert first == second
+    reports = pg.execute("SELECT id, seo_score, link_check FROM reports WHERE audit_id = %s", (audit_id,)).fetchall()
+    assert reports == [(first, 90, {"broken": 1})]
+    assert pg.execute("SELECT count(*) FROM report_items WHERE report_id = %s", (first,)).fetchone()[0] == 1
+    status, timings, sha, completed_at = pg.execute(
+        "SELECT status, timings, snapshot_sha256, completed_at FROM audits WHERE id = %s", (audit_id,)
+    ).fetchone()
+    assert (status, timings, sha) == ("completed", {"total_ms": 6}, "ab" * 32) and completed_at is not None
+
+
+def test_complete_audit_for_a_missing_audit_writes_nothing(pg):
+    import psycopg
+
+    with pytest.raises(psycopg.Error):
+        _complete(pg, uuid.uuid4(), {}, {"overall_score": 1}, [{"category": "seo", "check_name": "Title", "status": "fail"}])
+    assert pg.execute("SELECT count(*) FROM reports").fetchone()[0] == 0
+    assert pg.execute("SELECT count(*) FROM report_items").fetchone()[0] == 0
@@ -0,0 +1,48 @@
+"""
+Audit instrumentation: stage timers and the timings block produced by the analysis worker
+"""
+
+import time
+
+from analysis_executor import analyze_html
+from timings import StageTimer
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage('fetch'):
+            time.sleep(0.01)
+    timer.add_ms({'parse': 5.0})
+    timer.count_bytes('static', 100)
+    timer.count_bytes('static', 50)
+    timer.set('source', 'audit')
+
+    timings = timer.as_dict()
+    assert timings['stages_ms']['fetch'] >= 20
+    assert timings['stages_ms']['parse'] == 5.0
+    assert timings['bytes'] == {'static': 150}
+    assert timings['source'] == 'audit'
+    assert timings['total_ms'] >= timings['stages_ms']['fetch']
+
+
+def test_analysis_worker_reports_parse_and_analyzer_timings():
+    html = "<html><head><title>Acme</title></head><body>" + "<p>Plenty of page text.</p>" * 20 + "</body></html>"
+    result = analyze_html("https://example.com", html.encode('utf-8'))
+
+    timings = result['timings']
+    assert set(timings['stages_ms']) == {'parse', 'dom_walk', 'seo_analysis', 'aeo_analysis', 'geo_analysis'}
+    assert timings['bytes']['html'] == len(html)
+    assert 'peak_rss_delta_kb' in timings
+    assert result['seo']['score'] >= 0
+
+
+def test_stage_timer_reports_rss_growth_within_its_stages():
+    # A second timer still sees the growth: the delta is not a process-lifetime high-water mark
+    for _ in range(2):
+        timer = StageTimer()
+        with timer.stage('allocate'):
+            block = bytearray(32 * 1024 * 1024)
+            block[::4096] = b'x' * len(block[::4096])
+        del block
+        assert timer.as_dict()['peak_rss_delta_kb'] >= 16 * 1024
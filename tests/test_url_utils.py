@@ -0,0 +1,40 @@
+"""
+URL normalization: canonical cache/crawl keys, IPv6 hosts and malformed ports
+"""
+
+import asyncio
+
+import pytest
+
+from url_utils import normalize_url
+
+
+def test_normalize_url_canonical_form():
+    assert normalize_url("Example.COM") == "https://example.com/"
+    assert normalize_url("HTTP://example.com:80/a?b=1#top") == "http://example.com/a?b=1"
+    assert normalize_url("https://example.com:8443") == "https://example.com:8443/"
+
+
+def test_normalize_url_keeps_ipv6_brackets():
+    assert normalize_url("http://[::1]:8080/a") == "http://[::1]:8080/a"
+    assert normalize_url("https://[2001:DB8::1]:443") == "https://[2001:db8::1]/"
+    assert normalize_url(normalize_url("http://[::1]/")) == "http://[::1]/"
+
+
+def test_normalize_url_rejects_port_out_of_range():
+    with pytest.raises(ValueError):
+        normalize_url("http://example.com:99999")
+
+
+def test_run_audit_reports_malformed_url_as_failed(audit_engine_with_fake_llm):
+    async def run():
+        engine = audit_engine_with_fake_llm()
+        try:
+            return await engine.run_audit("http://example.com:99999")
+        finally:
+            await engine.stop()
+
+    report = asyncio.run(run())
+    assert report["status"] == "failed"
+    assert "Port out of range" in report["error"]
+    assert "timings" in report